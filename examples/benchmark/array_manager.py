@@ -0,0 +1,87 @@
+"""
+Benchmark of ArrayManager and RingArrayManager, in bars/sec.
+
+Each bar is updated into array manager and then common indicators used
+by bundled strategies are calculated, with window size of 1000 bars.
+Composite indicators like boll and keltner call sma/std/atr again, which
+are reused from indicator cache when enabled.
+"""
+
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData
+from vnpy.trader.utility import ArrayManager, RingArrayManager
+
+
+BAR_COUNT = 20_000
+SIZE = 1000
+
+
+def create_bars() -> list:
+    """"""
+    rng = np.random.default_rng(0)
+    close = 3000 + np.cumsum(rng.normal(0, 2, BAR_COUNT)).round()
+
+    bars = []
+    for i, close_price in enumerate(close.tolist()):
+        open_price = close[i - 1] if i else close_price
+
+        bar = BarData(
+            symbol="IF888",
+            exchange=Exchange.CFFEX,
+            datetime=datetime(2015, 1, 5),
+            interval=Interval.MINUTE,
+            gateway_name="DB",
+            open_price=open_price,
+            high_price=max(open_price, close_price) + 1,
+            low_price=min(open_price, close_price) - 1,
+            close_price=close_price,
+            volume=10
+        )
+        bars.append(bar)
+
+    return bars
+
+
+def run(am: ArrayManager, bars: list) -> float:
+    """"""
+    start = perf_counter()
+
+    for bar in bars:
+        am.update_bar(bar)
+
+        am.sma(20)
+        am.ema(20)
+        am.boll(20, 2)
+        am.keltner(20, 2)
+        am.atr(20)
+        am.rsi(14)
+        am.donchian(20)
+
+    return perf_counter() - start
+
+
+def main():
+    """"""
+    bars = create_bars()
+
+    managers = {
+        "ArrayManager": ArrayManager(SIZE),
+        "ArrayManager(cache)": ArrayManager(SIZE, cache=True),
+        "RingArrayManager": RingArrayManager(SIZE),
+    }
+
+    for name, am in managers.items():
+        cost = run(am, bars)
+        print(
+            f"{name:<20} {BAR_COUNT / cost:>10,.0f} bars/s, "
+            f"cache hits {am.cache_hits}, misses {am.cache_misses}"
+        )
+
+
+if __name__ == "__main__":
+    main()
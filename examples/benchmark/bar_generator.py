@@ -0,0 +1,147 @@
+"""
+Benchmark of generating bars from tick data, in ticks/sec.
+
+Ticks are generated every 500 milliseconds by random walk. 5 minute, 15
+minute and 1 hour bars are generated by chained BarGenerators, and by
+one MultiBarGenerator, whose x minute bars are also checked to be the
+same.
+"""
+
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import TickData
+from vnpy.trader.utility import BarGenerator, MultiBarGenerator
+
+
+TICK_COUNT = 500_000
+
+
+def create_ticks() -> list:
+    """"""
+    rng = np.random.default_rng(0)
+    prices = 3000 + np.cumsum(rng.normal(0, 0.5, TICK_COUNT)).round()
+    volumes = np.cumsum(rng.integers(0, 10, TICK_COUNT))
+
+    start = datetime(2015, 1, 5, 9, 0)
+    delta = timedelta(milliseconds=500)
+
+    return [
+        TickData(
+            symbol="IF888",
+            exchange=Exchange.CFFEX,
+            datetime=start + delta * i,
+            gateway_name="DB",
+            last_price=price,
+            volume=volume
+        )
+        for i, (price, volume) in enumerate(zip(prices.tolist(), volumes.tolist()))
+    ]
+
+
+def run_chained(ticks: list) -> tuple:
+    """
+    Chain BarGenerators in the way used by strategies now.
+    """
+    bars = {5: [], 15: [], 60: []}
+
+    bg5 = BarGenerator(None, 5, bars[5].append)
+    bg15 = BarGenerator(None, 15, bars[15].append)
+    bg60 = BarGenerator(None, 1, bars[60].append, Interval.HOUR)
+
+    def on_bar(bar):
+        bg5.update_bar(bar)
+        bg15.update_bar(bar)
+        bg60.update_bar(bar)
+
+    bg = BarGenerator(on_bar)
+
+    start = perf_counter()
+    for tick in ticks:
+        bg.update_tick(tick)
+    cost = perf_counter() - start
+
+    return cost, bars
+
+
+def run_multi(ticks: list, seconds: int = 0) -> tuple:
+    """"""
+    bars = {5: [], 15: [], 60: [], "s": []}
+
+    mbg = MultiBarGenerator()
+    mbg.add_window(bars[5].append, 5)
+    mbg.add_window(bars[15].append, 15)
+    mbg.add_window(bars[60].append, 1, Interval.HOUR)
+
+    if seconds:
+        mbg.add_second_window(bars["s"].append, seconds)
+
+    start = perf_counter()
+    for tick in ticks:
+        mbg.update_tick(tick)
+    cost = perf_counter() - start
+
+    return cost, bars
+
+
+def run_minute(ticks: list, generator_class: type) -> float:
+    """"""
+    bars = []
+
+    if generator_class is BarGenerator:
+        bg = BarGenerator(bars.append)
+    else:
+        bg = MultiBarGenerator()
+        bg.add_window(bars.append)
+
+    start = perf_counter()
+    for tick in ticks:
+        bg.update_tick(tick)
+    return perf_counter() - start
+
+
+def check(chained_bars: dict, multi_bars: dict) -> None:
+    """
+    Compare prices of x minute bars. Volume is not compared since window
+    bar of BarGenerator truncates volume into int. Hour bar is not
+    compared since hour bar of BarGenerator also includes the first
+    minute bar of next hour.
+    """
+    for key in [5, 15]:
+        chained = [
+            (b.open_price, b.high_price, b.low_price, b.close_price)
+            for b in chained_bars[key]
+        ]
+        multi = [
+            (b.open_price, b.high_price, b.low_price, b.close_price)
+            for b in multi_bars[key]
+        ]
+        assert chained == multi[:len(chained)], key
+
+
+def main():
+    """"""
+    ticks = create_ticks()
+
+    def output(name, cost):
+        print(f"{name:<36} {TICK_COUNT / cost:>12,.0f} ticks/s")
+
+    output("BarGenerator 1m", run_minute(ticks, BarGenerator))
+    output("MultiBarGenerator 1m", run_minute(ticks, MultiBarGenerator))
+
+    chained_cost, chained_bars = run_chained(ticks)
+    multi_cost, multi_bars = run_multi(ticks)
+    check(chained_bars, multi_bars)
+
+    output("BarGenerator 1m+5m+15m+1h (chained)", chained_cost)
+    output("MultiBarGenerator 1m+5m+15m+1h", multi_cost)
+
+    cost, bars = run_multi(ticks, 1)
+    output("MultiBarGenerator 1s+5m+15m+1h", cost)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark of bar mode CTA backtesting with bundled strategies, in bars/sec.
+
+History data is generated by random walk and set into engine directly,
+so that only the replay is measured. The legacy mode replays a list of
+BarData objects, while the array mode replays history arrays the same
+as loaded by BacktestingEngine.load_data.
+"""
+
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import numpy as np
+
+from vnpy.app.cta_strategy.backtesting import BacktestingEngine
+from vnpy.app.cta_strategy.strategies.atr_rsi_strategy import AtrRsiStrategy
+from vnpy.app.cta_strategy.strategies.boll_channel_strategy import BollChannelStrategy
+from vnpy.app.cta_strategy.strategies.double_ma_strategy import DoubleMaStrategy
+from vnpy.trader.constant import Interval
+
+
+BAR_COUNT = 200_000
+START = datetime(2015, 1, 5, 9, 30)
+
+
+def create_arrays() -> dict:
+    """
+    Generate 1 minute bar arrays of random walk.
+    """
+    rng = np.random.default_rng(0)
+
+    close = 3000 + np.cumsum(rng.normal(0, 2, BAR_COUNT)).round()
+    open_ = np.concatenate([[close[0]], close[:-1]])
+
+    datetimes = np.datetime64(START, "ns") + np.arange(BAR_COUNT) * np.timedelta64(1, "m")
+
+    return {
+        "datetime": datetimes,
+        "open_price": open_,
+        "high_price": np.maximum(open_, close) + 1,
+        "low_price": np.minimum(open_, close) - 1,
+        "close_price": close,
+        "volume": np.full(BAR_COUNT, 10.0),
+        "open_interest": np.zeros(BAR_COUNT),
+    }
+
+
+def create_engine(strategy_class: type) -> BacktestingEngine:
+    """"""
+    engine = BacktestingEngine()
+    engine.output = lambda msg: None
+
+    engine.set_parameters(
+        vt_symbol="IF888.CFFEX",
+        interval=Interval.MINUTE,
+        start=START,
+        end=START + timedelta(minutes=BAR_COUNT),
+        rate=0.3 / 10000,
+        slippage=0.2,
+        size=300,
+        pricetick=0.2,
+        capital=1_000_000,
+    )
+    engine.add_strategy(strategy_class, {})
+
+    return engine
+
+
+def run(strategy_class: type, arrays: dict, bars: list) -> None:
+    """"""
+    engine = create_engine(strategy_class)
+    engine.history_data = bars
+
+    start = perf_counter()
+    engine.run_backtesting()
+    legacy_cost = perf_counter() - start
+    legacy_trades = len(engine.trades)
+
+    engine = create_engine(strategy_class)
+    engine.history_arrays = arrays
+
+    start = perf_counter()
+    engine.run_backtesting()
+    array_cost = perf_counter() - start
+    assert len(engine.trades) == legacy_trades
+
+    print(
+        f"{strategy_class.__name__:<20} "
+        f"legacy {BAR_COUNT / legacy_cost:>10,.0f} bars/s, "
+        f"array {BAR_COUNT / array_cost:>10,.0f} bars/s, "
+        f"trades {legacy_trades}"
+    )
+
+
+def main():
+    """"""
+    arrays = create_arrays()
+
+    # BarData list for legacy mode, created in the same way as history_data
+    engine = create_engine(DoubleMaStrategy)
+    engine.history_arrays = arrays
+    bars = engine.history_data
+
+    for strategy_class in [AtrRsiStrategy, BollChannelStrategy, DoubleMaStrategy]:
+        run(strategy_class, arrays, bars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark of loading 10 years of 1-minute bars from SQLite and
+columnar database.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+os.environ["VNPY_TESTING"] = "1"
+
+from vnpy.trader.constant import Exchange, Interval       # noqa
+from vnpy.trader.database.database import Driver          # noqa
+from vnpy.trader.database import database_columnar, database_sql    # noqa
+from vnpy.trader.object import BarData                    # noqa
+
+
+YEARS = 10
+BARS_PER_DAY = 240
+DAYS_PER_YEAR = 250
+
+
+def create_bars() -> list:
+    """
+    Generate 1-minute bars of trading hours 9:30-11:30, 13:00-15:00.
+    """
+    bars = []
+    day = datetime(2010, 1, 4)
+    price = 3000
+
+    while len(bars) < YEARS * DAYS_PER_YEAR * BARS_PER_DAY:
+        if day.weekday() < 5:
+            for i in range(BARS_PER_DAY):
+                if i < 120:
+                    dt = day.replace(hour=9, minute=30) + timedelta(minutes=i)
+                else:
+                    dt = day.replace(hour=13) + timedelta(minutes=i - 120)
+
+                price += (i % 7) - 3
+                bars.append(BarData(
+                    symbol="IF888",
+                    exchange=Exchange.CFFEX,
+                    datetime=dt,
+                    interval=Interval.MINUTE,
+                    volume=100,
+                    open_interest=1000,
+                    open_price=price,
+                    high_price=price + 2,
+                    low_price=price - 2,
+                    close_price=price + 1,
+                    gateway_name="DB"
+                ))
+        day += timedelta(days=1)
+
+    return bars
+
+
+def run(name: str, manager, bars: list) -> None:
+    """"""
+    start = perf_counter()
+    manager.save_bar_data(bars)
+    save_cost = perf_counter() - start
+
+    args = (
+        "IF888",
+        Exchange.CFFEX,
+        Interval.MINUTE,
+        bars[0].datetime,
+        bars[-1].datetime
+    )
+
+    start = perf_counter()
+    data = manager.load_bar_data(*args)
+    load_cost = perf_counter() - start
+    assert len(data) == len(bars)
+
+    start = perf_counter()
+    arrays = manager.load_bar_arrays(*args)
+    array_cost = perf_counter() - start
+    assert len(arrays["close_price"]) == len(bars)
+
+    print(
+        f"{name:<10} save {save_cost:>8.3f}s, "
+        f"load_bar_data {load_cost:>8.3f}s, "
+        f"load_bar_arrays {array_cost:>8.3f}s"
+    )
+
+
+def main():
+    """"""
+    bars = create_bars()
+    print(f"bars: {len(bars):,}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        settings = {"database": os.path.join(folder, "database.db")}
+        sql_manager = database_sql.init(Driver.SQLITE, settings)
+        run("sqlite", sql_manager, bars)
+
+        settings = {"database": os.path.join(folder, "columnar")}
+        columnar_manager = database_columnar.init(Driver.COLUMNAR, settings)
+        run("columnar", columnar_manager, bars)
+
+        sql_manager.class_bar._meta.database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark of saving bar data into SQL database, in rows/sec.
+
+SQLite in temp folder is used by default. To test MySQL or PostgreSQL,
+pass driver and connection settings as arguments, for example:
+
+    python database_sql.py postgresql vnpy postgres password localhost 5432
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+os.environ["VNPY_TESTING"] = "1"
+
+import numpy as np              # noqa
+from peewee import chunked      # noqa
+
+from vnpy.trader.constant import Exchange, Interval     # noqa
+from vnpy.trader.database.database import Driver        # noqa
+from vnpy.trader.database import database_sql           # noqa
+from vnpy.trader.object import BarData                  # noqa
+
+
+BAR_COUNT = 200_000
+
+
+def create_bars(symbol: str) -> list:
+    """"""
+    start = datetime(2015, 1, 5, 9, 30)
+
+    return [
+        BarData(
+            symbol=symbol,
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=100,
+            open_interest=1000,
+            open_price=3000 + i % 10,
+            high_price=3010,
+            low_price=2990,
+            close_price=3000,
+            gateway_name="DB"
+        )
+        for i in range(BAR_COUNT)
+    ]
+
+
+def save_legacy(manager, driver: Driver, bars: list) -> None:
+    """
+    Save bars in the way before bulk upsert supported.
+    """
+    model = manager.class_bar
+    db = model._meta.database
+    dicts = [model.from_bar(bar).to_dict() for bar in bars]
+
+    with db.atomic():
+        if driver is Driver.POSTGRESQL:
+            for d in dicts:
+                model.insert(d).on_conflict(
+                    update=d,
+                    conflict_target=(
+                        model.symbol,
+                        model.exchange,
+                        model.interval,
+                        model.datetime,
+                    ),
+                ).execute()
+        else:
+            for c in chunked(dicts, 50):
+                model.insert_many(c).on_conflict_replace().execute()
+
+
+def check_arrays(manager) -> None:
+    """
+    Check datetimes of tz-aware bars loaded as arrays are the same wall
+    clock time as those loaded as objects.
+    """
+    bars = create_bars("CHECK")[:10]
+    for i, bar in enumerate(bars):
+        bar.datetime = bar.datetime.replace(
+            microsecond=i * 100000,
+            tzinfo=timezone(timedelta(hours=8 if i % 2 else -5))
+        )
+    manager.save_bar_data(bars)
+
+    start = datetime(2015, 1, 1)
+    end = datetime(2015, 2, 1)
+    objects = manager.load_bar_data("CHECK", Exchange.SHFE, Interval.MINUTE, start, end)
+    arrays = manager.load_bar_arrays("CHECK", Exchange.SHFE, Interval.MINUTE, start, end)
+
+    wall = np.array([bar.datetime.replace(tzinfo=None) for bar in objects], dtype="datetime64[ns]")
+    assert len(objects) == len(bars)
+    assert (arrays["datetime"] == wall).all(), (arrays["datetime"], wall)
+    print("load arrays of tz-aware bars ok")
+
+
+def run(name: str, func, bars: list) -> None:
+    """"""
+    start = perf_counter()
+    func(bars)
+    cost = perf_counter() - start
+    print(f"{name:<24} {len(bars) / cost:>12,.0f} rows/sec")
+
+
+def main():
+    """"""
+    with tempfile.TemporaryDirectory() as folder:
+        if len(sys.argv) > 1:
+            driver = Driver(sys.argv[1])
+            keys = ["database", "user", "password", "host", "port"]
+            settings = dict(zip(keys, sys.argv[2:]))
+            if "port" in settings:
+                settings["port"] = int(settings["port"])
+        else:
+            driver = Driver.SQLITE
+            settings = {"database": os.path.join(folder, "database.db")}
+
+        manager = database_sql.init(driver, settings)
+        print(f"driver: {driver.value}, bars: {BAR_COUNT:,}")
+
+        check_arrays(manager)
+
+        run("legacy insert", lambda bars: save_legacy(manager, driver, bars), create_bars("LEGACY"))
+        run("bulk insert", manager.save_bar_data, create_bars("BULK"))
+        run("bulk upsert (existing)", manager.save_bar_data, create_bars("BULK"))
+
+        for symbol in ["CHECK", "LEGACY", "BULK"]:
+            manager.clean(symbol)
+
+        manager.class_bar._meta.database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark of tick pushing throughput from gateway to event engine.
+
+All gateways push tick data by BaseGateway.on_tick, so the result applies
+to every gateway. The legacy mode pushes one generic event and one event
+of specific vt_symbol per tick, while the keyed mode pushes only one
+event with vt_symbol as routing key.
+"""
+
+from datetime import datetime
+from threading import Event as Signal
+from time import perf_counter
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Exchange
+from vnpy.trader.event import EVENT_TICK
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.object import TickData
+
+
+TICK_COUNT = 200_000
+SYMBOL_COUNT = 50
+SUBSCRIBED_COUNT = 5
+
+
+class BenchmarkGateway(BaseGateway):
+    """
+    Gateway only used for pushing tick data.
+    """
+
+    def connect(self, setting: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def subscribe(self, req) -> None:
+        pass
+
+    def send_order(self, req) -> str:
+        return ""
+
+    def cancel_order(self, req) -> None:
+        pass
+
+    def query_account(self) -> None:
+        pass
+
+    def query_position(self) -> None:
+        pass
+
+
+class LegacyGateway(BenchmarkGateway):
+    """
+    Gateway pushing tick data in the way before routing key supported.
+    """
+
+    def on_tick(self, tick: TickData) -> None:
+        self.on_event(EVENT_TICK, tick)
+        self.on_event(EVENT_TICK + tick.vt_symbol, tick)
+
+
+def run(gateway_class: type, ticks: list) -> float:
+    """
+    Push all ticks and return ticks/sec until all of them are processed.
+    """
+    event_engine = EventEngine()
+    gateway = gateway_class(event_engine, "BENCHMARK")
+
+    finished = Signal()
+    count = 0
+
+    def process_tick_event(event: Event) -> None:
+        nonlocal count
+        count += 1
+        if count == len(ticks):
+            finished.set()
+
+    def process_symbol_event(event: Event) -> None:
+        pass
+
+    event_engine.register(EVENT_TICK, process_tick_event)
+    for tick in ticks[:SUBSCRIBED_COUNT]:
+        event_engine.register(EVENT_TICK + tick.vt_symbol, process_symbol_event)
+
+    event_engine.start()
+
+    start = perf_counter()
+    for tick in ticks:
+        gateway.on_tick(tick)
+    finished.wait()
+    cost = perf_counter() - start
+
+    event_engine.stop()
+    return len(ticks) / cost
+
+
+def main():
+    """"""
+    symbols = [f"SYMBOL{i}" for i in range(SYMBOL_COUNT)]
+    ticks = [
+        TickData(
+            symbol=symbols[i % SYMBOL_COUNT],
+            exchange=Exchange.SHFE,
+            datetime=datetime.now(),
+            last_price=i,
+            gateway_name="BENCHMARK"
+        )
+        for i in range(TICK_COUNT)
+    ]
+
+    legacy = run(LegacyGateway, ticks)
+    keyed = run(BenchmarkGateway, ticks)
+
+    print(f"legacy on_tick (two events): {legacy:,.0f} ticks/sec")
+    print(f"keyed on_tick (one event):   {keyed:,.0f} ticks/sec")
+    print(f"speedup: {keyed / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
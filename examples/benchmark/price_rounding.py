@@ -0,0 +1,168 @@
+"""
+Benchmark of price rounding to price tick, in calls/sec.
+
+Decimal mode is the implementation of round_to/floor_to/ceil_to before
+PriceTick, which converts both arguments by Decimal(str(x)) in every
+call. Array mode rounds the whole numpy array in one call.
+
+Before benchmarking, scalar and array functions are checked to give the
+same results as Decimal mode for random values of different ticks,
+including those on and next to tick and half-tick boundaries.
+"""
+
+from decimal import Decimal
+from math import floor, ceil
+from time import perf_counter
+
+import numpy as np
+
+from vnpy.trader.utility import (
+    round_to,
+    floor_to,
+    ceil_to,
+    round_to_array,
+    floor_to_array,
+    ceil_to_array
+)
+
+
+COUNT = 200_000
+PRICETICK = 0.2
+
+CHECK_COUNT = 20_000
+CHECK_TICKS = [0.001, 0.0025, 0.01, 0.2, 0.5, 1, 5]
+
+
+def decimal_round_to(value: float, target: float) -> float:
+    """"""
+    value = Decimal(str(value))
+    target = Decimal(str(target))
+    return float(int(round(value / target)) * target)
+
+
+def decimal_floor_to(value: float, target: float) -> float:
+    """"""
+    value = Decimal(str(value))
+    target = Decimal(str(target))
+    return float(int(floor(value / target)) * target)
+
+
+def decimal_ceil_to(value: float, target: float) -> float:
+    """"""
+    value = Decimal(str(value))
+    target = Decimal(str(target))
+    return float(int(ceil(value / target)) * target)
+
+
+def create_prices() -> np.ndarray:
+    """
+    Generate prices of spread calculation, half of which are on tick.
+    """
+    rng = np.random.default_rng(0)
+
+    prices = 3000 + rng.normal(0, 100, COUNT)
+    prices[::2] = prices[::2].round() * PRICETICK
+    return prices
+
+
+def create_check_values(rng: np.random.Generator, tick: float) -> np.ndarray:
+    """
+    Generate values around tick multiples, half-tick boundaries (exactly
+    and one float step away), and random prices of various magnitudes.
+    """
+    target = Decimal(str(tick))
+    counts = rng.integers(-10**6, 10**6, CHECK_COUNT)
+
+    multiples = np.array([float(int(c) * target) for c in counts])
+    halves = np.array([float((int(c) + Decimal("0.5")) * target) for c in counts])
+
+    boundaries = np.concatenate([multiples, halves])
+    nearby = np.concatenate([
+        boundaries,
+        np.nextafter(boundaries, np.inf),
+        np.nextafter(boundaries, -np.inf),
+    ])
+
+    # Prices with a few more digits than tick, as from spread calculation
+    scales = 10.0 ** rng.integers(-2, 7, CHECK_COUNT)
+    randoms = rng.uniform(-1, 1, CHECK_COUNT) * scales
+    digits = rng.integers(0, 8, CHECK_COUNT)
+    rounded = np.array([round(v, int(d)) for v, d in zip(randoms, digits)])
+
+    return np.concatenate([nearby, randoms, rounded, [0.0, -0.0]])
+
+
+def check_equivalence() -> None:
+    """
+    Check both scalar and array functions give the same result as
+    Decimal mode.
+    """
+    rng = np.random.default_rng(0)
+
+    funcs = [
+        (decimal_round_to, round_to, round_to_array),
+        (decimal_floor_to, floor_to, floor_to_array),
+        (decimal_ceil_to, ceil_to, ceil_to_array),
+    ]
+
+    for tick in CHECK_TICKS:
+        values = create_check_values(rng, tick)
+        value_list = values.tolist()
+
+        for decimal_func, func, array_func in funcs:
+            expected = [decimal_func(v, tick) for v in value_list]
+
+            results = [func(v, tick) for v in value_list]
+            for value, result, expect in zip(value_list, results, expected):
+                assert result == expect, (func.__name__, tick, value, result, expect)
+
+            results = array_func(values, tick).tolist()
+            for value, result, expect in zip(value_list, results, expected):
+                assert result == expect, (array_func.__name__, tick, value, result, expect)
+
+        print(f"tick {tick:<8} {len(values):>8,} values checked")
+
+
+def run(func, prices: list) -> float:
+    """"""
+    start = perf_counter()
+
+    for price in prices:
+        func(price, PRICETICK)
+
+    return perf_counter() - start
+
+
+def main():
+    """"""
+    check_equivalence()
+
+    prices = create_prices()
+    price_list = prices.tolist()
+
+    funcs = [
+        ("round_to", decimal_round_to, round_to, round_to_array),
+        ("floor_to", decimal_floor_to, floor_to, floor_to_array),
+        ("ceil_to", decimal_ceil_to, ceil_to, ceil_to_array),
+    ]
+
+    for name, decimal_func, func, array_func in funcs:
+        decimal_cost = run(decimal_func, price_list)
+        cost = run(func, price_list)
+
+        start = perf_counter()
+        results = array_func(prices, PRICETICK)
+        array_cost = perf_counter() - start
+
+        assert results.tolist() == [decimal_func(p, PRICETICK) for p in price_list]
+
+        print(
+            f"{name:<10} "
+            f"decimal {COUNT / decimal_cost:>12,.0f} calls/s, "
+            f"tick {COUNT / cost:>12,.0f} calls/s, "
+            f"array {COUNT / array_cost:>14,.0f} values/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Benchmark of pickle and binary serializer for tick data fan-out
+by RpcServer/RpcClient.
+"""
+
+from datetime import datetime, timedelta, timezone
+from threading import Event as Signal
+from time import perf_counter, sleep
+
+from vnpy.event import Event
+from vnpy.rpc import BaseSerializer, BinarySerializer, PickleSerializer, RpcClient, RpcServer
+from vnpy.rpc.serializer import TAG_OBJECT
+from vnpy.trader.constant import Direction, Exchange, Interval, Offset, OrderType, Product, Status
+from vnpy.trader.event import EVENT_TICK
+from vnpy.trader.object import (
+    TickData,
+    BarData,
+    OrderData,
+    TradeData,
+    PositionData,
+    AccountData,
+    LogData,
+    ContractData,
+    SubscribeRequest,
+    OrderRequest,
+    CancelRequest,
+    HistoryRequest
+)
+
+
+CODEC_COUNT = 100_000
+FANOUT_COUNT = 50_000
+
+REP_ADDRESS = "tcp://127.0.0.1:23014"
+PUB_ADDRESS = "tcp://127.0.0.1:24102"
+
+
+def create_event(i: int) -> Event:
+    """"""
+    tick = TickData(
+        symbol="rb2010",
+        exchange=Exchange.SHFE,
+        datetime=datetime.now(),
+        name="螺纹钢2010",
+        volume=100000 + i,
+        open_interest=200000,
+        last_price=3500 + i % 10,
+        bid_price_1=3499,
+        ask_price_1=3501,
+        bid_volume_1=10,
+        ask_volume_1=20,
+        gateway_name="CTP"
+    )
+    return Event(EVENT_TICK, tick, tick.vt_symbol)
+
+
+def create_objects() -> list:
+    """
+    Create one object of every data type registered by
+    register_trader_types, with attributes modified after creation
+    the way gateways do.
+    """
+    dt = datetime(2020, 7, 1, 9, 30, 15, 500000, tzinfo=timezone(timedelta(hours=8)))
+
+    tick = TickData(
+        symbol="rb2010",
+        exchange=Exchange.SHFE,
+        datetime=dt,
+        name="螺纹钢2010",
+        last_price=3500,
+        gateway_name="CTP"
+    )
+    bar = BarData(
+        symbol="rb2010",
+        exchange=Exchange.SHFE,
+        datetime=dt.replace(tzinfo=None),
+        interval=Interval.MINUTE,
+        close_price=3500,
+        gateway_name="CTP"
+    )
+    order = OrderData(
+        symbol="rb2010",
+        exchange=Exchange.SHFE,
+        orderid="1_1_1",
+        type=OrderType.LIMIT,
+        direction=Direction.LONG,
+        offset=Offset.OPEN,
+        price=3500,
+        volume=1,
+        status=Status.SUBMITTING,
+        time="09:30:15",
+        gateway_name="CTP"
+    )
+    order.status = Status.ALLTRADED
+    order.traded = 1
+    trade = TradeData(
+        symbol="rb2010",
+        exchange=Exchange.SHFE,
+        orderid="1_1_1",
+        tradeid="100",
+        direction=Direction.LONG,
+        offset=Offset.OPEN,
+        price=3500,
+        volume=1,
+        time="09:30:15",
+        gateway_name="CTP"
+    )
+    position = PositionData(
+        symbol="rb2010",
+        exchange=Exchange.SHFE,
+        direction=Direction.SHORT,
+        volume=2,
+        gateway_name="CTP"
+    )
+    position.volume += 1
+    account = AccountData(
+        accountid="123456",
+        balance=100,
+        frozen=10,
+        gateway_name="CTP"
+    )
+    account.available = 50
+    log = LogData(msg="连接成功", gateway_name="CTP")
+    contract = ContractData(
+        symbol="rb2010",
+        exchange=Exchange.SHFE,
+        name="螺纹钢2010",
+        product=Product.FUTURES,
+        size=10,
+        pricetick=1,
+        history_data=True,
+        gateway_name="CTP"
+    )
+
+    return [
+        tick,
+        bar,
+        order,
+        trade,
+        position,
+        account,
+        log,
+        contract,
+        SubscribeRequest("rb2010", Exchange.SHFE),
+        OrderRequest("rb2010", Exchange.SHFE, Direction.LONG, OrderType.LIMIT, 1, 3500, Offset.OPEN),
+        CancelRequest("1_1_1", "rb2010", Exchange.SHFE),
+        HistoryRequest("rb2010", Exchange.SHFE, dt, dt, Interval.MINUTE),
+    ]
+
+
+def check_roundtrip(serializer: BaseSerializer) -> None:
+    """
+    Check all attributes of every trader data type are kept after
+    packed and unpacked.
+    """
+    for obj in create_objects():
+        data = serializer.pack(obj)
+        result = serializer.unpack(data)
+        assert type(result) is type(obj), type(obj).__name__
+        assert result.__dict__ == obj.__dict__, (obj.__dict__, result.__dict__)
+
+        # Registered types should not fall back to pickle
+        if isinstance(serializer, BinarySerializer):
+            assert data[0] == TAG_OBJECT, type(obj).__name__
+
+    print(f"{type(serializer).__name__:<18} round-trip ok")
+
+
+def run_codec(serializer: BaseSerializer) -> None:
+    """
+    Measure pack/unpack time of tick event.
+    """
+    event = create_event(0)
+
+    start = perf_counter()
+    for _ in range(CODEC_COUNT):
+        data = serializer.pack(event)
+    pack_cost = perf_counter() - start
+
+    start = perf_counter()
+    for _ in range(CODEC_COUNT):
+        serializer.unpack(data)
+    unpack_cost = perf_counter() - start
+
+    name = type(serializer).__name__
+    print(
+        f"{name:<18} size {len(data):>5} bytes, "
+        f"pack {CODEC_COUNT / pack_cost:>10,.0f}/s, "
+        f"unpack {CODEC_COUNT / unpack_cost:>10,.0f}/s"
+    )
+
+
+def run_fanout(serializer_class: type) -> None:
+    """
+    Measure ticks/sec received by client through PUB/SUB socket.
+    Ticks may be dropped by zmq if client can not catch up with server.
+    """
+    server = RpcServer(serializer_class())
+    server.start(REP_ADDRESS, PUB_ADDRESS)
+
+    finished = Signal()
+    count = 0
+    last = 0
+
+    def callback(topic: str, event: Event) -> None:
+        nonlocal count, last
+        count += 1
+        last = perf_counter()
+        if count == FANOUT_COUNT:
+            finished.set()
+
+    client = RpcClient(serializer_class())
+    client.callback = callback
+    client.subscribe_topic(EVENT_TICK)
+    client.start(REP_ADDRESS, PUB_ADDRESS)
+
+    # Wait for subscription to be established
+    sleep(1)
+
+    events = [create_event(i) for i in range(FANOUT_COUNT)]
+
+    start = perf_counter()
+    for event in events:
+        server.publish(event.type, event)
+
+    # Wait until all received or no more data arriving
+    while not finished.wait(1):
+        if perf_counter() - last > 1:
+            break
+    cost = last - start
+
+    client.stop()
+    client.join()
+    server.stop()
+    server.join()
+
+    name = serializer_class.__name__
+    print(f"{name:<18} fan-out {count / cost:>10,.0f} ticks/s, received {count}")
+
+
+def main():
+    """"""
+    check_roundtrip(PickleSerializer())
+    check_roundtrip(BinarySerializer())
+
+    run_codec(PickleSerializer())
+    run_codec(BinarySerializer())
+
+    run_fanout(PickleSerializer)
+    run_fanout(BinarySerializer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Import tick journal files written by DataRecorder into database.
+
+Run it after market close (or any time without recorder writing the
+same day). Journals of days before today are imported into the database
+configured in vt_setting.json, and renamed with .imported suffix.
+"""
+
+from vnpy.trader.database import database_manager
+from vnpy.trader.utility import get_folder_path
+from vnpy.app.data_recorder.journal import import_journals
+
+
+def main():
+    """"""
+    path = get_folder_path("tick_journal")
+    count = import_journals(path, database_manager)
+    print(f"导入Tick数据{count}条")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+On-disk cache of backtesting and optimization results.
+"""
+
+import hashlib
+import os
+import pickle
+from inspect import getfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from vnpy.trader.utility import get_folder_path
+from vnpy.app.cta_strategy.backtesting import BacktestingEngine
+
+
+CACHE_SUFFIX = ".pkl"
+DEFAULT_MAX_SIZE = 500 * 1024 * 1024        # 500MB
+
+
+class ResultCache:
+    """
+    Results are pickled into one file per key, and least recently used
+    files are removed when total size exceeds max_size.
+    """
+
+    def __init__(self, path: Path = None, max_size: int = DEFAULT_MAX_SIZE):
+        """"""
+        if not path:
+            path = get_folder_path("backtester_cache")
+
+        self.path: Path = Path(path)
+        self.max_size: int = max_size
+
+    def get(self, key: str) -> Any:
+        """
+        Get cached data of key, or None if not found.
+        """
+        filepath = self.get_file_path(key)
+        if not filepath.exists():
+            return None
+
+        try:
+            with open(filepath, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            # Cache file broken or created by incompatible code
+            filepath.unlink()
+            return None
+
+        # Update modified time for least recently used eviction
+        os.utime(filepath)
+        return data
+
+    def put(self, key: str, data: Any) -> None:
+        """"""
+        filepath = self.get_file_path(key)
+        temp_path = filepath.with_suffix(".tmp")
+
+        with open(temp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path.replace(filepath)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove least recently used files until total size within max_size.
+        """
+        files = []
+        total_size = 0
+
+        for filepath in self.path.glob("*" + CACHE_SUFFIX):
+            stat = filepath.stat()
+            files.append((stat.st_mtime, stat.st_size, filepath))
+            total_size += stat.st_size
+
+        files.sort()
+
+        # Keep the latest one even if it is larger than max_size
+        for mtime, size, filepath in files[:-1]:
+            if total_size <= self.max_size:
+                break
+
+            filepath.unlink()
+            total_size -= size
+
+    def clear(self) -> None:
+        """"""
+        for filepath in self.path.glob("*" + CACHE_SUFFIX):
+            filepath.unlink()
+
+    def get_file_path(self, key: str) -> Path:
+        """"""
+        return self.path.joinpath(key + CACHE_SUFFIX)
+
+
+def make_key(*args) -> str:
+    """
+    Make cache key from repr of arguments.
+    """
+    return hashlib.sha1(repr(args).encode("UTF-8")).hexdigest()
+
+
+def get_strategy_digest(strategy_class: type) -> str:
+    """
+    Get digest of strategy source file, so that cached results are not
+    used after strategy code changed.
+    """
+    try:
+        with open(getfile(strategy_class), "rb") as f:
+            data = f.read()
+    except (OSError, TypeError):
+        data = strategy_class.__qualname__.encode("UTF-8")
+
+    return hashlib.sha1(data).hexdigest()
+
+
+def get_data_fingerprint(engine: BacktestingEngine) -> str:
+    """
+    Get fingerprint of history data loaded in backtesting engine.
+
+    Bar history arrays are hashed as a whole, so that data re-downloaded
+    with corrections is also detected. Tick history data is identified by
+    range and count only.
+    """
+    h = hashlib.sha1(repr(engine.get_history_range()).encode("UTF-8"))
+
+    arrays = engine.history_arrays
+    if arrays is not None:
+        for key in sorted(arrays.keys()):
+            array = arrays[key]
+            if array.dtype.kind == "M":
+                array = array.view("i8")
+
+            h.update(key.encode("UTF-8"))
+            h.update(np.ascontiguousarray(array).data)
+
+    return h.hexdigest()
@@ -16,6 +16,13 @@ from vnpy.trader.database import database_manager
 from vnpy.app.cta_strategy import CtaTemplate
 from vnpy.app.cta_strategy.backtesting import BacktestingEngine, OptimizationSetting
 
+from .cache import (
+    ResultCache,
+    make_key,
+    get_strategy_digest,
+    get_data_fingerprint
+)
+
 APP_NAME = "CtaBacktester"
 
 EVENT_BACKTESTER_LOG = "eBacktesterLog"
@@ -43,6 +50,10 @@ class BacktesterEngine(BaseEngine):
         # Optimization result
         self.result_values = None
 
+        # Cache of backtesting and optimization results
+        self.result_cache = None
+        self.use_cache = True
+
     def init_engine(self):
         """"""
         self.write_log("初始化CTA回测引擎")
@@ -54,6 +65,8 @@ class BacktesterEngine(BaseEngine):
         self.load_strategy_class()
         self.write_log("策略文件加载完成")
 
+        self.result_cache = ResultCache()
+
         self.init_rqdata()
 
     def init_rqdata(self):
@@ -167,9 +180,32 @@ class BacktesterEngine(BaseEngine):
         )
 
         engine.load_data()
-        engine.run_backtesting()
-        self.result_df = engine.calculate_result()
-        self.result_statistics = engine.calculate_statistics(output=False)
+
+        # Use cached result if the same backtesting has been run before
+        key = self.get_cache_key("backtesting", strategy_class, setting)
+        result = self.get_cache(key)
+
+        if result:
+            engine.trades.update(result["trades"])
+            engine.limit_orders.update(result["orders"])
+            engine.daily_results.update(result["daily_results"])
+            engine.daily_df = result["df"]
+
+            self.result_df = result["df"]
+            self.result_statistics = result["statistics"]
+            self.write_log("回测结果读取自缓存")
+        else:
+            engine.run_backtesting()
+            self.result_df = engine.calculate_result()
+            self.result_statistics = engine.calculate_statistics(output=False)
+
+            self.put_cache(key, {
+                "df": self.result_df,
+                "statistics": self.result_statistics,
+                "trades": engine.trades,
+                "orders": engine.limit_orders,
+                "daily_results": engine.daily_results
+            })
 
         # Clear thread object handler.
         self.thread = None
@@ -283,14 +319,14 @@ class BacktesterEngine(BaseEngine):
         )
 
         if use_ga:
-            self.result_values = engine.run_ga_optimization(
-                optimization_setting,
-                output=False
+            self.result_values = self.run_ga_optimization(
+                strategy_class,
+                optimization_setting
             )
         else:
-            self.result_values = engine.run_optimization(
-                optimization_setting,
-                output=False
+            self.result_values = self.run_grid_optimization(
+                strategy_class,
+                optimization_setting
             )
 
         # Clear thread object handler.
@@ -301,6 +337,134 @@ class BacktesterEngine(BaseEngine):
         event = Event(EVENT_BACKTESTER_OPTIMIZATION_FINISHED)
         self.event_engine.put(event)
 
+    def run_grid_optimization(
+        self,
+        strategy_class: type,
+        optimization_setting: OptimizationSetting
+    ):
+        """
+        Run exhaustive optimization, with statistics of each setting cached
+        so that only settings not run before are backtested.
+        """
+        engine = self.backtesting_engine
+
+        settings = optimization_setting.generate_setting()
+        target_name = optimization_setting.target_name
+
+        if not settings or not target_name or not self.use_cache:
+            return engine.run_optimization(optimization_setting, output=False)
+
+        engine.load_data()
+
+        key = self.get_cache_key("optimization", strategy_class)
+        cached_statistics = self.get_cache(key) or {}
+
+        new_settings = [s for s in settings if str(s) not in cached_statistics]
+        self.write_log(
+            f"参数组合总数：{len(settings)}，"
+            f"缓存结果数：{len(settings) - len(new_settings)}"
+        )
+
+        if new_settings:
+            results = engine.optimize_settings(new_settings, target_name)
+            for setting_str, target_value, statistics in results:
+                cached_statistics[setting_str] = statistics
+
+            self.put_cache(key, cached_statistics)
+
+        result_values = []
+        for setting in settings:
+            statistics = cached_statistics[str(setting)]
+            result_values.append(
+                (str(setting), statistics[target_name], statistics)
+            )
+
+        result_values.sort(reverse=True, key=lambda result: result[1])
+        return result_values
+
+    def run_ga_optimization(
+        self,
+        strategy_class: type,
+        optimization_setting: OptimizationSetting
+    ):
+        """
+        Run genetic optimization, with final result cached for reopening.
+        Fitness of each setting is cached by backtesting engine itself.
+        """
+        engine = self.backtesting_engine
+
+        if not self.use_cache:
+            return engine.run_ga_optimization(
+                optimization_setting,
+                output=False,
+                use_cache=False
+            )
+
+        engine.load_data()
+
+        key = self.get_cache_key(
+            "ga_optimization",
+            strategy_class,
+            optimization_setting.params,
+            optimization_setting.target_name
+        )
+        result_values = self.get_cache(key)
+
+        if result_values:
+            self.write_log("优化结果读取自缓存")
+        else:
+            result_values = engine.run_ga_optimization(
+                optimization_setting,
+                output=False
+            )
+
+            if result_values:
+                self.put_cache(key, result_values)
+
+        return result_values
+
+    def get_cache_key(self, name: str, strategy_class: type, *args) -> str:
+        """
+        Get cache key of strategy code, engine parameters and loaded data.
+        """
+        engine = self.backtesting_engine
+
+        parameters = engine.get_parameters()
+        parameters.pop("start")
+        parameters.pop("end")
+
+        return make_key(
+            name,
+            strategy_class.__name__,
+            get_strategy_digest(strategy_class),
+            sorted((k, str(v)) for k, v in parameters.items()),
+            get_data_fingerprint(engine),
+            *args
+        )
+
+    def get_cache(self, key: str):
+        """"""
+        if not self.use_cache or not self.result_cache:
+            return None
+        return self.result_cache.get(key)
+
+    def put_cache(self, key: str, data) -> None:
+        """"""
+        if not self.use_cache or not self.result_cache:
+            return
+
+        try:
+            self.result_cache.put(key, data)
+        except Exception:
+            msg = f"回测结果缓存失败，触发异常：\n{traceback.format_exc()}"
+            self.write_log(msg)
+
+    def clear_cache(self) -> None:
+        """"""
+        if self.result_cache:
+            self.result_cache.clear()
+            self.write_log("回测结果缓存已清空")
+
     def start_optimization(
         self,
         class_name: str,
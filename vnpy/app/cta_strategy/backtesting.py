@@ -1,11 +1,17 @@
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Callable
+from typing import Callable, Dict, List
 from itertools import product
 from functools import lru_cache
+from pathlib import Path
 from time import time
+import hashlib
+import inspect
+import json
 import multiprocessing
 import random
+import shutil
+import tempfile
 import traceback
 
 import numpy as np
@@ -18,7 +24,7 @@ from vnpy.trader.constant import (Direction, Offset, Exchange,
                                   Interval, Status)
 from vnpy.trader.database import database_manager
 from vnpy.trader.object import OrderData, TradeData, BarData, TickData
-from vnpy.trader.utility import round_to
+from vnpy.trader.utility import round_to, get_folder_path
 
 from .base import (
     BacktestingMode,
@@ -130,7 +136,11 @@ class BacktestingEngine:
         self.interval = None
         self.days = 0
         self.callback = None
-        self.history_data = []
+
+        # History data of bar mode is kept in numpy arrays, and BarData
+        # objects are only created when replaying or requested.
+        self.history_arrays: Dict[str, np.ndarray] = None
+        self._history_data: List = []
 
         self.stop_order_count = 0
         self.stop_orders = {}
@@ -143,6 +153,11 @@ class BacktestingEngine:
         self.trade_count = 0
         self.trades = {}
 
+        # Price bounds of active orders for skipping order matching, which
+        # are reset to None whenever active orders changed.
+        self.limit_order_bounds = None
+        self.stop_order_bounds = None
+
         self.logs = []
 
         self.daily_results = {}
@@ -168,9 +183,30 @@ class BacktestingEngine:
         self.trade_count = 0
         self.trades.clear()
 
+        self.limit_order_bounds = None
+        self.stop_order_bounds = None
+
         self.logs.clear()
         self.daily_results.clear()
 
+    @property
+    def history_data(self) -> list:
+        """
+        History data in BarData/TickData objects.
+        """
+        if not self._history_data and self.history_arrays is not None:
+            count = len(self.history_arrays["datetime"])
+            self._history_data = list(self.iter_bars(0, count))
+        return self._history_data
+
+    @history_data.setter
+    def history_data(self, data: list) -> None:
+        """
+        Set history data directly, which is used instead of loaded arrays.
+        """
+        self._history_data = data
+        self.history_arrays = None
+
     def set_parameters(
         self,
         vt_symbol: str,
@@ -203,6 +239,41 @@ class BacktestingEngine:
         self.mode = mode
         self.inverse = inverse
 
+    def get_parameters(self) -> dict:
+        """
+        Get parameters for creating another engine with the same setting.
+        """
+        return {
+            "vt_symbol": self.vt_symbol,
+            "interval": self.interval,
+            "start": self.start,
+            "end": self.end,
+            "rate": self.rate,
+            "slippage": self.slippage,
+            "size": self.size,
+            "pricetick": self.pricetick,
+            "capital": self.capital,
+            "mode": self.mode,
+            "inverse": self.inverse
+        }
+
+    def get_history_range(self) -> tuple:
+        """
+        Get first datetime, last datetime and count of loaded history data.
+        """
+        if self.history_arrays is not None:
+            datetimes = self.history_arrays["datetime"]
+            if not len(datetimes):
+                return (None, None, 0)
+            first, last = datetimes[[0, -1]].astype("datetime64[us]").tolist()
+            return (first, last, len(datetimes))
+
+        if not self._history_data:
+            return (None, None, 0)
+
+        data = self._history_data
+        return (data[0].datetime, data[-1].datetime, len(data))
+
     def add_strategy(self, strategy_class: type, setting: dict):
         """"""
         self.strategy_class = strategy_class
@@ -221,7 +292,10 @@ class BacktestingEngine:
             self.output("起始日期必须小于结束日期")
             return
 
-        self.history_data.clear()       # Clear previously loaded history data
+        # Clear previously loaded history data
+        self._history_data = []
+        self.history_arrays = None
+        chunks = []
 
         # Load 30 days of data each time and allow for progress update
         progress_delta = timedelta(days=30)
@@ -236,13 +310,14 @@ class BacktestingEngine:
             end = min(end, self.end)  # Make sure end time stays within set range
 
             if self.mode == BacktestingMode.BAR:
-                data = load_bar_data(
+                arrays = load_bar_arrays(
                     self.symbol,
                     self.exchange,
                     self.interval,
                     start,
                     end
                 )
+                chunks.append(arrays)
             else:
                 data = load_tick_data(
                     self.symbol,
@@ -250,8 +325,7 @@ class BacktestingEngine:
                     start,
                     end
                 )
-
-            self.history_data.extend(data)
+                self._history_data.extend(data)
 
             progress += progress_delta / total_delta
             progress = min(progress, 1)
@@ -261,10 +335,23 @@ class BacktestingEngine:
             start = end + interval_delta
             end += (progress_delta + interval_delta)
 
-        self.output(f"历史数据加载完成，数据量：{len(self.history_data)}")
+        if self.mode == BacktestingMode.BAR:
+            self.history_arrays = {
+                key: np.concatenate([arrays[key] for arrays in chunks])
+                for key in chunks[0].keys()
+            }
+            count = len(self.history_arrays["datetime"])
+        else:
+            count = len(self._history_data)
+
+        self.output(f"历史数据加载完成，数据量：{count}")
 
     def run_backtesting(self):
         """"""
+        if self.mode == BacktestingMode.BAR and self.history_arrays is not None:
+            self.run_bar_arrays()
+            return
+
         if self.mode == BacktestingMode.BAR:
             func = self.new_bar
         else:
@@ -309,6 +396,189 @@ class BacktestingEngine:
 
         self.output("历史数据回放结束")
 
+    def run_bar_arrays(self):
+        """
+        Replay bar data from history arrays.
+
+        BarData object is created just before pushed to strategy, order
+        matching is skipped when there is no active order, and daily close
+        prices are calculated after replay from arrays.
+        """
+        self.strategy.on_init()
+
+        # Use the first [days] of history data for initializing strategy
+        days = self.history_arrays["datetime"].astype("datetime64[D]")
+        day_changes = np.flatnonzero(days[1:] != days[:-1]) + 1
+
+        n = max(self.days, 1) - 1
+        if n < len(day_changes):
+            ix = day_changes[n]
+        else:
+            ix = max(len(days) - 1, 0)
+
+        for bar in self.iter_bars(0, ix):
+            self.datetime = bar.datetime
+
+            try:
+                self.callback(bar)
+            except Exception:
+                self.output("触发异常，回测终止")
+                self.output(traceback.format_exc())
+                return
+
+        self.strategy.inited = True
+        self.output("策略初始化完成")
+
+        self.strategy.on_start()
+        self.strategy.trading = True
+        self.output("开始回放历史数据")
+
+        # Use the rest of history data for running backtesting
+        on_bar = self.strategy.on_bar
+        end = ix
+
+        try:
+            for bar in self.iter_bars(ix, len(days)):
+                self.bar = bar
+                self.datetime = bar.datetime
+
+                if self.active_limit_orders:
+                    bounds = self.limit_order_bounds or self.get_limit_order_bounds()
+                    submitting, long_price, short_price = bounds
+
+                    if (
+                        submitting
+                        or bar.low_price <= long_price
+                        or bar.high_price >= short_price
+                    ):
+                        self.cross_limit_order()
+
+                if self.active_stop_orders:
+                    bounds = self.stop_order_bounds or self.get_stop_order_bounds()
+                    long_price, short_price = bounds
+
+                    if bar.high_price >= long_price or bar.low_price <= short_price:
+                        self.cross_stop_order()
+
+                on_bar(bar)
+
+                end += 1
+        except Exception:
+            self.output("触发异常，回测终止")
+            self.output(traceback.format_exc())
+            return
+        finally:
+            self.update_daily_closes(ix, end)
+
+        self.output("历史数据回放结束")
+
+    def get_limit_order_bounds(self) -> tuple:
+        """
+        Get whether any limit order is submitting, highest price of long
+        orders and lowest price of short orders.
+        """
+        submitting = False
+        long_price = -np.inf
+        short_price = np.inf
+
+        for order in self.active_limit_orders.values():
+            if order.status == Status.SUBMITTING:
+                submitting = True
+
+            if order.direction == Direction.LONG:
+                long_price = max(long_price, order.price)
+            else:
+                short_price = min(short_price, order.price)
+
+        self.limit_order_bounds = (submitting, long_price, short_price)
+        return self.limit_order_bounds
+
+    def get_stop_order_bounds(self) -> tuple:
+        """
+        Get lowest price of long stop orders and highest price of short
+        stop orders.
+        """
+        long_price = np.inf
+        short_price = -np.inf
+
+        for stop_order in self.active_stop_orders.values():
+            if stop_order.direction == Direction.LONG:
+                long_price = min(long_price, stop_order.price)
+            else:
+                short_price = max(short_price, stop_order.price)
+
+        self.stop_order_bounds = (long_price, short_price)
+        return self.stop_order_bounds
+
+    def iter_bars(self, start: int, end: int, chunk_size: int = 10000):
+        """
+        Iterate BarData objects created from history arrays within
+        [start, end), chunk by chunk to limit memory usage.
+        """
+        arrays = self.history_arrays
+        names = [
+            "volume",
+            "open_interest",
+            "open_price",
+            "high_price",
+            "low_price",
+            "close_price"
+        ]
+
+        symbol = self.symbol
+        exchange = self.exchange
+        interval = self.interval
+        vt_symbol = f"{symbol}.{exchange.value}"
+        new = object.__new__
+
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+
+            datetimes = arrays["datetime"][chunk_start:chunk_end].astype("datetime64[us]").tolist()
+            columns = [arrays[name][chunk_start:chunk_end].tolist() for name in names]
+
+            for dt, values in zip(datetimes, zip(*columns)):
+                volume, open_interest, open_price, high_price, low_price, close_price = values
+
+                # Set fields directly instead of calling dataclass __init__,
+                # which takes most of the time of creating bar object.
+                bar = new(BarData)
+                bar.__dict__ = {
+                    "gateway_name": "DB",
+                    "symbol": symbol,
+                    "exchange": exchange,
+                    "datetime": dt,
+                    "interval": interval,
+                    "volume": volume,
+                    "open_interest": open_interest,
+                    "open_price": open_price,
+                    "high_price": high_price,
+                    "low_price": low_price,
+                    "close_price": close_price,
+                    "vt_symbol": vt_symbol
+                }
+                yield bar
+
+    def update_daily_closes(self, start: int, end: int):
+        """
+        Update daily close prices of bars within [start, end) from arrays.
+        """
+        if start >= end:
+            return
+
+        days = self.history_arrays["datetime"][start:end].astype("datetime64[D]")
+        closes = self.history_arrays["close_price"][start:end]
+
+        # Index of last bar of each day
+        last_ix = np.flatnonzero(np.append(days[1:] != days[:-1], True))
+
+        for d, price in zip(days[last_ix].tolist(), closes[last_ix].tolist()):
+            daily_result = self.daily_results.get(d, None)
+            if daily_result:
+                daily_result.close_price = price
+            else:
+                self.daily_results[d] = DailyResult(d, price)
+
     def calculate_result(self):
         """"""
         self.output("开始计算逐日盯市盈亏")
@@ -549,7 +819,12 @@ class BacktestingEngine:
 
         plt.show()
 
-    def run_optimization(self, optimization_setting: OptimizationSetting, output=True):
+    def run_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        output=True,
+        max_workers: int = None
+    ):
         """"""
         # Get optimization setting and target
         settings = optimization_setting.generate_setting()
@@ -563,36 +838,9 @@ class BacktestingEngine:
             self.output("优化目标未设置，请检查")
             return
 
-        # Use multiprocessing pool for running backtesting with different setting
-        # Force to use spawn method to create new process (instead of fork on Linux)
-        ctx = multiprocessing.get_context("spawn")
-        pool = ctx.Pool(multiprocessing.cpu_count())
-
-        results = []
-        for setting in settings:
-            result = (pool.apply_async(optimize, (
-                target_name,
-                self.strategy_class,
-                setting,
-                self.vt_symbol,
-                self.interval,
-                self.start,
-                self.rate,
-                self.slippage,
-                self.size,
-                self.pricetick,
-                self.capital,
-                self.end,
-                self.mode,
-                self.inverse
-            )))
-            results.append(result)
-
-        pool.close()
-        pool.join()
+        result_values = self.optimize_settings(settings, target_name, max_workers)
 
         # Sort results and output
-        result_values = [result.get() for result in results]
         result_values.sort(reverse=True, key=lambda result: result[1])
 
         if output:
@@ -602,7 +850,66 @@ class BacktestingEngine:
 
         return result_values
 
-    def run_ga_optimization(self, optimization_setting: OptimizationSetting, population_size=100, ngen_size=30, output=True):
+    def optimize_settings(
+        self,
+        settings: List[dict],
+        target_name: str,
+        max_workers: int = None
+    ) -> list:
+        """
+        Run backtesting with each setting in multiprocessing pool, and
+        return results in the same order.
+        """
+        # Load history data only once in main process, and share it with
+        # worker processes by memory mapped files
+        context = self.create_optimization_context(target_name)
+
+        # Use multiprocessing pool for running backtesting with different setting
+        # Force to use spawn method to create new process (instead of fork on Linux)
+        processes = max_workers or multiprocessing.cpu_count()
+        chunksize = max(len(settings) // (processes * 4), 1)
+
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(
+            processes,
+            initializer=init_optimization_process,
+            initargs=(context,)
+        )
+
+        try:
+            return pool.map(run_optimization_task, settings, chunksize)
+        finally:
+            pool.close()
+            pool.join()
+            context.release()
+
+    def create_optimization_context(self, target_name: str) -> "OptimizationContext":
+        """
+        Load history data and create context for optimization processes.
+        """
+        self.load_data()
+
+        history_path = ""
+        if self.history_arrays is not None:
+            history_path = dump_history_arrays(self.history_arrays)
+
+        return OptimizationContext(
+            target_name,
+            self.strategy_class,
+            self.get_parameters(),
+            self.get_history_range(),
+            history_path
+        )
+
+    def run_ga_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        population_size=100,
+        ngen_size=30,
+        output=True,
+        max_workers: int = None,
+        use_cache: bool = True
+    ):
         """"""
         # Get optimization setting and target
         settings = optimization_setting.generate_setting_ga()
@@ -630,36 +937,46 @@ class BacktestingEngine:
                     individual[i] = paramlist[i]
             return individual,
 
-        # Create ga object function
-        global ga_target_name
-        global ga_strategy_class
-        global ga_setting
-        global ga_vt_symbol
-        global ga_interval
-        global ga_start
-        global ga_rate
-        global ga_slippage
-        global ga_size
-        global ga_pricetick
-        global ga_capital
-        global ga_end
-        global ga_mode
-        global ga_inverse
-
-        ga_target_name = target_name
-        ga_strategy_class = self.strategy_class
-        ga_setting = settings[0]
-        ga_vt_symbol = self.vt_symbol
-        ga_interval = self.interval
-        ga_start = self.start
-        ga_rate = self.rate
-        ga_slippage = self.slippage
-        ga_size = self.size
-        ga_pricetick = self.pricetick
-        ga_capital = self.capital
-        ga_end = self.end
-        ga_mode = self.mode
-        ga_inverse = self.inverse
+        # Load history data only once in main process, and share it with
+        # worker processes by memory mapped files
+        context = self.create_optimization_context(target_name)
+
+        # Fitness values already evaluated, also saved on disk so that
+        # running again with the same strategy and data can reuse them
+        if use_cache:
+            cache_path = get_fitness_cache_path(context)
+            fitness_cache = load_fitness_cache(cache_path)
+        else:
+            cache_path = None
+            fitness_cache = {}
+
+        # Evaluate individuals not in cache by multiprocessing pool
+        processes = max_workers or multiprocessing.cpu_count()
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(
+            processes,
+            initializer=init_optimization_process,
+            initargs=(context,)
+        )
+
+        def map_fitness(func, individuals):
+            """"""
+            keys = [str(dict(individual)) for individual in individuals]
+
+            new_settings = {}
+            for key, individual in zip(keys, individuals):
+                if key not in fitness_cache:
+                    new_settings[key] = dict(individual)
+
+            if new_settings:
+                chunksize = max(len(new_settings) // (processes * 4), 1)
+                values = pool.map(func, new_settings.values(), chunksize)
+                fitness_cache.update(zip(new_settings.keys(), values))
+
+                if cache_path:
+                    save_fitness_cache(cache_path, fitness_cache)
+
+            return [(fitness_cache[key],) for key in keys]
 
         # Set up genetic algorithem
         toolbox = base.Toolbox()
@@ -667,8 +984,9 @@ class BacktestingEngine:
         toolbox.register("population", tools.initRepeat, list, toolbox.individual)
         toolbox.register("mate", tools.cxTwoPoint)
         toolbox.register("mutate", mutate_individual, indpb=1)
-        toolbox.register("evaluate", ga_optimize)
+        toolbox.register("evaluate", run_ga_task)
         toolbox.register("select", tools.selNSGA2)
+        toolbox.register("map", map_fitness)
 
         total_size = len(settings)
         pop_size = population_size                      # number of individuals in each generation
@@ -689,10 +1007,6 @@ class BacktestingEngine:
         stats.register("min", np.min, axis=0)
         stats.register("max", np.max, axis=0)
 
-        # Multiprocessing is not supported yet.
-        # pool = multiprocessing.Pool(multiprocessing.cpu_count())
-        # toolbox.register("map", pool.map)
-
         # Run ga optimization
         self.output(f"参数优化空间：{total_size}")
         self.output(f"每代族群总数：{pop_size}")
@@ -700,20 +1014,26 @@ class BacktestingEngine:
         self.output(f"迭代次数：{ngen}")
         self.output(f"交叉概率：{cxpb:.0%}")
         self.output(f"突变概率：{mutpb:.0%}")
+        self.output(f"已缓存结果：{len(fitness_cache)}")
 
         start = time()
 
-        algorithms.eaMuPlusLambda(
-            pop,
-            toolbox,
-            mu,
-            lambda_,
-            cxpb,
-            mutpb,
-            ngen,
-            stats,
-            halloffame=hof
-        )
+        try:
+            algorithms.eaMuPlusLambda(
+                pop,
+                toolbox,
+                mu,
+                lambda_,
+                cxpb,
+                mutpb,
+                ngen,
+                stats,
+                halloffame=hof
+            )
+        finally:
+            pool.close()
+            pool.join()
+            context.release()
 
         end = time()
         cost = int((end - start))
@@ -725,7 +1045,7 @@ class BacktestingEngine:
 
         for parameter_values in hof:
             setting = dict(parameter_values)
-            target_value = ga_optimize(parameter_values)[0]
+            target_value = parameter_values.fitness.values[0]
             results.append((setting, target_value, {}))
 
         return results
@@ -766,6 +1086,8 @@ class BacktestingEngine:
         """
         Cross limit order with last bar/tick data.
         """
+        self.limit_order_bounds = None
+
         if self.mode == BacktestingMode.BAR:
             long_cross_price = self.bar.low_price
             short_cross_price = self.bar.high_price
@@ -839,6 +1161,8 @@ class BacktestingEngine:
         """
         Cross stop order with last bar/tick data.
         """
+        self.stop_order_bounds = None
+
         if self.mode == BacktestingMode.BAR:
             long_cross_price = self.bar.high_price
             short_cross_price = self.bar.low_price
@@ -980,6 +1304,7 @@ class BacktestingEngine:
 
         self.active_stop_orders[stop_order.stop_orderid] = stop_order
         self.stop_orders[stop_order.stop_orderid] = stop_order
+        self.stop_order_bounds = None
 
         return stop_order.stop_orderid
 
@@ -1008,6 +1333,7 @@ class BacktestingEngine:
 
         self.active_limit_orders[order.vt_orderid] = order
         self.limit_orders[order.vt_orderid] = order
+        self.limit_order_bounds = None
 
         return order.vt_orderid
 
@@ -1025,6 +1351,7 @@ class BacktestingEngine:
         if vt_orderid not in self.active_stop_orders:
             return
         stop_order = self.active_stop_orders.pop(vt_orderid)
+        self.stop_order_bounds = None
 
         stop_order.status = StopOrderStatus.CANCELLED
         self.strategy.on_stop_order(stop_order)
@@ -1034,6 +1361,7 @@ class BacktestingEngine:
         if vt_orderid not in self.active_limit_orders:
             return
         order = self.active_limit_orders.pop(vt_orderid)
+        self.limit_order_bounds = None
 
         order.status = Status.CANCELLED
         self.strategy.on_order(order)
@@ -1200,78 +1528,179 @@ class DailyResult:
         self.net_pnl = self.total_pnl - self.commission - self.slippage
 
 
-def optimize(
-    target_name: str,
-    strategy_class: CtaTemplate,
-    setting: dict,
-    vt_symbol: str,
-    interval: Interval,
-    start: datetime,
-    rate: float,
-    slippage: float,
-    size: float,
-    pricetick: float,
-    capital: int,
-    end: datetime,
-    mode: BacktestingMode,
-    inverse: bool
-):
+class OptimizationContext:
     """
-    Function for running in multiprocessing.pool
+    Picklable context for running backtesting with different setting in
+    optimization processes.
+
+    Bar history arrays are shared by memory mapped files in history_path,
+    so that every process attaches to the same data instead of loading it
+    from database again. Tick history data is loaded once per process.
     """
-    engine = BacktestingEngine()
-
-    engine.set_parameters(
-        vt_symbol=vt_symbol,
-        interval=interval,
-        start=start,
-        rate=rate,
-        slippage=slippage,
-        size=size,
-        pricetick=pricetick,
-        capital=capital,
-        end=end,
-        mode=mode,
-        inverse=inverse
-    )
 
-    engine.add_strategy(strategy_class, setting)
-    engine.load_data()
-    engine.run_backtesting()
-    engine.calculate_result()
-    statistics = engine.calculate_statistics(output=False)
+    def __init__(
+        self,
+        target_name: str,
+        strategy_class: type,
+        parameters: dict,
+        history_range: tuple,
+        history_path: str = ""
+    ):
+        """"""
+        self.target_name: str = target_name
+        self.strategy_class: type = strategy_class
+        self.parameters: dict = parameters
+        self.history_range: tuple = history_range
+        self.history_path: str = history_path
+
+        self.engine: BacktestingEngine = None
 
-    target_value = statistics[target_name]
-    return (str(setting), target_value, statistics)
+    def __getstate__(self) -> dict:
+        """
+        Engine is created again in each process.
+        """
+        state = self.__dict__.copy()
+        state["engine"] = None
+        return state
 
+    def get_engine(self) -> BacktestingEngine:
+        """"""
+        if not self.engine:
+            engine = BacktestingEngine()
+            engine.set_parameters(**self.parameters)
 
-@lru_cache(maxsize=1000000)
-def _ga_optimize(parameter_values: tuple):
-    """"""
-    setting = dict(parameter_values)
-
-    result = optimize(
-        ga_target_name,
-        ga_strategy_class,
-        setting,
-        ga_vt_symbol,
-        ga_interval,
-        ga_start,
-        ga_rate,
-        ga_slippage,
-        ga_size,
-        ga_pricetick,
-        ga_capital,
-        ga_end,
-        ga_mode,
-        ga_inverse
-    )
-    return (result[1],)
+            if self.history_path:
+                engine.history_arrays = attach_history_arrays(self.history_path)
+            else:
+                engine.load_data()
+
+            self.engine = engine
+
+        return self.engine
+
+    def evaluate(self, setting: dict) -> tuple:
+        """
+        Run backtesting with strategy setting and return result.
+        """
+        engine = self.get_engine()
+        engine.clear_data()
+
+        engine.add_strategy(self.strategy_class, setting)
+        engine.run_backtesting()
+        engine.calculate_result()
+        statistics = engine.calculate_statistics(output=False)
 
+        target_value = statistics[self.target_name]
+        return (str(setting), target_value, statistics)
 
-def ga_optimize(parameter_values: list):
+    def release(self) -> None:
+        """
+        Remove shared history data files.
+        """
+        self.engine = None
+
+        if self.history_path:
+            shutil.rmtree(self.history_path, ignore_errors=True)
+            self.history_path = ""
+
+
+def dump_history_arrays(arrays: Dict[str, np.ndarray]) -> str:
+    """
+    Save history arrays into npy files of a new temp folder.
+    """
+    path = tempfile.mkdtemp(prefix="vnpy_history_")
+
+    for key, array in arrays.items():
+        np.save(Path(path).joinpath(f"{key}.npy"), array)
+
+    return path
+
+
+def attach_history_arrays(path: str) -> Dict[str, np.ndarray]:
+    """
+    Open history arrays saved by dump_history_arrays as read-only memory
+    map, so that the data is shared by all processes.
+    """
+    return {
+        filepath.stem: np.load(filepath, mmap_mode="r")
+        for filepath in Path(path).glob("*.npy")
+    }
+
+
+def init_optimization_process(context: OptimizationContext) -> None:
+    """
+    Initializer of optimization process pool.
+    """
+    global optimization_context
+    optimization_context = context
+
+
+def run_optimization_task(setting: dict) -> tuple:
+    """
+    Function for running in optimization process pool.
+    """
+    return optimization_context.evaluate(setting)
+
+
+def run_ga_task(setting: dict) -> float:
+    """
+    Function for evaluating fitness in optimization process pool.
+    """
+    return float(optimization_context.evaluate(setting)[1])
+
+
+def get_fitness_cache_path(context: OptimizationContext) -> Path:
+    """
+    Get path of fitness cache file, which is identified by strategy class
+    (including its source code), optimization target, engine parameters
+    except start/end, and range of loaded history data.
+    """
+    strategy_class = context.strategy_class
+    try:
+        source = inspect.getsource(strategy_class)
+    except (OSError, TypeError):
+        source = ""
+
+    parameters = dict(context.parameters)
+    parameters.pop("start")
+    parameters.pop("end")
+
+    key = repr((
+        strategy_class.__module__,
+        strategy_class.__qualname__,
+        source,
+        context.target_name,
+        sorted((k, str(v)) for k, v in parameters.items()),
+        [str(v) for v in context.history_range]
+    ))
+    digest = hashlib.sha1(key.encode("UTF-8")).hexdigest()
+
+    return get_folder_path("ga_cache").joinpath(f"{digest}.json")
+
+
+def load_fitness_cache(filepath: Path) -> Dict[str, float]:
     """"""
-    return _ga_optimize(tuple(parameter_values))
+    if not filepath.exists():
+        return {}
+
+    try:
+        with open(filepath, mode="r", encoding="UTF-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def save_fitness_cache(filepath: Path, data: Dict[str, float]) -> None:
+    """
+    Save fitness cache by replacing the file, so that it is never left
+    half written.
+    """
+    temp_path = filepath.with_suffix(".tmp")
+
+    with open(temp_path, mode="w+", encoding="UTF-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+    temp_path.replace(filepath)
 
 
 @lru_cache(maxsize=999)
@@ -1288,6 +1717,20 @@ def load_bar_data(
     )
 
 
+@lru_cache(maxsize=999)
+def load_bar_arrays(
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval,
+    start: datetime,
+    end: datetime
+):
+    """"""
+    return database_manager.load_bar_arrays(
+        symbol, exchange, interval, start, end
+    )
+
+
 @lru_cache(maxsize=999)
 def load_tick_data(
     symbol: str,
@@ -1301,17 +1744,5 @@ def load_tick_data(
     )
 
 
-# GA related global value
-ga_end = None
-ga_mode = None
-ga_target_name = None
-ga_strategy_class = None
-ga_setting = None
-ga_vt_symbol = None
-ga_interval = None
-ga_start = None
-ga_rate = None
-ga_slippage = None
-ga_size = None
-ga_pricetick = None
-ga_capital = None
+# Context of optimization process
+optimization_context: OptimizationContext = None
@@ -0,0 +1,100 @@
+"""
+Aggregation of 1 minute bars into hour and daily bars for recording.
+"""
+
+from datetime import datetime, time, timedelta
+from typing import Callable, Optional
+
+from vnpy.trader.constant import Interval
+from vnpy.trader.object import BarData
+from vnpy.trader.utility import get_daily_end
+
+
+MINUTE = timedelta(minutes=1)
+
+AGGREGATE_INTERVALS = [Interval.HOUR, Interval.DAILY]
+
+
+class BarAggregator:
+    """
+    Aggregate 1 minute bars into bar of larger interval incrementally.
+
+    Hour bar is finished by the minute bar ending at the hour, or by the
+    first minute bar of a new hour if the ending one is missing.
+
+    Daily bar is finished by the minute bar ending at daily_end, or by the
+    first minute bar after daily_end. Night session before daily_end (e.g.
+    21:00 on Friday for futures) belongs to the next trading day, and its
+    datetime is set to 00:00 of the trading day. Weekends are skipped but
+    holidays are not known, so night session before a holiday is counted
+    into a trading day after the holiday.
+    """
+
+    def __init__(
+        self,
+        interval: Interval,
+        on_bar: Callable,
+        daily_end: time = time(15, 0)
+    ):
+        """"""
+        if interval not in AGGREGATE_INTERVALS:
+            raise ValueError(f"不支持的K线聚合周期：{interval}")
+
+        self.interval: Interval = interval
+        self.on_bar: Callable = on_bar
+        self.daily_end: time = daily_end
+
+        self.bar: Optional[BarData] = None
+        self.end: Optional[datetime] = None
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update new 1 minute bar into aggregator.
+        """
+        # Finish current bar if new one is out of its range
+        if self.bar and bar.datetime >= self.end:
+            self.finish()
+
+        if not self.bar:
+            self.end = self.get_end(bar.datetime)
+
+            if self.interval == Interval.HOUR:
+                dt = bar.datetime.replace(minute=0, second=0, microsecond=0)
+            else:
+                dt = self.end.replace(hour=0, minute=0, second=0, microsecond=0)
+
+            self.bar = BarData(
+                symbol=bar.symbol,
+                exchange=bar.exchange,
+                datetime=dt,
+                interval=self.interval,
+                gateway_name=bar.gateway_name,
+                open_price=bar.open_price,
+                high_price=bar.high_price,
+                low_price=bar.low_price
+            )
+        else:
+            self.bar.high_price = max(self.bar.high_price, bar.high_price)
+            self.bar.low_price = min(self.bar.low_price, bar.low_price)
+
+        self.bar.close_price = bar.close_price
+        self.bar.volume += bar.volume
+        self.bar.open_interest = bar.open_interest
+
+        if bar.datetime + MINUTE >= self.end:
+            self.finish()
+
+    def get_end(self, dt: datetime) -> datetime:
+        """
+        Get end datetime of the bar which dt belongs to.
+        """
+        if self.interval == Interval.HOUR:
+            return dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+        return get_daily_end(dt, self.daily_end)
+
+    def finish(self) -> None:
+        """"""
+        bar = self.bar
+        self.bar = None
+        self.on_bar(bar)
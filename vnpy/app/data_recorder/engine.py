@@ -4,13 +4,17 @@
 使用DR_setting.json来配置需要收集的合约，以及主力合约代码。
 '''
 import sys
+import traceback
 from threading import Thread
 from queue import Queue, Empty
 from copy import copy
+from datetime import datetime
+from time import time
+from typing import Dict, List
 
 from vnpy.event import Event, EventEngine
 from vnpy.trader.engine import BaseEngine, MainEngine
-from vnpy.trader.constant import Exchange
+from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import (
     SubscribeRequest,
     TickData,
@@ -18,10 +22,13 @@ from vnpy.trader.object import (
     ContractData
 )
 from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT
-from vnpy.trader.utility import load_json, save_json, BarGenerator
+from vnpy.trader.utility import load_json, save_json, get_folder_path, BarGenerator
 from vnpy.trader.database import database_manager
 from vnpy.app.spread_trading.base import EVENT_SPREAD_DATA, SpreadData
 
+from .aggregator import BarAggregator
+from .journal import TickJournal, FSYNC_INTERVAL
+
 
 APP_NAME = "DataRecorder"
 
@@ -45,6 +52,44 @@ class RecorderEngine(BaseEngine):
         self.tick_recordings = {}
         self.bar_recordings = {}
         self.bar_generators = {}
+        self.bar_aggregators: Dict[str, List[BarAggregator]] = {}
+
+        # Bars of additional intervals aggregated from 1 minute bars, can
+        # be set for each symbol by "intervals" and "daily_end" of its
+        # bar recording setting.
+        self.bar_intervals: List[str] = []
+        self.daily_end: str = "15:00"
+
+        # Data is buffered per symbol and saved in batch when buffer size
+        # reaches batch_size, or every flush_interval seconds.
+        self.batch_size: int = 500
+        self.flush_interval: float = 1
+        self.retry_limit: int = 3
+
+        # Tick data is appended into journal files instead of database
+        # if tick_journal enabled, use journal.import_journals to import
+        # them into database afterwards.
+        self.tick_journal: bool = False
+        self.journal_fsync: str = FSYNC_INTERVAL
+        self.journal: TickJournal = None
+
+        self.buffers: Dict[str, Dict[str, list]] = {"tick": {}, "bar": {}}
+        self.buffer_count: int = 0
+        self.retry_tasks: List[list] = []
+        self.last_flush: float = 0
+
+        self.stats: Dict[str, float] = {
+            "queue_size": 0,
+            "buffer_size": 0,
+            "flush_latency": 0,
+            "flush_latency_max": 0,
+            "rows_per_sec": 0,
+            "total_rows": 0,
+            "failed_batches": 0,
+            "dropped_rows": 0,
+        }
+        self.last_stats_time: float = 0
+        self.last_stats_rows: int = 0
 
         self.load_setting()
         self.register_event()
@@ -56,42 +101,173 @@ class RecorderEngine(BaseEngine):
         setting = load_json(self.setting_filename)
         self.tick_recordings = setting.get("tick", {})
         self.bar_recordings = setting.get("bar", {})
+        self.batch_size = setting.get("batch_size", self.batch_size)
+        self.flush_interval = setting.get("flush_interval", self.flush_interval)
+        self.tick_journal = setting.get("tick_journal", self.tick_journal)
+        self.journal_fsync = setting.get("journal_fsync", self.journal_fsync)
+        self.bar_intervals = setting.get("bar_intervals", self.bar_intervals)
+        self.daily_end = setting.get("daily_end", self.daily_end)
+
+        if self.tick_journal:
+            self.journal = TickJournal(
+                get_folder_path("tick_journal"),
+                self.journal_fsync,
+                self.flush_interval
+            )
 
     def save_setting(self):
         """"""
         setting = {
             "tick": self.tick_recordings,
-            "bar": self.bar_recordings
+            "bar": self.bar_recordings,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "tick_journal": self.tick_journal,
+            "journal_fsync": self.journal_fsync,
+            "bar_intervals": self.bar_intervals,
+            "daily_end": self.daily_end
         }
         save_json(self.setting_filename, setting)
 
     def run(self):
         """"""
+        self.last_flush = time()
+        self.last_stats_time = self.last_flush
+
         while self.active:
             try:
-                task = self.queue.get(timeout=1)
-                task_type, data = task
+                task_type, data = self.queue.get(timeout=0.1)
+                self.buffer_data(task_type, data)
+            except Empty:
+                pass
+
+            now = time()
 
-                if task_type == "tick":
-                    database_manager.save_tick_data([data])
-                elif task_type == "bar":
-                    database_manager.save_bar_data([data])
+            if now - self.last_flush >= self.flush_interval:
+                self.flush_all()
 
+            if now - self.last_stats_time >= 1:
+                self.update_stats()
+                self.put_event()
+
+        # Save all remaining data before exit
+        while True:
+            try:
+                task_type, data = self.queue.get_nowait()
+                self.buffer_data(task_type, data)
             except Empty:
-                continue
+                break
+
+        self.flush_all()
 
+        if self.journal:
+            self.journal.close()
+
+    def buffer_data(self, task_type: str, data):
+        """
+        Add data into buffer of its symbol, save the buffer if full.
+        """
+        if task_type == "tick" and self.journal:
+            try:
+                self.journal.write(data)
+                self.stats["total_rows"] += 1
             except Exception:
-                self.active = False
+                self.stats["dropped_rows"] += 1
+
+                msg = traceback.format_exc()
+                self.write_log(f"Tick日志写入失败：\n{msg}")
+            return
+
+        buffer = self.buffers[task_type].setdefault(data.vt_symbol, [])
+        buffer.append(data)
+        self.buffer_count += 1
+
+        if len(buffer) >= self.batch_size:
+            self.buffers[task_type][data.vt_symbol] = []
+            self.buffer_count -= len(buffer)
+            self.save_batch([task_type, buffer, 0])
+
+    def flush_all(self):
+        """
+        Save data in all buffers and retry failed batches.
+        """
+        self.last_flush = time()
+
+        if self.journal:
+            self.journal.flush()
+
+        retry_tasks = self.retry_tasks
+        self.retry_tasks = []
+        for task in retry_tasks:
+            self.save_batch(task)
+
+        for task_type, buffers in self.buffers.items():
+            datas = []
+            for buffer in buffers.values():
+                datas.extend(buffer)
+
+            if datas:
+                self.save_batch([task_type, datas, 0])
+
+            buffers.clear()
+
+        self.buffer_count = 0
+
+    def save_batch(self, task: list):
+        """
+        Save a batch of data into database. Failed batch is kept for retry
+        until retry_limit reached, so that writer thread keeps running.
+        """
+        task_type, datas, retry_count = task
+
+        start = time()
+
+        try:
+            if task_type == "tick":
+                database_manager.save_tick_data(datas)
+            elif task_type == "bar":
+                database_manager.save_bar_data(datas)
+        except Exception:
+            self.stats["failed_batches"] += 1
+
+            if retry_count < self.retry_limit:
+                task[2] += 1
+                self.retry_tasks.append(task)
+
+                msg = traceback.format_exc()
+                self.write_log(f"{task_type}数据保存失败，等待重试（{task[2]}/{self.retry_limit}）：\n{msg}")
+            else:
+                self.stats["dropped_rows"] += len(datas)
+                self.write_log(f"{task_type}数据保存失败，丢弃{len(datas)}条数据")
 
                 info = sys.exc_info()
                 event = Event(EVENT_RECORDER_EXCEPTION, info)
                 self.event_engine.put(event)
+            return
+
+        latency = time() - start
+        self.stats["flush_latency"] = latency
+        self.stats["flush_latency_max"] = max(latency, self.stats["flush_latency_max"])
+        self.stats["total_rows"] += len(datas)
+
+    def update_stats(self):
+        """"""
+        now = time()
+        elapsed = now - self.last_stats_time
+        rows = self.stats["total_rows"] - self.last_stats_rows
+
+        self.stats["queue_size"] = self.queue.qsize()
+        self.stats["buffer_size"] = self.buffer_count
+        self.stats["rows_per_sec"] = rows / elapsed if elapsed else 0
+
+        self.last_stats_time = now
+        self.last_stats_rows = self.stats["total_rows"]
 
     def close(self):
         """"""
         self.active = False
 
-        if self.thread.isAlive():
+        if self.thread.is_alive():
             self.thread.join()
 
     def start(self):
@@ -162,6 +338,7 @@ class RecorderEngine(BaseEngine):
             return
 
         self.bar_recordings.pop(vt_symbol)
+        self.bar_aggregators.pop(vt_symbol, None)
         self.save_setting()
         self.put_event()
 
@@ -235,7 +412,8 @@ class RecorderEngine(BaseEngine):
 
         data = {
             "tick": tick_symbols,
-            "bar": bar_symbols
+            "bar": bar_symbols,
+            "stats": dict(self.stats)
         }
 
         event = Event(
@@ -254,6 +432,35 @@ class RecorderEngine(BaseEngine):
         task = ("bar", copy(bar))
         self.queue.put(task)
 
+        for aggregator in self.get_bar_aggregators(bar.vt_symbol):
+            aggregator.update_bar(bar)
+
+    def record_aggregated_bar(self, bar: BarData):
+        """"""
+        task = ("bar", bar)
+        self.queue.put(task)
+
+    def get_bar_aggregators(self, vt_symbol: str) -> List[BarAggregator]:
+        """"""
+        aggregators = self.bar_aggregators.get(vt_symbol, None)
+
+        if aggregators is None:
+            setting = self.bar_recordings.get(vt_symbol, {})
+            intervals = setting.get("intervals", self.bar_intervals)
+            daily_end = setting.get("daily_end", self.daily_end)
+
+            aggregators = [
+                BarAggregator(
+                    Interval(interval),
+                    self.record_aggregated_bar,
+                    datetime.strptime(daily_end, "%H:%M").time()
+                )
+                for interval in intervals
+            ]
+            self.bar_aggregators[vt_symbol] = aggregators
+
+        return aggregators
+
     def get_bar_generator(self, vt_symbol: str):
         """"""
         bg = self.bar_generators.get(vt_symbol, None)
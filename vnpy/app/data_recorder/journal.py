@@ -0,0 +1,278 @@
+"""
+Append-only binary journal of tick data.
+
+Ticks are appended into one journal file per day per symbol:
+
+    <root>/<YYYYMMDD>/<symbol>.<exchange>.journal
+
+Each file starts with a fixed header, followed by fixed-width records of
+datetime (int64 nanoseconds of wall clock time) and all price/volume
+fields of TickData (float64), so that it can be read into numpy array
+directly for importing into database or replaying in tick backtesting.
+"""
+
+import os
+import struct
+from datetime import date, datetime, timedelta
+from operator import attrgetter
+from pathlib import Path
+from time import time
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange
+from vnpy.trader.database.database import (
+    BaseDatabaseManager,
+    TICK_ARRAY_FIELDS
+)
+from vnpy.trader.object import TickData
+
+
+JOURNAL_SUFFIX = ".journal"
+IMPORTED_SUFFIX = ".imported"
+
+MAGIC = b"VNTJ"
+VERSION = 1
+NAME_SIZE = 54
+
+HEADER_STRUCT = struct.Struct(f"<4sHH{NAME_SIZE}s")
+RECORD_STRUCT = struct.Struct(f"<q{len(TICK_ARRAY_FIELDS)}d")
+
+RECORD_DTYPE = np.dtype(
+    [("datetime", "<i8")] + [(field, "<f8") for field in TICK_ARRAY_FIELDS]
+)
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Sync policy of journal files
+FSYNC_NONE = "none"             # leave to OS
+FSYNC_INTERVAL = "interval"     # flush and fsync every fsync_interval seconds
+FSYNC_ALWAYS = "always"         # flush and fsync after every tick
+
+
+class TickJournal:
+    """
+    Writer of tick journal files. Not thread-safe, should be used by
+    one thread only.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync: str = FSYNC_INTERVAL,
+        fsync_interval: float = 1
+    ):
+        """"""
+        self.path: Path = Path(path)
+        self.fsync: str = fsync
+        self.fsync_interval: float = fsync_interval
+
+        self.files: Dict[Tuple[date, str], BinaryIO] = {}
+        self.current_date: Optional[date] = None
+        self.last_sync: float = time()
+
+        self.get_values = attrgetter(*TICK_ARRAY_FIELDS)
+
+    def write(self, tick: TickData) -> None:
+        """
+        Append tick into journal file of its date and symbol.
+        """
+        day = tick.datetime.date()
+
+        f = self.files.get((day, tick.vt_symbol), None)
+        if not f:
+            f = self.open_file(day, tick)
+
+        timestamp = (tick.datetime.replace(tzinfo=None) - EPOCH) // MICROSECOND * 1000
+        values = [value or 0 for value in self.get_values(tick)]
+        f.write(RECORD_STRUCT.pack(timestamp, *values))
+
+        if self.fsync == FSYNC_ALWAYS:
+            sync_file(f)
+        elif self.fsync == FSYNC_INTERVAL and time() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def open_file(self, day: date, tick: TickData) -> BinaryIO:
+        """"""
+        # Close files of previous day when new day started
+        if self.current_date is None or day > self.current_date:
+            for key in list(self.files.keys()):
+                if key[0] < day:
+                    self.files.pop(key).close()
+            self.current_date = day
+
+        path = get_journal_path(self.path, day, tick.vt_symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        f = open(path, "ab")
+
+        size = f.tell()
+        if not size:
+            f.write(pack_header(tick.name))
+        else:
+            # Drop incomplete record left by interrupted writing
+            incomplete = (size - HEADER_STRUCT.size) % RECORD_STRUCT.size
+            if incomplete:
+                f.truncate(size - incomplete)
+                f.seek(0, os.SEEK_END)
+
+        self.files[(day, tick.vt_symbol)] = f
+        return f
+
+    def flush(self) -> None:
+        """
+        Flush buffered data to OS, and sync to disk by fsync policy.
+        """
+        if self.fsync == FSYNC_NONE:
+            for f in self.files.values():
+                f.flush()
+        else:
+            self.sync()
+
+    def sync(self) -> None:
+        """"""
+        for f in self.files.values():
+            sync_file(f)
+        self.last_sync = time()
+
+    def close(self) -> None:
+        """"""
+        self.sync()
+
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+
+def sync_file(f: BinaryIO) -> None:
+    """"""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def pack_header(name: str) -> bytes:
+    """"""
+    data = name.encode("UTF-8")[:NAME_SIZE]
+    data = data.decode("UTF-8", errors="ignore").encode("UTF-8")
+    return HEADER_STRUCT.pack(MAGIC, VERSION, RECORD_STRUCT.size, data)
+
+
+def get_journal_path(path: Path, day: date, vt_symbol: str) -> Path:
+    """"""
+    return path.joinpath(day.strftime("%Y%m%d"), vt_symbol + JOURNAL_SUFFIX)
+
+
+def get_journal_files(
+    path: Path,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    suffix: str = JOURNAL_SUFFIX
+) -> List[Path]:
+    """
+    Get journal files within [start, end], sorted by date and symbol.
+    """
+    files = []
+
+    for folder in sorted(Path(path).iterdir()):
+        if not folder.is_dir():
+            continue
+
+        try:
+            day = datetime.strptime(folder.name, "%Y%m%d").date()
+        except ValueError:
+            continue
+
+        if (start and day < start) or (end and day > end):
+            continue
+
+        files.extend(sorted(folder.glob("*" + suffix)))
+
+    return files
+
+
+def read_journal(filepath: Path) -> Tuple[str, Exchange, str, np.ndarray]:
+    """
+    Read journal file into numpy structured array of RECORD_DTYPE.
+    Return symbol, exchange, name and records.
+    """
+    filepath = Path(filepath)
+    vt_symbol = filepath.name[:-len(filepath.suffix)]
+    symbol, exchange_str = vt_symbol.rsplit(".", 1)
+    exchange = Exchange(exchange_str)
+
+    with open(filepath, "rb") as f:
+        header = f.read(HEADER_STRUCT.size)
+        magic, version, record_size, name = HEADER_STRUCT.unpack(header)
+
+        if magic != MAGIC or record_size != RECORD_STRUCT.size:
+            raise ValueError(f"不支持的Tick日志文件：{filepath}")
+
+        data = f.read()
+
+    count = len(data) // RECORD_STRUCT.size
+    records = np.frombuffer(data, dtype=RECORD_DTYPE, count=count)
+    name = name.rstrip(b"\x00").decode("UTF-8")
+
+    return symbol, exchange, name, records
+
+
+def load_journal_ticks(filepath: Path) -> List[TickData]:
+    """
+    Load TickData list from journal file, e.g. for replaying in backtesting.
+    """
+    symbol, exchange, name, records = read_journal(filepath)
+
+    datetimes = records["datetime"].view("datetime64[ns]").astype("datetime64[us]").tolist()
+    columns = [records[field].tolist() for field in TICK_ARRAY_FIELDS]
+
+    ticks = []
+    for dt, values in zip(datetimes, zip(*columns)):
+        tick = TickData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=dt,
+            name=name,
+            gateway_name="JOURNAL"
+        )
+        tick.__dict__.update(zip(TICK_ARRAY_FIELDS, values))
+        ticks.append(tick)
+
+    return ticks
+
+
+def import_journals(
+    path: Path,
+    database_manager: BaseDatabaseManager,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    batch_size: int = 100_000,
+    remove: bool = False
+) -> int:
+    """
+    Import journal files into database, and return number of ticks imported.
+
+    Journal of current day is skipped by default since it may still be
+    written by recorder. Imported file is renamed with IMPORTED_SUFFIX
+    (or removed), so that running again will not import it twice.
+    """
+    if not end:
+        end = date.fromordinal(date.today().toordinal() - 1)
+
+    count = 0
+
+    for filepath in get_journal_files(path, start, end):
+        ticks = load_journal_ticks(filepath)
+
+        for ix in range(0, len(ticks), batch_size):
+            database_manager.save_tick_data(ticks[ix:ix + batch_size])
+
+        count += len(ticks)
+
+        if remove:
+            filepath.unlink()
+        else:
+            filepath.rename(filepath.with_suffix(IMPORTED_SUFFIX))
+
+    return count
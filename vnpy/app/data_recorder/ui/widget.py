@@ -73,6 +73,8 @@ class RecorderManager(QtWidgets.QWidget):
         self.log_edit = QtWidgets.QTextEdit()
         self.log_edit.setReadOnly(True)
 
+        self.stats_label = QtWidgets.QLabel()
+
         # Set layout
         grid = QtWidgets.QGridLayout()
         grid.addWidget(QtWidgets.QLabel("K线记录"), 0, 0)
@@ -95,6 +97,7 @@ class RecorderManager(QtWidgets.QWidget):
         grid2.addWidget(self.bar_recording_edit, 1, 0)
         grid2.addWidget(self.tick_recording_edit, 1, 1)
         grid2.addWidget(self.log_edit, 2, 0, 1, 2)
+        grid2.addWidget(self.stats_label, 3, 0, 1, 2)
 
         vbox = QtWidgets.QVBoxLayout()
         vbox.addLayout(hbox)
@@ -133,6 +136,17 @@ class RecorderManager(QtWidgets.QWidget):
         tick_text = "\n".join(data["tick"])
         self.tick_recording_edit.setText(tick_text)
 
+        stats = data["stats"]
+        self.stats_label.setText(
+            f"队列长度：{stats['queue_size']}    "
+            f"缓存数量：{stats['buffer_size']}    "
+            f"写入速度：{stats['rows_per_sec']:.0f}条/秒    "
+            f"写入耗时：{stats['flush_latency'] * 1000:.1f}毫秒    "
+            f"最大耗时：{stats['flush_latency_max'] * 1000:.1f}毫秒    "
+            f"失败批次：{stats['failed_batches']}    "
+            f"丢弃数量：{stats['dropped_rows']}"
+        )
+
     def process_contract_event(self, event: Event):
         """"""
         contract = event.data
@@ -1,18 +1,32 @@
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List
 from functools import lru_cache
+from time import time
+import multiprocessing
+import random
+import shutil
 import traceback
 
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pandas import DataFrame
+from deap import creator, base, tools, algorithms
 
 from vnpy.trader.constant import Direction, Offset, Interval, Status
 from vnpy.trader.database import database_manager
+from vnpy.trader.database.database import BAR_ARRAY_FIELDS
 from vnpy.trader.object import OrderData, TradeData, BarData
 from vnpy.trader.utility import round_to, extract_vt_symbol
+from vnpy.app.cta_strategy.backtesting import (
+    OptimizationSetting,
+    dump_history_arrays,
+    attach_history_arrays,
+    get_fitness_cache_path,
+    load_fitness_cache,
+    save_fitness_cache
+)
 
 from .template import StrategyTemplate
 
@@ -44,15 +58,32 @@ class BacktestingEngine:
         self.priceticks: Dict[str, float] = 0
 
         self.capital: float = 1_000_000
+        self.fill_missing: bool = False
 
+        self.strategy_class: type = None
         self.strategy: StrategyTemplate = None
         self.bars: Dict[str, BarData] = {}
         self.datetime: datetime = None
 
         self.interval: Interval = None
         self.days: int = 0
-        self.history_data: Dict[Tuple, BarData] = {}
-        self.dts: Set[datetime] = set()
+
+        # History data aligned on datetime of all symbols: datetime array
+        # in shape (time,), and arrays of each bar field in shape
+        # (time, symbol). Bars with history_mask False are not pushed.
+        self.dts: np.ndarray = None
+        self.history_arrays: Dict[str, np.ndarray] = {}
+        self.history_mask: np.ndarray = None
+
+        # Daily close prices of replayed bars, in shape (day, symbol)
+        self.daily_dates: np.ndarray = None
+        self.daily_closes: np.ndarray = None
+
+        # Backtesting is stopped early if balance falls below stop_balance,
+        # which is checked at end of each day by balance_checker
+        self.stop_balance: float = 0
+        self.stopped: bool = False
+        self.balance_checker: BalanceChecker = None
 
         self.limit_order_count = 0
         self.limit_orders = {}
@@ -85,6 +116,11 @@ class BacktestingEngine:
         self.daily_results.clear()
         self.daily_df = None
 
+        self.daily_dates = None
+        self.daily_closes = None
+        self.stopped = False
+        self.balance_checker = None
+
     def set_parameters(
         self,
         vt_symbols: List[str],
@@ -95,9 +131,14 @@ class BacktestingEngine:
         sizes: Dict[str, float],
         priceticks: Dict[str, float],
         capital: int = 0,
-        end: datetime = None
+        end: datetime = None,
+        fill_missing: bool = False
     ) -> None:
-        """"""
+        """
+        With fill_missing, a symbol without bar at some datetime is pushed
+        with a flat bar of last close price and 0 volume, once it has any
+        bar before. Otherwise it is absent from the bars dict pushed.
+        """
         self.vt_symbols = vt_symbols
         self.interval = interval
 
@@ -109,15 +150,23 @@ class BacktestingEngine:
         self.start = start
         self.end = end
         self.capital = capital
+        self.fill_missing = fill_missing
 
     def add_strategy(self, strategy_class: type, setting: dict) -> None:
         """"""
+        self.strategy_class = strategy_class
         self.strategy = strategy_class(
             self, strategy_class.__name__, self.vt_symbols, setting
         )
 
-    def load_data(self) -> None:
-        """"""
+    def load_data(self, max_workers: int = None, whole_range: bool = False) -> None:
+        """
+        Load history data of all symbols concurrently in a thread pool.
+
+        Data is loaded in 30 days range each query to allow for progress
+        update, or in whole range each symbol with whole_range, which needs
+        less queries if the database can return a large range at once.
+        """
         self.output("开始加载历史数据")
 
         if not self.end:
@@ -128,71 +177,143 @@ class BacktestingEngine:
             return
 
         # Clear previously loaded history data
-        self.history_data.clear()
-        self.dts.clear()
+        self.dts = None
+        self.history_arrays = {}
+        self.history_mask = None
 
-        # Load 30 days of data each time and allow for progress update
-        progress_delta = timedelta(days=30)
-        total_delta = self.end - self.start
-        interval_delta = INTERVAL_DELTA_MAP[self.interval]
+        # Split loading range of each symbol
+        if whole_range:
+            ranges = [(self.start, self.end)]
+        else:
+            ranges = []
+            progress_delta = timedelta(days=30)
+            interval_delta = INTERVAL_DELTA_MAP[self.interval]
 
-        for vt_symbol in self.vt_symbols:
             start = self.start
             end = self.start + progress_delta
-            progress = 0
 
-            data_count = 0
             while start < self.end:
                 end = min(end, self.end)  # Make sure end time stays within set range
-
-                data = load_bar_data(
-                    vt_symbol,
-                    self.interval,
-                    start,
-                    end
-                )
-
-                for bar in data:
-                    self.dts.add(bar.datetime)
-                    self.history_data[(bar.datetime, vt_symbol)] = bar
-                    data_count += 1
-
-                progress += progress_delta / total_delta
-                progress = min(progress, 1)
-                progress_bar = "#" * int(progress * 10)
-                self.output(f"{vt_symbol}加载进度：{progress_bar} [{progress:.0%}]")
+                ranges.append((start, end))
 
                 start = end + interval_delta
                 end += (progress_delta + interval_delta)
 
+        # Load all ranges of all symbols, with a single progress update
+        chunks = {}
+        total = len(self.vt_symbols) * len(ranges)
+        progress_bar = ""
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = {}
+
+            for i, vt_symbol in enumerate(self.vt_symbols):
+                for j, (start, end) in enumerate(ranges):
+                    future = executor.submit(
+                        load_bar_arrays,
+                        vt_symbol,
+                        self.interval,
+                        start,
+                        end
+                    )
+                    futures[future] = (i, j)
+
+            for future in as_completed(futures):
+                chunks[futures[future]] = future.result()
+
+                progress = len(chunks) / total
+                if "#" * int(progress * 10) != progress_bar:
+                    progress_bar = "#" * int(progress * 10)
+                    self.output(f"加载进度：{progress_bar} [{progress:.0%}]")
+
+        symbol_arrays = []
+
+        for i, vt_symbol in enumerate(self.vt_symbols):
+            symbol_chunks = [chunks[(i, j)] for j in range(len(ranges))]
+
+            arrays = {
+                key: np.concatenate([chunk[key] for chunk in symbol_chunks])
+                for key in symbol_chunks[0].keys()
+            }
+            symbol_arrays.append(arrays)
+
+            data_count = len(arrays["datetime"])
             self.output(f"{vt_symbol}历史数据加载完成，数据量：{data_count}")
 
+        self.align_data(symbol_arrays)
+
         self.output("所有历史数据加载完成")
 
+    def align_data(self, symbol_arrays: List[Dict[str, np.ndarray]]) -> None:
+        """
+        Align bar arrays of each symbol on datetime into matrices.
+        """
+        dts = np.unique(np.concatenate([arrays["datetime"] for arrays in symbol_arrays]))
+        shape = (len(dts), len(self.vt_symbols))
+
+        mask = np.zeros(shape, dtype=bool)
+        history_arrays = {field: np.zeros(shape) for field in BAR_ARRAY_FIELDS}
+
+        for i, arrays in enumerate(symbol_arrays):
+            ix = np.searchsorted(dts, arrays["datetime"])
+            mask[ix, i] = True
+
+            for field in BAR_ARRAY_FIELDS:
+                history_arrays[field][ix, i] = arrays[field]
+
+        # Report missing data count of each symbol, instead of every bar
+        for vt_symbol, missing in zip(self.vt_symbols, (~mask).sum(axis=0).tolist()):
+            if missing:
+                self.output(f"数据缺失：{vt_symbol}，缺失数量：{missing}")
+
+        if self.fill_missing:
+            # Row index of last bar for each symbol, -1 if none yet
+            last_ix = get_last_index(mask)
+            filled = (last_ix >= 0) & ~mask
+            cols = np.broadcast_to(np.arange(shape[1]), shape)
+
+            close = history_arrays["close_price"][last_ix[filled], cols[filled]]
+            for field in ["open_price", "high_price", "low_price", "close_price"]:
+                history_arrays[field][filled] = close
+
+            open_interest = history_arrays["open_interest"]
+            open_interest[filled] = open_interest[last_ix[filled], cols[filled]]
+
+            mask = last_ix >= 0
+
+        self.dts = dts
+        self.history_arrays = history_arrays
+        self.history_mask = mask
+
     def run_backtesting(self) -> None:
         """"""
-        self.strategy.on_init()
+        if self.dts is None:
+            self.output("历史数据为空，请先加载数据")
+            return
 
-        # Generate sorted datetime list
-        dts = list(self.dts)
-        dts.sort()
+        self.strategy.on_init()
 
         # Use the first [days] of history data for initializing strategy
-        day_count = 0
-        ix = 0
-
-        for ix, dt in enumerate(dts):
-            if self.datetime and dt.day != self.datetime.day:
-                day_count += 1
-                if day_count >= self.days:
-                    break
+        days = self.dts.astype("datetime64[D]")
+        day_changes = np.flatnonzero(days[1:] != days[:-1]) + 1
 
-            try:
-                self.new_bars(dt)
-            except Exception:
-                self.output("触发异常，回测终止")
-                self.output(traceback.format_exc())
-                return
+        n = max(self.days, 1) - 1
+        if n < len(day_changes):
+            ix = day_changes[n]
+        else:
+            ix = max(len(days) - 1, 0)
+
+        end = 0
+
+        try:
+            for dt, bars in self.iter_bars(0, ix):
+                self.new_bars(dt, bars)
+                end += 1
+        except Exception:
+            self.output("触发异常，回测终止")
+            self.output(traceback.format_exc())
+            self.update_daily_closes(end)
+            return
 
         self.strategy.inited = True
         self.output("策略初始化完成")
@@ -201,17 +322,147 @@ class BacktestingEngine:
         self.strategy.trading = True
         self.output("开始回放历史数据")
 
-        # Use the rest of history data for running backtesting
-        for dt in dts[ix:]:
-            try:
-                self.new_bars(dt)
-            except Exception:
-                self.output("触发异常，回测终止")
-                self.output(traceback.format_exc())
-                return
+        # Use the rest of history data from bar at ix for running
+        # backtesting, only the last bar is left when no enough days of data.
+        end = ix
+
+        # Index of first bar of each day after ix, for checking balance
+        if self.stop_balance:
+            self.balance_checker = BalanceChecker(self, ix)
+            day_ends = set(day_changes[day_changes > ix].tolist())
+        else:
+            day_ends = set()
+
+        try:
+            for dt, bars in self.iter_bars(ix, len(days)):
+                self.new_bars(dt, bars)
+                end += 1
+
+                if (
+                    end in day_ends
+                    and self.balance_checker.check(end) < self.stop_balance
+                ):
+                    self.stopped = True
+                    self.output(f"账户权益低于{self.stop_balance}，回测提前终止")
+                    break
+        except Exception:
+            self.output("触发异常，回测终止")
+            self.output(traceback.format_exc())
+            return
+        finally:
+            self.update_daily_closes(max(end, ix))
 
         self.output("历史数据回放结束")
 
+    def iter_bars(self, start: int, end: int, chunk_size: int = 10000):
+        """
+        Iterate datetime and dict of BarData created from history arrays
+        within [start, end), chunk by chunk to limit memory usage.
+        """
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+
+            datetimes = self.dts[chunk_start:chunk_end].astype("datetime64[us]").tolist()
+
+            # BarData of each symbol in chunk, None if missing
+            symbol_bars = [
+                self.create_bars(i, datetimes, chunk_start, chunk_end)
+                for i in range(len(self.vt_symbols))
+            ]
+
+            for dt, *row in zip(datetimes, *symbol_bars):
+                bars = {
+                    vt_symbol: bar
+                    for vt_symbol, bar in zip(self.vt_symbols, row)
+                    if bar
+                }
+                yield dt, bars
+
+    def create_bars(
+        self,
+        i: int,
+        datetimes: List[datetime],
+        start: int,
+        end: int
+    ) -> List[BarData]:
+        """
+        Create BarData list of symbol at column i within [start, end).
+        """
+        vt_symbol = self.vt_symbols[i]
+        symbol, exchange = extract_vt_symbol(vt_symbol)
+        interval = self.interval
+
+        arrays = self.history_arrays
+        columns = [
+            arrays[name][start:end, i].tolist()
+            for name in [
+                "volume",
+                "open_interest",
+                "open_price",
+                "high_price",
+                "low_price",
+                "close_price"
+            ]
+        ]
+        mask = self.history_mask[start:end, i].tolist()
+
+        new = object.__new__
+        bars = []
+
+        for (
+            dt,
+            valid,
+            volume,
+            open_interest,
+            open_price,
+            high_price,
+            low_price,
+            close_price
+        ) in zip(datetimes, mask, *columns):
+            if not valid:
+                bars.append(None)
+                continue
+
+            # Set fields directly instead of calling dataclass __init__
+            bar = new(BarData)
+            bar.__dict__ = {
+                "gateway_name": "DB",
+                "symbol": symbol,
+                "exchange": exchange,
+                "datetime": dt,
+                "interval": interval,
+                "volume": volume,
+                "open_interest": open_interest,
+                "open_price": open_price,
+                "high_price": high_price,
+                "low_price": low_price,
+                "close_price": close_price,
+                "vt_symbol": vt_symbol
+            }
+            bars.append(bar)
+
+        return bars
+
+    def update_daily_closes(self, end: int) -> None:
+        """
+        Calculate daily close prices of all symbols from bars replayed,
+        with NaN before first bar of symbol.
+        """
+        days = self.dts[:end].astype("datetime64[D]")
+        mask = self.history_mask[:end]
+
+        # Index of last bar of each day, empty if no bar replayed
+        day_ix = np.flatnonzero(np.append(days[1:] != days[:-1], end > 0))
+
+        last_ix = get_last_index(mask)[day_ix]
+        cols = np.broadcast_to(np.arange(mask.shape[1]), last_ix.shape)
+
+        closes = self.history_arrays["close_price"][last_ix, cols]
+        closes[last_ix < 0] = np.nan
+
+        self.daily_dates = days[day_ix]
+        self.daily_closes = closes
+
     def calculate_result(self) -> None:
         """"""
         self.output("开始计算逐日盯市盈亏")
@@ -220,46 +471,78 @@ class BacktestingEngine:
             self.output("成交记录为空，无法计算")
             return
 
-        # Add trade data into daily reuslt.
-        for trade in self.trades.values():
-            d = trade.datetime.date()
-            daily_result = self.daily_results[d]
-            daily_result.add_trade(trade)
-
-        # Calculate daily result by iteration.
-        pre_closes = {}
-        start_poses = {}
-
-        for daily_result in self.daily_results.values():
-            daily_result.calculate_pnl(
-                pre_closes,
-                start_poses,
-                self.sizes,
-                self.rates,
-                self.slippages,
-            )
-
-            pre_closes = daily_result.close_prices
-            start_poses = daily_result.end_poses
-
-        # Generate dataframe
-        results = defaultdict(list)
-
-        for daily_result in self.daily_results.values():
-            fields = [
-                "date", "trade_count", "turnover",
-                "commission", "slippage", "trading_pnl",
-                "holding_pnl", "total_pnl", "net_pnl"
-            ]
-            for key in fields:
-                value = getattr(daily_result, key)
-                results[key].append(value)
+        results = {"date": self.daily_dates.tolist()}
+        results.update(self.calculate_daily_pnl())
 
         self.daily_df = DataFrame.from_dict(results).set_index("date")
 
         self.output("逐日盯市盈亏计算完成")
         return self.daily_df
 
+    def calculate_daily_pnl(self) -> Dict[str, np.ndarray]:
+        """
+        Calculate daily pnl of portfolio with daily close prices and trades.
+        """
+        dates = self.daily_dates
+        closes = self.daily_closes
+        shape = closes.shape
+
+        # Aggregate trades of each day and symbol
+        symbol_index = {vt_symbol: i for i, vt_symbol in enumerate(self.vt_symbols)}
+        trades = list(self.trades.values())
+
+        trade_dates = np.array([trade.datetime.date() for trade in trades], dtype="datetime64[D]")
+        rows = np.searchsorted(dates, trade_dates)
+        cols = np.array([symbol_index[trade.vt_symbol] for trade in trades])
+
+        prices = np.array([trade.price for trade in trades])
+        volumes = np.array([trade.volume for trade in trades])
+        directions = np.array([trade.direction == Direction.LONG for trade in trades])
+        pos_changes = np.where(directions, volumes, -volumes)
+
+        trade_count = np.zeros(shape)
+        pos_change = np.zeros(shape)
+        trade_value = np.zeros(shape)
+        trade_volume = np.zeros(shape)
+        signed_value = np.zeros(shape)
+
+        np.add.at(trade_count, (rows, cols), 1)
+        np.add.at(pos_change, (rows, cols), pos_changes)
+        np.add.at(trade_value, (rows, cols), volumes * prices)
+        np.add.at(trade_volume, (rows, cols), volumes)
+        np.add.at(signed_value, (rows, cols), pos_changes * prices)
+
+        sizes = np.array([self.sizes[vt_symbol] for vt_symbol in self.vt_symbols])
+        rates = np.array([self.rates[vt_symbol] for vt_symbol in self.vt_symbols])
+        slippages = np.array([self.slippages[vt_symbol] for vt_symbol in self.vt_symbols])
+
+        # Calculate pnl of each day and symbol
+        end_pos = pos_change.cumsum(axis=0)
+        start_pos = end_pos - pos_change
+
+        pre_closes = np.vstack([np.full(shape[1], np.nan), closes[:-1]])
+
+        with np.errstate(invalid="ignore"):
+            holding_pnl = np.nan_to_num(start_pos * (closes - pre_closes)) * sizes
+            trading_pnl = np.nan_to_num(pos_change * closes - signed_value) * sizes
+
+        turnover = trade_value * sizes
+        commission = turnover * rates
+        slippage = trade_volume * sizes * slippages
+        total_pnl = trading_pnl + holding_pnl
+        net_pnl = total_pnl - commission - slippage
+
+        return {
+            "trade_count": trade_count.sum(axis=1).astype(int),
+            "turnover": turnover.sum(axis=1),
+            "commission": commission.sum(axis=1),
+            "slippage": slippage.sum(axis=1),
+            "trading_pnl": trading_pnl.sum(axis=1),
+            "holding_pnl": holding_pnl.sum(axis=1),
+            "total_pnl": total_pnl.sum(axis=1),
+            "net_pnl": net_pnl.sum(axis=1),
+        }
+
     def calculate_statistics(self, df: DataFrame = None, output=True) -> None:
         """"""
         self.output("开始计算策略统计指标")
@@ -457,45 +740,305 @@ class BacktestingEngine:
 
         plt.show()
 
-    def update_daily_close(self, bars: Dict[str, BarData], dt: datetime) -> None:
+    def get_parameters(self) -> dict:
+        """
+        Get parameters for creating another engine with the same setting.
+        """
+        return {
+            "vt_symbols": self.vt_symbols,
+            "interval": self.interval,
+            "start": self.start,
+            "end": self.end,
+            "rates": self.rates,
+            "slippages": self.slippages,
+            "sizes": self.sizes,
+            "priceticks": self.priceticks,
+            "capital": self.capital,
+            "fill_missing": self.fill_missing
+        }
+
+    def get_history_range(self) -> tuple:
+        """
+        Get first datetime, last datetime and count of loaded history data.
+        """
+        if self.dts is None or not len(self.dts):
+            return (None, None, 0)
+
+        first = self.dts[0].astype("datetime64[us]").tolist()
+        last = self.dts[-1].astype("datetime64[us]").tolist()
+        return (first, last, int(self.history_mask.sum()))
+
+    def run_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        output: bool = True,
+        max_workers: int = None,
+        stop_loss: float = 0
+    ) -> list:
+        """
+        Run backtesting with all settings in multiprocessing pool, and
+        output results as soon as each one finishes.
+
+        With stop_loss, backtesting of a setting is stopped early once its
+        balance is below capital * (1 - stop_loss).
+        """
+        # Get optimization setting and target
+        settings = optimization_setting.generate_setting()
+        target_name = optimization_setting.target_name
+
+        if not settings:
+            self.output("优化参数组合为空，请检查")
+            return
+
+        if not target_name:
+            self.output("优化目标未设置，请检查")
+            return
+
+        # Load history data only once in main process, and share it with
+        # worker processes by memory mapped files
+        context = self.create_optimization_context(target_name, stop_loss)
+
+        # Force to use spawn method to create new process (instead of fork on Linux)
+        processes = max_workers or multiprocessing.cpu_count()
+        chunksize = max(len(settings) // (processes * 4), 1)
+
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(
+            processes,
+            initializer=init_optimization_process,
+            initargs=(context,)
+        )
+
+        result_values = []
+
+        try:
+            for result in pool.imap_unordered(run_optimization_task, settings, chunksize):
+                result_values.append(result)
+
+                if output:
+                    msg = f"[{len(result_values)}/{len(settings)}] 参数：{result[0]}, 目标：{result[1]}"
+                    if result[2]["stopped"]:
+                        msg += "（提前终止）"
+                    self.output(msg)
+        finally:
+            pool.close()
+            pool.join()
+            context.release()
+
+        # Sort results, with settings stopped early at the end since their
+        # target values are calculated with partial data only
+        result_values.sort(
+            reverse=True,
+            key=lambda result: (not result[2]["stopped"], result[1])
+        )
+
+        return result_values
+
+    def create_optimization_context(
+        self,
+        target_name: str,
+        stop_loss: float = 0
+    ) -> "OptimizationContext":
+        """
+        Load history data and create context for optimization processes.
+        """
+        self.load_data()
+
+        arrays = dict(self.history_arrays)
+        arrays["datetime"] = self.dts
+        arrays["mask"] = self.history_mask
+        history_path = dump_history_arrays(arrays)
+
+        stop_balance = 0
+        if stop_loss:
+            stop_balance = self.capital * (1 - stop_loss)
+
+        return OptimizationContext(
+            target_name,
+            self.strategy_class,
+            self.get_parameters(),
+            self.get_history_range(),
+            history_path,
+            stop_balance
+        )
+
+    def run_ga_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        population_size: int = 100,
+        ngen_size: int = 30,
+        output: bool = True,
+        max_workers: int = None,
+        use_cache: bool = True,
+        stop_loss: float = 0
+    ) -> list:
         """"""
-        d = dt.date()
+        # Get optimization setting and target
+        settings = optimization_setting.generate_setting_ga()
+        target_name = optimization_setting.target_name
 
-        close_prices = {}
-        for bar in bars.values():
-            close_prices[bar.vt_symbol] = bar.close_price
+        if not settings:
+            self.output("优化参数组合为空，请检查")
+            return
+
+        if not target_name:
+            self.output("优化目标未设置，请检查")
+            return
 
-        daily_result = self.daily_results.get(d, None)
+        # Define parameter generation function
+        def generate_parameter():
+            """"""
+            return random.choice(settings)
+
+        def mutate_individual(individual, indpb):
+            """"""
+            size = len(individual)
+            paramlist = generate_parameter()
+            for i in range(size):
+                if random.random() < indpb:
+                    individual[i] = paramlist[i]
+            return individual,
+
+        # Load history data only once in main process, and share it with
+        # worker processes by memory mapped files
+        context = self.create_optimization_context(target_name, stop_loss)
+
+        # Fitness values already evaluated, also saved on disk so that
+        # running again with the same strategy and data can reuse them
+        if use_cache:
+            cache_path = get_fitness_cache_path(context)
+
+            # Fitness of settings stopped early depends on stop balance
+            if context.stop_balance:
+                cache_path = cache_path.with_name(
+                    f"{cache_path.stem}_{context.stop_balance}{cache_path.suffix}"
+                )
 
-        if daily_result:
-            daily_result.update_close_prices(close_prices)
+            fitness_cache = load_fitness_cache(cache_path)
         else:
-            self.daily_results[d] = PortfolioDailyResult(d, close_prices)
+            cache_path = None
+            fitness_cache = {}
+
+        # Evaluate individuals not in cache by multiprocessing pool
+        processes = max_workers or multiprocessing.cpu_count()
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(
+            processes,
+            initializer=init_optimization_process,
+            initargs=(context,)
+        )
+
+        def map_fitness(func, individuals):
+            """"""
+            keys = [str(dict(individual)) for individual in individuals]
+
+            new_settings = {}
+            for key, individual in zip(keys, individuals):
+                if key not in fitness_cache:
+                    new_settings[key] = dict(individual)
+
+            if new_settings:
+                chunksize = max(len(new_settings) // (processes * 4), 1)
+                values = pool.map(func, new_settings.values(), chunksize)
+                fitness_cache.update(zip(new_settings.keys(), values))
+
+                if cache_path:
+                    save_fitness_cache(cache_path, fitness_cache)
+
+            return [(fitness_cache[key],) for key in keys]
+
+        # Set up genetic algorithem
+        toolbox = base.Toolbox()
+        toolbox.register("individual", tools.initIterate, creator.Individual, generate_parameter)
+        toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+        toolbox.register("mate", tools.cxTwoPoint)
+        toolbox.register("mutate", mutate_individual, indpb=1)
+        toolbox.register("evaluate", run_ga_task)
+        toolbox.register("select", tools.selNSGA2)
+        toolbox.register("map", map_fitness)
+
+        total_size = len(settings)
+        pop_size = population_size                      # number of individuals in each generation
+        lambda_ = pop_size                              # number of children to produce at each generation
+        mu = int(pop_size * 0.8)                        # number of individuals to select for the next generation
+
+        cxpb = 0.95         # probability that an offspring is produced by crossover
+        mutpb = 1 - cxpb    # probability that an offspring is produced by mutation
+        ngen = ngen_size    # number of generation
+
+        pop = toolbox.population(pop_size)
+        hof = tools.ParetoFront()               # end result of pareto front
+
+        stats = tools.Statistics(lambda ind: ind.fitness.values)
+        np.set_printoptions(suppress=True)
+        stats.register("mean", np.mean, axis=0)
+        stats.register("std", np.std, axis=0)
+        stats.register("min", np.min, axis=0)
+        stats.register("max", np.max, axis=0)
+
+        # Run ga optimization
+        self.output(f"参数优化空间：{total_size}")
+        self.output(f"每代族群总数：{pop_size}")
+        self.output(f"优良筛选个数：{mu}")
+        self.output(f"迭代次数：{ngen}")
+        self.output(f"交叉概率：{cxpb:.0%}")
+        self.output(f"突变概率：{mutpb:.0%}")
+        self.output(f"已缓存结果：{len(fitness_cache)}")
+
+        start = time()
+
+        # Fitness of settings stopped early is -inf, which makes std of
+        # statistics invalid
+        try:
+            with np.errstate(invalid="ignore"):
+                algorithms.eaMuPlusLambda(
+                    pop,
+                    toolbox,
+                    mu,
+                    lambda_,
+                    cxpb,
+                    mutpb,
+                    ngen,
+                    stats,
+                    halloffame=hof,
+                    verbose=output
+                )
+        finally:
+            pool.close()
+            pool.join()
+            context.release()
+
+        end = time()
+        cost = int((end - start))
+
+        self.output(f"遗传算法优化完成，耗时{cost}秒")
+
+        # Return result list
+        results = []
 
-    def new_bars(self, dt: datetime) -> None:
+        for parameter_values in hof:
+            setting = dict(parameter_values)
+            target_value = parameter_values.fitness.values[0]
+            results.append((setting, target_value, {}))
+
+        return results
+
+    def new_bars(self, dt: datetime, bars: Dict[str, BarData]) -> None:
         """"""
         self.datetime = dt
-
-        self.bars.clear()
-        for vt_symbol in self.vt_symbols:
-            bar = self.history_data.get((dt, vt_symbol), None)
-            if bar:
-                self.bars[vt_symbol] = bar
-            else:
-                dt_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-                self.output(f"数据缺失：{dt_str} {vt_symbol}")
+        self.bars = bars
 
         self.cross_limit_order()
         self.strategy.on_bars(self.bars)
 
-        self.update_daily_close(self.bars, dt)
-
     def cross_limit_order(self) -> None:
         """
         Cross limit order with last bar/tick data.
         """
         for order in list(self.active_limit_orders.values()):
-            bar = self.bars[order.vt_symbol]
+            bar = self.bars.get(order.vt_symbol, None)
+            if not bar:
+                continue
 
             long_cross_price = bar.low_price
             short_cross_price = bar.high_price
@@ -555,6 +1098,9 @@ class BacktestingEngine:
             self.strategy.update_trade(trade)
             self.trades[trade.vt_tradeid] = trade
 
+            if self.balance_checker:
+                self.balance_checker.update_trade(trade)
+
     def load_bars(
         self,
         strategy: StrategyTemplate,
@@ -656,8 +1202,46 @@ class BacktestingEngine:
         """
         Return all daily result data.
         """
+        if not self.daily_results:
+            self.create_daily_results()
         return list(self.daily_results.values())
 
+    def create_daily_results(self) -> None:
+        """
+        Create daily result objects of each contract from daily close
+        prices and trades, which is not needed by calculate_result.
+        """
+        if self.daily_closes is None:
+            return
+
+        for d, closes in zip(self.daily_dates.tolist(), self.daily_closes.tolist()):
+            close_prices = {
+                vt_symbol: close_price
+                for vt_symbol, close_price in zip(self.vt_symbols, closes)
+                if close_price == close_price       # Skip NaN
+            }
+            self.daily_results[d] = PortfolioDailyResult(d, close_prices)
+
+        for trade in self.trades.values():
+            d = trade.datetime.date()
+            daily_result = self.daily_results[d]
+            daily_result.add_trade(trade)
+
+        pre_closes = {}
+        start_poses = {}
+
+        for daily_result in self.daily_results.values():
+            daily_result.calculate_pnl(
+                pre_closes,
+                start_poses,
+                self.sizes,
+                self.rates,
+                self.slippages,
+            )
+
+            pre_closes = daily_result.close_prices
+            start_poses = daily_result.end_poses
+
 
 class ContractDailyResult:
     """"""
@@ -806,8 +1390,197 @@ class PortfolioDailyResult:
             contract_result.update_close_price(close_price)
 
 
+class BalanceChecker:
+    """
+    Calculate balance at end of each day incrementally, with the same pnl
+    rule as calculate_result, for stopping backtesting early.
+    """
+
+    def __init__(self, engine: BacktestingEngine, start: int):
+        """
+        Start checking from bar at start, with no position before.
+        """
+        self.engine: BacktestingEngine = engine
+        self.start: int = start
+
+        self.balance: float = engine.capital
+        self.trades: List[TradeData] = []
+
+        vt_symbols = engine.vt_symbols
+        self.symbol_index: Dict[str, int] = {
+            vt_symbol: i for i, vt_symbol in enumerate(vt_symbols)
+        }
+        self.sizes: np.ndarray = np.array([engine.sizes[vt_symbol] for vt_symbol in vt_symbols])
+        self.rates: np.ndarray = np.array([engine.rates[vt_symbol] for vt_symbol in vt_symbols])
+        self.slippages: np.ndarray = np.array([engine.slippages[vt_symbol] for vt_symbol in vt_symbols])
+
+        self.poses: np.ndarray = np.zeros(len(vt_symbols))
+        self.closes: np.ndarray = self.get_closes(0, start, np.full(len(vt_symbols), np.nan))
+
+    def update_trade(self, trade: TradeData) -> None:
+        """"""
+        self.trades.append(trade)
+
+    def check(self, end: int) -> float:
+        """
+        Update pnl of day with bars in [start, end) and return balance.
+        """
+        pre_closes = self.closes
+        closes = self.get_closes(self.start, end, pre_closes)
+
+        with np.errstate(invalid="ignore"):
+            holding_pnl = np.nan_to_num(self.poses * (closes - pre_closes)) * self.sizes
+        self.balance += holding_pnl.sum()
+
+        for trade in self.trades:
+            i = self.symbol_index[trade.vt_symbol]
+            size = self.sizes[i]
+
+            if trade.direction == Direction.LONG:
+                pos_change = trade.volume
+            else:
+                pos_change = -trade.volume
+
+            trading_pnl = pos_change * (closes[i] - trade.price) * size
+            commission = trade.volume * trade.price * size * self.rates[i]
+            slippage = trade.volume * size * self.slippages[i]
+
+            self.balance += trading_pnl - commission - slippage
+            self.poses[i] += pos_change
+
+        self.trades = []
+        self.start = end
+        self.closes = closes
+
+        return self.balance
+
+    def get_closes(self, start: int, end: int, pre_closes: np.ndarray) -> np.ndarray:
+        """
+        Get last close price of each symbol in bars [start, end), or the
+        pre close price if symbol has no bar.
+        """
+        mask = self.engine.history_mask[start:end]
+        if not len(mask):
+            return pre_closes
+
+        # Row of last bar of each symbol, counted from end
+        last = np.argmax(mask[::-1], axis=0)
+        rows = end - 1 - last
+        cols = np.arange(mask.shape[1])
+
+        closes = self.engine.history_arrays["close_price"][rows, cols]
+        return np.where(mask.any(axis=0), closes, pre_closes)
+
+
+class OptimizationContext:
+    """
+    Picklable context for running backtesting with different setting in
+    optimization processes.
+
+    History arrays are shared by memory mapped files in history_path, so
+    that every process attaches to the same data instead of loading it
+    from database again.
+    """
+
+    def __init__(
+        self,
+        target_name: str,
+        strategy_class: type,
+        parameters: dict,
+        history_range: tuple,
+        history_path: str,
+        stop_balance: float = 0
+    ):
+        """"""
+        self.target_name: str = target_name
+        self.strategy_class: type = strategy_class
+        self.parameters: dict = parameters
+        self.history_range: tuple = history_range
+        self.history_path: str = history_path
+        self.stop_balance: float = stop_balance
+
+        self.engine: BacktestingEngine = None
+
+    def __getstate__(self) -> dict:
+        """
+        Engine is created again in each process.
+        """
+        state = self.__dict__.copy()
+        state["engine"] = None
+        return state
+
+    def get_engine(self) -> BacktestingEngine:
+        """"""
+        if not self.engine:
+            engine = BacktestingEngine()
+            engine.set_parameters(**self.parameters)
+            engine.stop_balance = self.stop_balance
+
+            arrays = attach_history_arrays(self.history_path)
+            engine.dts = arrays.pop("datetime")
+            engine.history_mask = arrays.pop("mask")
+            engine.history_arrays = arrays
+
+            self.engine = engine
+
+        return self.engine
+
+    def evaluate(self, setting: dict) -> tuple:
+        """
+        Run backtesting with strategy setting and return result.
+        """
+        engine = self.get_engine()
+        engine.clear_data()
+
+        engine.add_strategy(self.strategy_class, setting)
+        engine.run_backtesting()
+        engine.calculate_result()
+        statistics = engine.calculate_statistics(output=False)
+        statistics["stopped"] = engine.stopped
+
+        target_value = statistics[self.target_name]
+        return (str(setting), target_value, statistics)
+
+    def release(self) -> None:
+        """
+        Remove shared history data files.
+        """
+        self.engine = None
+
+        if self.history_path:
+            shutil.rmtree(self.history_path, ignore_errors=True)
+            self.history_path = ""
+
+
+def init_optimization_process(context: OptimizationContext) -> None:
+    """
+    Initializer of optimization process pool.
+    """
+    global optimization_context
+    optimization_context = context
+
+
+def run_optimization_task(setting: dict) -> tuple:
+    """
+    Function for running in optimization process pool.
+    """
+    return optimization_context.evaluate(setting)
+
+
+def run_ga_task(setting: dict) -> float:
+    """
+    Function for evaluating fitness in optimization process pool. Setting
+    stopped early gets the lowest fitness.
+    """
+    _, target_value, statistics = optimization_context.evaluate(setting)
+
+    if statistics["stopped"]:
+        return float("-inf")
+    return float(target_value)
+
+
 @lru_cache(maxsize=999)
-def load_bar_data(
+def load_bar_arrays(
     vt_symbol: str,
     interval: Interval,
     start: datetime,
@@ -816,6 +1589,16 @@ def load_bar_data(
     """"""
     symbol, exchange = extract_vt_symbol(vt_symbol)
 
-    return database_manager.load_bar_data(
+    return database_manager.load_bar_arrays(
         symbol, exchange, interval, start, end
     )
+
+
+def get_last_index(mask: np.ndarray) -> np.ndarray:
+    """
+    Get row index of last True value at or before each row of mask in
+    shape (time, symbol), -1 if none.
+    """
+    rows = np.arange(mask.shape[0]).reshape(-1, 1)
+    ix = np.where(mask, rows, -1)
+    return np.maximum.accumulate(ix, axis=0)
@@ -24,16 +24,19 @@ class RpcEngine(BaseEngine):
 
         self.rep_address = "tcp://*:2014"
         self.pub_address = "tcp://*:4102"
+        # Threads for executing remote calls concurrently, 0 for executing
+        # in server thread one by one, since gateways are not thread-safe
+        self.workers = 0
 
         self.server: Optional[RpcServer] = None
 
-        self.init_server()
         self.load_setting()
+        self.init_server()
         self.register_event()
 
     def init_server(self):
         """"""
-        self.server = RpcServer()
+        self.server = RpcServer(workers=self.workers)
 
         self.server.register(self.main_engine.subscribe)
         self.server.register(self.main_engine.send_order)
@@ -56,17 +59,21 @@ class RpcEngine(BaseEngine):
         self.server.register(self.main_engine.get_all_contracts)
         self.server.register(self.main_engine.get_all_active_orders)
 
+        self.server.register(self.event_engine.get_metrics)
+
     def load_setting(self):
         """"""
         setting = load_json(self.setting_filename)
         self.rep_address = setting.get("rep_address", self.rep_address)
         self.pub_address = setting.get("pub_address", self.pub_address)
+        self.workers = setting.get("workers", self.workers)
 
     def save_setting(self):
         """"""
         setting = {
             "rep_address": self.rep_address,
-            "pub_address": self.pub_address
+            "pub_address": self.pub_address,
+            "workers": self.workers
         }
         save_json(self.setting_filename, setting)
 
@@ -110,9 +117,12 @@ class RpcEngine(BaseEngine):
         self.event_engine.register_general(self.process_event)
 
     def process_event(self, event: Event):
-        """"""
+        """
+        Publish event with type and routing key as topic, so that client
+        can subscribe by event type or data of specific key (vt_symbol).
+        """
         if self.server.is_active():
-            self.server.publish("", event)
+            self.server.publish(event.type + event.key, event)
 
     def write_log(self, msg: str) -> None:
         """"""
@@ -1,13 +1,21 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime
 from enum import Enum
 from functools import lru_cache
 
+import numpy as np
+
 from vnpy.trader.object import (
     TickData, PositionData, TradeData, ContractData, BarData
 )
 from vnpy.trader.constant import Direction, Offset, Exchange, Interval
-from vnpy.trader.utility import floor_to, ceil_to, round_to, extract_vt_symbol
+from vnpy.trader.utility import (
+    floor_to,
+    ceil_to,
+    round_to,
+    round_to_array,
+    extract_vt_symbol
+)
 from vnpy.trader.database import database_manager
 
 
@@ -371,67 +379,192 @@ class BacktestingMode(Enum):
     TICK = 2
 
 
-@lru_cache(maxsize=999)
 def load_bar_data(
     spread: SpreadData,
     interval: Interval,
     start: datetime,
     end: datetime,
-    pricetick: float = 0
+    pricetick: float = 0,
+    fill_missing: bool = False
 ):
-    """"""
-    # Load bar data of each spread leg
-    leg_bars: Dict[str, Dict] = {}
+    """
+    Load spread bar data calculated from bar data of spread legs.
+
+    Only datetimes with bars of all legs are included by default. With
+    fill_missing, a leg without bar at some datetime is filled with its
+    last close price.
+    """
+    legs = tuple(
+        (vt_symbol, spread.price_multipliers[vt_symbol])
+        for vt_symbol in spread.legs.keys()
+    )
 
-    for vt_symbol in spread.legs.keys():
-        symbol, exchange = extract_vt_symbol(vt_symbol)
+    return load_spread_bars(
+        spread.name, legs, interval, start, end, pricetick, fill_missing
+    )
 
-        bar_data: List[BarData] = database_manager.load_bar_data(
-            symbol, exchange, interval, start, end
-        )
 
-        bars: Dict[datetime, BarData] = {bar.datetime: bar for bar in bar_data}
-        leg_bars[vt_symbol] = bars
+@lru_cache(maxsize=999)
+def load_spread_bars(
+    name: str,
+    legs: Tuple[Tuple[str, int]],
+    interval: Interval,
+    start: datetime,
+    end: datetime,
+    pricetick: float = 0,
+    fill_missing: bool = False
+) -> List[BarData]:
+    """
+    Load spread bar data cached by spread definition, which is name and
+    tuple of (vt_symbol, price_multiplier) of each leg.
+    """
+    arrays = load_spread_arrays(
+        legs, interval, start, end, pricetick, fill_missing
+    )
 
-    # Calculate spread bar data
-    spread_bars: List[BarData] = []
+    datetimes = arrays["datetime"].astype("datetime64[us]").tolist()
+    vt_symbol = f"{name}.{Exchange.LOCAL.value}"
 
-    for dt in bars.keys():
-        spread_price = 0
-        spread_value = 0
-        spread_available = True
+    # Arrays are in wall clock time, restore timezone of leg bars
+    symbol, exchange = extract_vt_symbol(legs[0][0])
+    leg_bar = database_manager.get_newest_bar_data(symbol, exchange, interval)
+    if leg_bar and leg_bar.datetime.tzinfo:
+        tz = leg_bar.datetime.tzinfo
+        datetimes = [dt.replace(tzinfo=tz) for dt in datetimes]
 
-        for leg in spread.legs.values():
-            leg_bar = leg_bars[leg.vt_symbol].get(dt, None)
+    new = object.__new__
+    spread_bars: List[BarData] = []
 
-            if leg_bar:
-                price_multiplier = spread.price_multipliers[leg.vt_symbol]
-                spread_price += price_multiplier * leg_bar.close_price
-                spread_value += abs(price_multiplier) * leg_bar.close_price
-            else:
-                spread_available = False
-
-        if spread_available:
-            if pricetick:
-                spread_price = round_to(spread_price, pricetick)
-
-            spread_bar = BarData(
-                symbol=spread.name,
-                exchange=exchange.LOCAL,
-                datetime=dt,
-                interval=interval,
-                open_price=spread_price,
-                high_price=spread_price,
-                low_price=spread_price,
-                close_price=spread_price,
-                gateway_name="SPREAD",
-            )
-            spread_bar.value = spread_value
-            spread_bars.append(spread_bar)
+    for dt, open_price, high_price, low_price, close_price, value in zip(
+        datetimes,
+        arrays["open_price"].tolist(),
+        arrays["high_price"].tolist(),
+        arrays["low_price"].tolist(),
+        arrays["close_price"].tolist(),
+        arrays["value"].tolist()
+    ):
+        # Set fields directly instead of calling dataclass __init__
+        spread_bar = new(BarData)
+        spread_bar.__dict__ = {
+            "gateway_name": "SPREAD",
+            "symbol": name,
+            "exchange": Exchange.LOCAL,
+            "datetime": dt,
+            "interval": interval,
+            "volume": 0,
+            "open_interest": 0,
+            "open_price": open_price,
+            "high_price": high_price,
+            "low_price": low_price,
+            "close_price": close_price,
+            "vt_symbol": vt_symbol,
+            "value": value
+        }
+        spread_bars.append(spread_bar)
 
     return spread_bars
 
 
+@lru_cache(maxsize=999)
+def load_spread_arrays(
+    legs: Tuple[Tuple[str, int]],
+    interval: Interval,
+    start: datetime,
+    end: datetime,
+    pricetick: float = 0,
+    fill_missing: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Load spread bar arrays of datetime, open/high/low/close price and
+    value (sum of leg close prices by absolute multipliers). Datetime is
+    wall clock time of leg bars without timezone.
+
+    High/low price is the highest/lowest spread price that high/low prices
+    of legs could make, since legs may not reach them at the same time.
+    """
+    # Load bar arrays of each spread leg
+    leg_arrays: List[Dict[str, np.ndarray]] = []
+
+    for vt_symbol, _ in legs:
+        symbol, exchange = extract_vt_symbol(vt_symbol)
+
+        arrays = database_manager.load_bar_arrays(
+            symbol, exchange, interval, start, end
+        )
+        leg_arrays.append(arrays)
+
+    # Join legs on datetime
+    leg_datetimes = [arrays["datetime"] for arrays in leg_arrays]
+
+    if fill_missing:
+        datetimes = np.unique(np.concatenate(leg_datetimes))
+    else:
+        datetimes = leg_datetimes[0]
+        for leg_datetime in leg_datetimes[1:]:
+            datetimes = np.intersect1d(datetimes, leg_datetime, assume_unique=True)
+
+    # Index of last bar at or before each datetime for every leg
+    leg_indexes = [
+        np.searchsorted(leg_datetime, datetimes, side="right") - 1
+        for leg_datetime in leg_datetimes
+    ]
+
+    # Drop datetimes before all legs have any bar
+    available = np.ones(len(datetimes), dtype=bool)
+    for ix in leg_indexes:
+        available &= ix >= 0
+
+    datetimes = datetimes[available]
+    leg_indexes = [ix[available] for ix in leg_indexes]
+
+    # Calculate spread prices
+    shape = len(datetimes)
+    open_price = np.zeros(shape)
+    high_price = np.zeros(shape)
+    low_price = np.zeros(shape)
+    close_price = np.zeros(shape)
+    value = np.zeros(shape)
+
+    for (vt_symbol, price_multiplier), arrays, ix in zip(legs, leg_arrays, leg_indexes):
+        leg_close = arrays["close_price"][ix]
+        leg_open = arrays["open_price"][ix]
+        leg_high = arrays["high_price"][ix]
+        leg_low = arrays["low_price"][ix]
+
+        # Bar filled with last close price
+        filled = arrays["datetime"][ix] != datetimes
+        if filled.any():
+            leg_open = np.where(filled, leg_close, leg_open)
+            leg_high = np.where(filled, leg_close, leg_high)
+            leg_low = np.where(filled, leg_close, leg_low)
+
+        open_price += price_multiplier * leg_open
+        close_price += price_multiplier * leg_close
+        value += abs(price_multiplier) * leg_close
+
+        if price_multiplier > 0:
+            high_price += price_multiplier * leg_high
+            low_price += price_multiplier * leg_low
+        else:
+            high_price += price_multiplier * leg_low
+            low_price += price_multiplier * leg_high
+
+    if pricetick:
+        open_price = round_to_array(open_price, pricetick)
+        high_price = round_to_array(high_price, pricetick)
+        low_price = round_to_array(low_price, pricetick)
+        close_price = round_to_array(close_price, pricetick)
+
+    return {
+        "datetime": datetimes,
+        "open_price": open_price,
+        "high_price": high_price,
+        "low_price": low_price,
+        "close_price": close_price,
+        "value": value
+    }
+
+
 @lru_cache(maxsize=999)
 def load_tick_data(
     spread: SpreadData,
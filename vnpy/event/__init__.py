@@ -1 +1,10 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import (
+    Event,
+    EventEngine,
+    PriorityEventEngine,
+    EVENT_TIMER,
+    EVENT_METRICS,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW
+)
@@ -2,13 +2,18 @@
 Event-driven framework of vn.py framework.
 """
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable, List
+from operator import attrgetter
+from threading import Condition, Lock, Thread
+from time import perf_counter, sleep
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .metrics import EventMetrics
 
 EVENT_TIMER = "eTimer"      # 计时器事件，每隔1秒发送一次
+EVENT_METRICS = "eMetrics"  # 事件引擎运行指标，启用后随计时器推送
 
 
 class Event:
@@ -16,17 +21,27 @@ class Event:
     Event object consists of a type string which is used
     by event engine for distributing event, and a data
     object which contains the real data.
+
+    The optional routing key (such as vt_symbol) is used for also
+    distributing event to handlers registered for type + key.
     """
 
-    def __init__(self, type: str, data: Any = None):
+    def __init__(self, type: str, data: Any = None, key: str = ""):
         """"""
         self.type: str = type
         self.data: Any = data
+        self.key: str = key
 
 
 # Defines handler function to be used in event engine.
 HandlerType = Callable[[Event], None]
 
+# Defines key function to be used for event conflation.
+KeyGetterType = Callable[[Event], Hashable]
+
+# Conflation key of event with data object like TickData.
+default_key_getter: KeyGetterType = attrgetter("data.vt_symbol")
+
 
 class EventEngine:
     """
@@ -50,6 +65,13 @@ class EventEngine:
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: List = []
 
+        self._key_getters: Dict[str, KeyGetterType] = {}
+        self._pending_events: Dict[Tuple[str, Hashable], Event] = {}
+        self._conflated_counts: defaultdict = defaultdict(int)
+        self._conflation_lock: Lock = Lock()
+
+        self._metrics: Optional[EventMetrics] = None
+
     def _run(self) -> None:
         """
         Get event from queue and then process it.
@@ -57,6 +79,10 @@ class EventEngine:
         while self._active:
             try:
                 event = self._queue.get(block=True, timeout=1)
+
+                if event.type in self._key_getters:
+                    event = self._release(event)
+
                 self._process(event)
             except Empty:
                 pass
@@ -64,26 +90,77 @@ class EventEngine:
     def _process(self, event: Event) -> None:
         """
         First ditribute event to those handlers registered listening
-        to this type.
+        to this type, and those listening to this type with routing key
+        of the event.
 
         Then distrubute event to those general handlers which listens
         to all types.
         """
+        if self._metrics:
+            self._process_with_metrics(event)
+            return
+
         if event.type in self._handlers:
             [handler(event) for handler in self._handlers[event.type]]
 
+        if event.key:
+            keyed_type = event.type + event.key
+            if keyed_type in self._handlers:
+                [handler(event) for handler in self._handlers[keyed_type]]
+
         if self._general_handlers:
             [handler(event) for handler in self._general_handlers]
 
+    def _process_with_metrics(self, event: Event) -> None:
+        """
+        Distribute event same as _process, while recording event count,
+        queue size and execution time of each handler.
+        """
+        metrics = self._metrics
+        metrics.update_event(event.type, self.get_queue_size())
+
+        for type in self._get_handler_types(event):
+            for handler in self._handlers[type]:
+                start = perf_counter()
+                handler(event)
+                metrics.update_handler(type, handler, perf_counter() - start)
+
+        for handler in self._general_handlers:
+            start = perf_counter()
+            handler(event)
+            metrics.update_handler(event.type, handler, perf_counter() - start)
+
+    def _get_handler_types(self, event: Event) -> List[str]:
+        """
+        Get registered types (with or without routing key) matching event.
+        """
+        types = []
+
+        if event.type in self._handlers:
+            types.append(event.type)
+
+        if event.key:
+            keyed_type = event.type + event.key
+            if keyed_type in self._handlers:
+                types.append(keyed_type)
+
+        return types
+
     def _run_timer(self) -> None:
         """
         Sleep by interval second(s) and then generate a timer event.
+
+        Snapshot of metrics is also pushed if enabled.
         """
         while self._active:
             sleep(self._interval)
             event = Event(EVENT_TIMER)
             self.put(event)
 
+            if self._metrics:
+                event = Event(EVENT_METRICS, self.get_metrics())
+                self.put(event)
+
     def start(self) -> None:
         """
         Start event engine to process events and generate timer events.
@@ -103,22 +180,134 @@ class EventEngine:
     def put(self, event: Event) -> None:
         """
         Put an event object into event queue.
+
+        For event type with conflation enabled, if there is already an
+        unprocessed event with the same key, the pending one is replaced
+        by the new event rather than putting it into queue again.
+        """
+        if event.type in self._key_getters and self._conflate(event):
+            return
+
+        self._put(event)
+
+    def _put(self, event: Event) -> None:
+        """
+        Put an event object into event queue directly.
         """
         self._queue.put(event)
 
-    def register(self, type: str, handler: HandlerType) -> None:
+    def _conflate(self, event: Event) -> bool:
+        """
+        Save event as latest value of its key. Return True if it replaced
+        an unprocessed event already in queue.
+        """
+        key = (event.type, self._key_getters[event.type](event))
+
+        with self._conflation_lock:
+            pending = key in self._pending_events
+            self._pending_events[key] = event
+
+            if pending:
+                self._conflated_counts[event.type] += 1
+
+        return pending
+
+    def _release(self, event: Event) -> Event:
+        """
+        Get the latest event of the same key when a conflated event is
+        taken out from queue.
+        """
+        key = (event.type, self._key_getters[event.type](event))
+
+        with self._conflation_lock:
+            return self._pending_events.pop(key, event)
+
+    def set_conflation(
+        self,
+        type: str,
+        key_getter: KeyGetterType = default_key_getter
+    ) -> None:
+        """
+        Enable conflation for a specific event type, so that only the
+        latest unprocessed event of each key (vt_symbol by default) is
+        kept in queue.
+
+        Only use it when all handlers of the event type need nothing
+        but the latest data, such as monitor or pricing of TickData.
+        """
+        self._key_getters[type] = key_getter
+
+    def remove_conflation(self, type: str) -> None:
+        """
+        Disable conflation for a specific event type.
+        """
+        with self._conflation_lock:
+            self._key_getters.pop(type, None)
+
+            for key in list(self._pending_events):
+                if key[0] == type:
+                    self._pending_events.pop(key)
+
+    def enable_metrics(
+        self,
+        slow_threshold: float = 0.01,
+        sample_size: int = 1000
+    ) -> None:
+        """
+        Start collecting runtime metrics. Handler call taking longer than
+        slow_threshold seconds is recorded as slow call.
+        """
+        self._metrics = EventMetrics(slow_threshold, sample_size)
+
+    def disable_metrics(self) -> None:
+        """
+        Stop collecting runtime metrics.
+        """
+        self._metrics = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get snapshot dict of runtime metrics, empty if not enabled.
+        """
+        metrics = self._metrics
+        if not metrics:
+            return {}
+
+        snapshot = metrics.get_snapshot()
+        snapshot["conflated"] = self.get_conflated_counts()
+        return snapshot
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in queue.
+        """
+        return self._queue.qsize()
+
+    def get_conflated_counts(self) -> Dict[str, int]:
+        """
+        Get number of events conflated (dropped as stale) for each type.
+        """
+        with self._conflation_lock:
+            return dict(self._conflated_counts)
+
+    def register(self, type: str, handler: HandlerType, key: str = "") -> None:
         """
         Register a new handler function for a specific event type. Every
         function can only be registered once for each event type.
+
+        If key is given, handler only receives event of the type which
+        has the same routing key. This is same as registering for
+        type + key, e.g. EVENT_TICK + vt_symbol.
         """
-        handler_list = self._handlers[type]
+        handler_list = self._handlers[type + key]
         if handler not in handler_list:
             handler_list.append(handler)
 
-    def unregister(self, type: str, handler: HandlerType) -> None:
+    def unregister(self, type: str, handler: HandlerType, key: str = "") -> None:
         """
         Unregister an existing handler function from event engine.
         """
+        type = type + key
         handler_list = self._handlers[type]
 
         if handler in handler_list:
@@ -141,3 +330,225 @@ class EventEngine:
         """
         if handler in self._general_handlers:
             self._general_handlers.remove(handler)
+
+
+PRIORITY_HIGH = 0           # 交易相关事件，如委托、成交、持仓、资金
+PRIORITY_NORMAL = 1         # 行情相关事件，如Tick、合约
+PRIORITY_LOW = 2            # 日志等非关键事件
+
+
+class PriorityEventEngine(EventEngine):
+    """
+    Event engine with separate queues for events of different priority.
+
+    Events in higher priority queue are always processed before those
+    in lower priority queues, so that trading events will not be delayed
+    behind a burst of market data.
+
+    Handlers registered as thread-safe are executed by a pool of worker
+    threads, instead of the event processing thread.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        priorities: Dict[str, int] = None,
+        workers: int = 0
+    ):
+        """
+        Priority of event type is matched by prefix, the longest prefix
+        wins. Event types not found in priorities use PRIORITY_NORMAL.
+        """
+        super().__init__(interval)
+
+        self._queues: List[deque] = [deque() for _ in range(PRIORITY_LOW + 1)]
+        self._condition: Condition = Condition()
+
+        self._priorities: Dict[str, int] = {}
+        self._priority_cache: Dict[str, int] = {}
+
+        self._workers: int = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._threadsafe_handlers: defaultdict = defaultdict(list)
+
+        if priorities:
+            for type, priority in priorities.items():
+                self.set_priority(type, priority)
+
+    def set_priority(self, type: str, priority: int) -> None:
+        """
+        Set priority for event type (or event type prefix).
+        """
+        if priority < PRIORITY_HIGH or priority > PRIORITY_LOW:
+            raise ValueError(f"Invalid event priority: {priority}")
+
+        self._priorities[type] = priority
+        self._priority_cache.clear()
+
+    def get_priority(self, type: str) -> int:
+        """
+        Get priority of event type.
+        """
+        priority = self._priority_cache.get(type, None)
+        if priority is not None:
+            return priority
+
+        priority = PRIORITY_NORMAL
+        matched = -1
+
+        for prefix, value in self._priorities.items():
+            if type.startswith(prefix) and len(prefix) > matched:
+                priority = value
+                matched = len(prefix)
+
+        self._priority_cache[type] = priority
+        return priority
+
+    def _run(self) -> None:
+        """
+        Get event from queue with highest priority and then process it.
+        """
+        while self._active:
+            event = self._get(timeout=1)
+            if event:
+                self._process(event)
+
+    def _get(self, timeout: float) -> Optional[Event]:
+        """
+        Pop event from queues by priority order, wait for timeout if
+        all queues are empty.
+        """
+        event = None
+
+        with self._condition:
+            for queue in self._queues:
+                if queue:
+                    event = queue.popleft()
+                    break
+            else:
+                self._condition.wait(timeout)
+
+                for queue in self._queues:
+                    if queue:
+                        event = queue.popleft()
+                        break
+
+        if event and event.type in self._key_getters:
+            event = self._release(event)
+
+        return event
+
+    def _process(self, event: Event) -> None:
+        """
+        Distribute event to handlers running in event processing thread
+        first, then submit it to worker threads for thread-safe handlers.
+        """
+        super()._process(event)
+
+        types = []
+
+        if event.type in self._threadsafe_handlers:
+            types.append(event.type)
+
+        if event.key:
+            keyed_type = event.type + event.key
+            if keyed_type in self._threadsafe_handlers:
+                types.append(keyed_type)
+
+        for type in types:
+            for handler in self._threadsafe_handlers[type]:
+                if self._executor:
+                    self._executor.submit(self._run_threadsafe_handler, type, handler, event)
+                else:
+                    self._run_threadsafe_handler(type, handler, event)
+
+    def _run_threadsafe_handler(self, type: str, handler: HandlerType, event: Event) -> None:
+        """
+        Run thread-safe handler, and record its execution time if metrics
+        is enabled.
+        """
+        metrics = self._metrics
+        if not metrics:
+            handler(event)
+            return
+
+        start = perf_counter()
+        handler(event)
+        metrics.update_handler(type, handler, perf_counter() - start)
+
+    def start(self) -> None:
+        """
+        Start worker threads before event processing.
+        """
+        if self._workers:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers,
+                thread_name_prefix="EventWorker"
+            )
+
+        super().start()
+
+    def stop(self) -> None:
+        """
+        Stop event engine and wait for worker threads to finish.
+        """
+        super().stop()
+
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in all priority queues.
+        """
+        return sum([len(queue) for queue in self._queues])
+
+    def _put(self, event: Event) -> None:
+        """
+        Put an event object into queue of its priority.
+        """
+        priority = self.get_priority(event.type)
+
+        with self._condition:
+            self._queues[priority].append(event)
+            self._condition.notify()
+
+    def register(
+        self,
+        type: str,
+        handler: HandlerType,
+        key: str = "",
+        threadsafe: bool = False
+    ) -> None:
+        """
+        Register a new handler function for a specific event type.
+
+        Thread-safe handler will be executed concurrently by worker
+        threads, so the processing order of events is not guaranteed.
+        """
+        if not threadsafe:
+            super().register(type, handler, key)
+            return
+
+        handler_list = self._threadsafe_handlers[type + key]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister(self, type: str, handler: HandlerType, key: str = "") -> None:
+        """
+        Unregister an existing handler function from event engine.
+        """
+        type = type + key
+
+        if type in self._handlers:
+            super().unregister(type, handler)
+
+        if type in self._threadsafe_handlers:
+            handler_list = self._threadsafe_handlers[type]
+
+            if handler in handler_list:
+                handler_list.remove(handler)
+
+            if not handler_list:
+                self._threadsafe_handlers.pop(type)
@@ -0,0 +1,175 @@
+"""
+Runtime metrics of event engine.
+"""
+
+from collections import defaultdict, deque
+from threading import Lock
+from time import time
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+
+class HandlerStats:
+    """
+    Execution time statistics of a handler for one event type.
+    """
+
+    def __init__(self, name: str, sample_size: int):
+        """"""
+        self.name: str = name
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+
+    def update(self, cost: float) -> None:
+        """"""
+        self.count += 1
+        self.total += cost
+        self.samples.append(cost)
+
+        if cost > self.max:
+            self.max = cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to dict with cost in milliseconds.
+        """
+        samples = sorted(self.samples)
+
+        return {
+            "count": self.count,
+            "total": self.total * 1000,
+            "avg": self.total / self.count * 1000 if self.count else 0,
+            "max": self.max * 1000,
+            "p50": get_percentile(samples, 0.5) * 1000,
+            "p90": get_percentile(samples, 0.9) * 1000,
+            "p99": get_percentile(samples, 0.99) * 1000,
+        }
+
+
+class EventMetrics:
+    """
+    Collects event counts, queue depth and handler execution time
+    of event engine.
+    """
+
+    def __init__(self, slow_threshold: float = 0.01, sample_size: int = 1000):
+        """
+        Handler call taking longer than slow_threshold (in seconds) is
+        recorded as slow call. Percentiles of handler cost are calculated
+        from the latest sample_size calls.
+        """
+        self.slow_threshold: float = slow_threshold
+        self.sample_size: int = sample_size
+
+        self.start_time: float = time()
+        self.last_time: float = self.start_time
+
+        self.event_counts: defaultdict = defaultdict(int)
+        self.last_counts: Dict[str, int] = {}
+
+        self.queue_size: int = 0
+        self.queue_high: int = 0
+
+        self.handler_stats: Dict[Tuple[str, Callable], HandlerStats] = {}
+        self.slow_calls: List[Dict[str, Any]] = []
+        self.slow_count: int = 0
+
+        self.lock: Lock = Lock()
+
+    def update_event(self, type: str, queue_size: int) -> None:
+        """
+        Record an event taken out from queue.
+        """
+        with self.lock:
+            self.event_counts[type] += 1
+            self.queue_size = queue_size
+
+            if queue_size > self.queue_high:
+                self.queue_high = queue_size
+
+    def update_handler(self, type: str, handler: Callable, cost: float) -> None:
+        """
+        Record execution time of a handler.
+        """
+        key = (type, handler)
+
+        with self.lock:
+            stats = self.handler_stats.get(key, None)
+            if not stats:
+                stats = HandlerStats(get_handler_name(handler), self.sample_size)
+                self.handler_stats[key] = stats
+
+            stats.update(cost)
+
+            if cost > self.slow_threshold:
+                self.slow_count += 1
+
+                # Keep only limited slow call records between snapshots
+                if len(self.slow_calls) < 100:
+                    self.slow_calls.append({
+                        "time": time(),
+                        "type": type,
+                        "handler": stats.name,
+                        "cost": cost * 1000
+                    })
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Get snapshot of all metrics. Rate of events and slow calls
+        are counted since last snapshot.
+        """
+        with self.lock:
+            now = time()
+            elapsed = max(now - self.last_time, 1e-6)
+
+            events = {}
+            for type, count in self.event_counts.items():
+                delta = count - self.last_counts.get(type, 0)
+                events[type] = {"count": count, "rate": delta / elapsed}
+
+            handlers = {}
+            for (type, _), stats in self.handler_stats.items():
+                handlers[f"{type}|{stats.name}"] = stats.to_dict()
+
+            snapshot = {
+                "time": now,
+                "uptime": now - self.start_time,
+                "queue_size": self.queue_size,
+                "queue_high": self.queue_high,
+                "events": events,
+                "handlers": handlers,
+                "slow_count": self.slow_count,
+                "slow_calls": self.slow_calls,
+            }
+
+            self.last_time = now
+            self.last_counts = dict(self.event_counts)
+            self.slow_calls = []
+
+        return snapshot
+
+
+def get_handler_name(handler: Callable) -> str:
+    """
+    Get readable name of handler function.
+    """
+    name = getattr(handler, "__qualname__", None)
+    if not name:
+        return repr(handler)
+
+    module = getattr(handler, "__module__", "")
+    if module:
+        return f"{module}.{name}"
+    return name
+
+
+def get_percentile(samples: List[float], percent: float) -> float:
+    """
+    Get percentile value from sorted samples.
+    """
+    if not samples:
+        return 0
+
+    ix = min(int(len(samples) * percent), len(samples) - 1)
+    return samples[ix]
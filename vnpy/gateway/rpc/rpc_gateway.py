@@ -1,6 +1,15 @@
 from vnpy.event import Event
 from vnpy.rpc import RpcClient
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.event import (
+    EVENT_TICK,
+    EVENT_ORDER,
+    EVENT_TRADE,
+    EVENT_POSITION,
+    EVENT_ACCOUNT,
+    EVENT_CONTRACT,
+    EVENT_LOG
+)
 from vnpy.trader.object import (
     SubscribeRequest,
     CancelRequest,
@@ -35,7 +44,18 @@ class RpcGateway(BaseGateway):
         req_address = setting["主动请求地址"]
         pub_address = setting["推送订阅地址"]
 
-        self.client.subscribe_topic("")
+        # Only subscribe trading related data, tick data is subscribed
+        # by symbol when requested
+        for topic in [
+            EVENT_ORDER,
+            EVENT_TRADE,
+            EVENT_POSITION,
+            EVENT_ACCOUNT,
+            EVENT_CONTRACT,
+            EVENT_LOG
+        ]:
+            self.client.subscribe_topic(topic)
+
         self.client.start(req_address, pub_address)
 
         self.write_log("服务器连接成功，开始初始化查询")
@@ -45,6 +65,7 @@ class RpcGateway(BaseGateway):
     def subscribe(self, req: SubscribeRequest):
         """"""
         gateway_name = self.symbol_gateway_map.get(req.vt_symbol, "")
+        self.client.subscribe_topic(EVENT_TICK + req.vt_symbol)
         self.client.subscribe(req, gateway_name)
 
     def send_order(self, req: OrderRequest):
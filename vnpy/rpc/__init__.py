@@ -2,16 +2,20 @@ import os
 import signal
 import threading
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Any, Callable, Dict
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from pathlib import Path
+from time import time
 
 import zmq
 import zmq.auth
-from zmq.backend.cython.constants import NOBLOCK
 from zmq.auth.thread import ThreadAuthenticator
 
+from .serializer import BaseSerializer, BinarySerializer, PickleSerializer  # noqa
+
 
 # Achieve Ctrl-c interrupt recv
 signal.signal(signal.SIGINT, signal.SIG_DFL)
@@ -21,6 +25,13 @@ KEEP_ALIVE_TOPIC: str = "_keep_alive"
 KEEP_ALIVE_INTERVAL: timedelta = timedelta(seconds=1)
 KEEP_ALIVE_TOLERANCE: timedelta = timedelta(seconds=3)
 
+# Poll interval (milliseconds) of client, also max delay of new subscription
+SUBSCRIBE_POLL_INTERVAL: int = 100
+
+# Max number of topics cached for subscription matching, since topics may
+# contain order id and keep growing
+TOPIC_CACHE_SIZE: int = 10000
+
 
 class RemoteException(Exception):
     """
@@ -41,23 +52,55 @@ class RemoteException(Exception):
 
 
 class RpcServer:
-    """"""
+    """
+    Requests are received by a ROUTER socket, so that both REQ clients
+    and DEALER clients (with request id) are supported.
 
-    def __init__(self):
+    If workers is set, requests are executed concurrently by a pool of
+    worker threads, and a slow function will not block other requests.
+    Functions registered should be thread-safe in this mode.
+    """
+
+    def __init__(self, serializer: BaseSerializer = None, workers: int = 0):
         """
         Constructor
         """
         # Save functions dict: key is fuction name, value is fuction object
         self.__functions: Dict[str, Any] = {}
 
+        # Serializer used for converting data, must be same with client
+        if not serializer:
+            serializer = BinarySerializer()
+        self.__serializer: BaseSerializer = serializer
+
         # Zmq port related
         self.__context: zmq.Context = zmq.Context()
 
-        # Reply socket (Request–reply pattern)
-        self.__socket_rep: zmq.Socket = self.__context.socket(zmq.REP)
+        # Reply socket (Request–reply pattern), ROUTER is used for
+        # replying requests out of order
+        self.__socket_rep: zmq.Socket = self.__context.socket(zmq.ROUTER)
 
-        # Publish socket (Publish–subscribe pattern)
-        self.__socket_pub: zmq.Socket = self.__context.socket(zmq.PUB)
+        # Inproc sockets for passing replies from worker threads
+        reply_address = f"inproc://rpc_reply_{id(self)}"
+
+        self.__socket_reply_pull: zmq.Socket = self.__context.socket(zmq.PULL)
+        self.__socket_reply_pull.bind(reply_address)
+
+        self.__socket_reply_push: zmq.Socket = self.__context.socket(zmq.PUSH)
+        self.__socket_reply_push.connect(reply_address)
+        self.__reply_lock: threading.Lock = threading.Lock()
+
+        # Worker threads for executing requests
+        self.__workers: int = workers
+        self.__executor: Optional[ThreadPoolExecutor] = None
+
+        # Publish socket (Publish–subscribe pattern), XPUB is used
+        # for receiving topics subscribed by clients
+        self.__socket_pub: zmq.Socket = self.__context.socket(zmq.XPUB)
+
+        # Topics subscribed by any client
+        self.__subscriptions: Set[str] = set()
+        self.__topic_matched: Dict[str, bool] = {}
 
         # Worker thread related
         self.__active: bool = False                     # RpcServer status
@@ -108,6 +151,13 @@ class RpcServer:
         self.__socket_rep.bind(rep_address)
         self.__socket_pub.bind(pub_address)
 
+        # Start worker threads
+        if self.__workers:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=self.__workers,
+                thread_name_prefix="RpcWorker"
+            )
+
         # Start RpcServer status
         self.__active = True
 
@@ -137,6 +187,10 @@ class RpcServer:
         """
         start = datetime.utcnow()
 
+        poller = zmq.Poller()
+        poller.register(self.__socket_rep, zmq.POLLIN)
+        poller.register(self.__socket_reply_pull, zmq.POLLIN)
+
         while self.__active:
             # Use poll to wait event arrival, waiting time is 1 second (1000 milliseconds)
             cur = datetime.utcnow()
@@ -144,37 +198,144 @@ class RpcServer:
 
             if delta >= KEEP_ALIVE_INTERVAL:
                 self.publish(KEEP_ALIVE_TOPIC, cur)
+                start = cur
 
-            if not self.__socket_rep.poll(1000):
-                continue
+            events = dict(poller.poll(1000))
 
-            # Receive request data from Reply socket
-            req = self.__socket_rep.recv_pyobj()
+            # Send replies finished by worker threads
+            if self.__socket_reply_pull in events:
+                while True:
+                    try:
+                        frames = self.__socket_reply_pull.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self.__socket_rep.send_multipart(frames)
 
-            # Get function name and parameters
-            name, args, kwargs = req
+            if self.__socket_rep not in events:
+                continue
 
-            # Try to get and execute callable function object; capture exception information if it fails
-            try:
-                func = self.__functions[name]
-                r = func(*args, **kwargs)
-                rep = [True, r]
-            except Exception as e:  # noqa
-                rep = [False, traceback.format_exc()]
+            # Receive request data from Reply socket: the last frame is
+            # request data, others are envelope (and request id) used
+            # for routing reply back to client
+            frames = self.__socket_rep.recv_multipart()
+            header = frames[:-1]
+            data = frames[-1]
+
+            if self.__executor:
+                self.__executor.submit(self._process_async, header, data)
+            else:
+                self.__socket_rep.send_multipart(self._process(header, data))
 
-            # send callable response by Reply socket
-            self.__socket_rep.send_pyobj(rep)
+        # Stop worker threads
+        if self.__executor:
+            self.__executor.shutdown()
+            self.__executor = None
 
         # Unbind socket address
         self.__socket_pub.unbind(self.__socket_pub.LAST_ENDPOINT)
         self.__socket_rep.unbind(self.__socket_rep.LAST_ENDPOINT)
 
+    def _process(self, header: List[bytes], data: bytes) -> List[bytes]:
+        """
+        Execute request and return reply frames.
+        """
+        # Get function name and parameters
+        name, args, kwargs = self.__serializer.unpack(data)
+
+        # Try to get and execute callable function object; capture exception information if it fails
+        try:
+            func = self.__functions[name]
+            r = func(*args, **kwargs)
+            rep = [True, r]
+        except Exception as e:  # noqa
+            rep = [False, traceback.format_exc()]
+
+        try:
+            rep_data = self.__serializer.pack(rep)
+        except Exception:  # noqa
+            rep_data = self.__serializer.pack([False, traceback.format_exc()])
+
+        return header + [rep_data]
+
+    def _process_async(self, header: List[bytes], data: bytes) -> None:
+        """
+        Execute request in worker thread and pass reply to server thread.
+        """
+        frames = self._process(header, data)
+
+        with self.__reply_lock:
+            self.__socket_reply_push.send_multipart(frames)
+
     def publish(self, topic: str, data: Any) -> None:
         """
-        Publish data
+        Publish data with topic as a separate frame, so that prefix
+        subscription of client works on the topic.
+
+        Data of topic not subscribed by any client is dropped without
+        being serialized.
+        """
+        with self.__lock:
+            self._update_subscriptions()
+            subscribed = self._match_topic(topic)
+
+        if not subscribed:
+            return
+
+        payload = self.__serializer.pack(data)
+
+        with self.__lock:
+            self.__socket_pub.send_multipart([topic.encode("utf-8"), payload])
+
+    def is_subscribed(self, topic: str) -> bool:
+        """
+        Check if topic is subscribed (by prefix) by any client.
         """
         with self.__lock:
-            self.__socket_pub.send_pyobj([topic, data])
+            return self._match_topic(topic)
+
+    def _match_topic(self, topic: str) -> bool:
+        """
+        Match topic with subscriptions and cache the result, should be
+        called with lock acquired.
+        """
+        matched = self.__topic_matched.get(topic, None)
+
+        if matched is None:
+            matched = False
+            for prefix in self.__subscriptions:
+                if topic.startswith(prefix):
+                    matched = True
+                    break
+
+            # Clear cache when full, topics published frequently will be
+            # cached again soon
+            if len(self.__topic_matched) >= TOPIC_CACHE_SIZE:
+                self.__topic_matched = {}
+            self.__topic_matched[topic] = matched
+
+        return matched
+
+    def _update_subscriptions(self) -> None:
+        """
+        Receive subscription changes from XPUB socket, should be called
+        with lock acquired.
+        """
+        while True:
+            try:
+                msg = self.__socket_pub.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+
+            if not msg:
+                continue
+
+            topic = msg[1:].decode("utf-8")
+            if msg[0] == 1:
+                self.__subscriptions.add(topic)
+            else:
+                self.__subscriptions.discard(topic)
+
+            self.__topic_matched = {}
 
     def register(self, func: Callable) -> None:
         """
@@ -190,15 +351,42 @@ class RpcServer:
 
 
 class RpcClient:
-    """"""
+    """
+    Remote functions can be called directly as method of client, or by
+    call_async which returns a Future, so that several requests can be
+    sent without waiting for previous replies.
+
+    Replies are received by client thread, which also runs callback. So
+    remote functions cannot be called directly in callback, and Future
+    from call_async should not be waited in callback either.
+    """
 
-    def __init__(self):
+    def __init__(self, serializer: BaseSerializer = None):
         """Constructor"""
+        # Serializer used for converting data, must be same with server
+        if not serializer:
+            serializer = BinarySerializer()
+        self.__serializer: BaseSerializer = serializer
+
         # zmq port related
         self.__context: zmq.Context = zmq.Context()
 
-        # Request socket (Request–reply pattern)
-        self.__socket_req: zmq.Socket = self.__context.socket(zmq.REQ)
+        # Request socket (Request–reply pattern), DEALER is used for
+        # sending requests with id without waiting for reply
+        self.__socket_req: zmq.Socket = self.__context.socket(zmq.DEALER)
+
+        # Inproc sockets for passing requests to worker thread
+        request_address = f"inproc://rpc_request_{id(self)}"
+
+        self.__socket_request_pull: zmq.Socket = self.__context.socket(zmq.PULL)
+        self.__socket_request_pull.bind(request_address)
+
+        self.__socket_request_push: zmq.Socket = self.__context.socket(zmq.PUSH)
+        self.__socket_request_push.connect(request_address)
+
+        # Futures of requests waiting for reply
+        self.__request_count: count = count()
+        self.__futures: Dict[bytes, Future] = {}
 
         # Subscribe socket (Publish–subscribe pattern)
         self.__socket_sub: zmq.Socket = self.__context.socket(zmq.SUB)
@@ -208,35 +396,57 @@ class RpcClient:
         self.__thread: threading.Thread = None      # RpcClient thread
         self.__lock: threading.Lock = threading.Lock()
 
+        # Topic subscription changes to be applied by worker thread,
+        # since zmq socket is not thread-safe
+        self.__topic_changes: List[Tuple[int, str]] = []
+        self.__topic_lock: threading.Lock = threading.Lock()
+
         # Authenticator used to ensure data security
         self.__authenticator: ThreadAuthenticator = None
 
         self._last_received_ping: datetime = datetime.utcnow()
 
+        # Keep alive data is always needed whatever topic subscribed
+        self.subscribe_topic(KEEP_ALIVE_TOPIC)
+
     @lru_cache(100)
     def __getattr__(self, name: str):
         """
         Realize remote call function
         """
 
-        # Perform remote call task
+        # Perform remote call task and wait for response
         def dorpc(*args, **kwargs):
-            # Generate request
-            req = [name, args, kwargs]
-
-            # Send request and wait for response
-            with self.__lock:
-                self.__socket_req.send_pyobj(req)
-                rep = self.__socket_req.recv_pyobj()
+            # Reply is received by client thread, which would be blocked
+            # if waiting for it in callback
+            if threading.current_thread() is self.__thread:
+                raise RuntimeError(
+                    f"不能在RpcClient回调函数中同步调用远程函数：{name}，请使用call_async"
+                )
 
-            # Return response if successed; Trigger exception if failed
-            if rep[0]:
-                return rep[1]
-            else:
-                raise RemoteException(rep[1])
+            future = self.call_async(name, *args, **kwargs)
+            return future.result()
 
         return dorpc
 
+    def call_async(self, name: str, *args, **kwargs) -> Future:
+        """
+        Send remote call request and return a Future of the result.
+
+        Future raises RemoteException if remote call failed.
+        """
+        # Generate request
+        data = self.__serializer.pack([name, args, kwargs])
+        future = Future()
+
+        # Send request with id through worker thread
+        with self.__lock:
+            req_id = str(next(self.__request_count)).encode()
+            self.__futures[req_id] = future
+            self.__socket_request_push.send_multipart([b"", req_id, data])
+
+        return future
+
     def start(
         self, 
         req_address: str, 
@@ -273,6 +483,7 @@ class RpcClient:
         # Connect zmq port
         self.__socket_req.connect(req_address)
         self.__socket_sub.connect(sub_address)
+        self._apply_topic_changes()
 
         # Start RpcClient status
         self.__active = True
@@ -303,15 +514,50 @@ class RpcClient:
         """
         Run RpcClient function
         """
-        pull_tolerance = int(KEEP_ALIVE_TOLERANCE.total_seconds() * 1000)
+        tolerance = KEEP_ALIVE_TOLERANCE.total_seconds()
+        last_received = time()
+
+        poller = zmq.Poller()
+        poller.register(self.__socket_sub, zmq.POLLIN)
+        poller.register(self.__socket_req, zmq.POLLIN)
+        poller.register(self.__socket_request_pull, zmq.POLLIN)
 
         while self.__active:
-            if not self.__socket_sub.poll(pull_tolerance):
-                self._on_unexpected_disconnected()
+            self._apply_topic_changes()
+
+            # Poll with short interval to apply subscription in time
+            events = dict(poller.poll(SUBSCRIBE_POLL_INTERVAL))
+
+            # Send requests to server
+            if self.__socket_request_pull in events:
+                while True:
+                    try:
+                        frames = self.__socket_request_pull.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self.__socket_req.send_multipart(frames)
+
+            # Receive replies from server
+            if self.__socket_req in events:
+                while True:
+                    try:
+                        frames = self.__socket_req.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self._process_reply(frames[-2], frames[-1])
+
+            if self.__socket_sub not in events:
+                if time() - last_received > tolerance:
+                    self._on_unexpected_disconnected()
+                    last_received = time()
                 continue
 
+            last_received = time()
+
             # Receive data from subscribe socket
-            topic, data = self.__socket_sub.recv_pyobj(flags=NOBLOCK)
+            topic, payload = self.__socket_sub.recv_multipart(flags=zmq.NOBLOCK)
+            topic = topic.decode("utf-8")
+            data = self.__serializer.unpack(payload)
 
             if topic == KEEP_ALIVE_TOPIC:
                 self._last_received_ping = data
@@ -319,10 +565,40 @@ class RpcClient:
                 # Process data by callable function
                 self.callback(topic, data)
 
+        # Cancel requests not replied
+        with self.__lock:
+            futures = list(self.__futures.values())
+            self.__futures.clear()
+
+        for future in futures:
+            future.set_exception(RemoteException("RpcClient stopped"))
+
         # Close socket
         self.__socket_req.close()
         self.__socket_sub.close()
 
+    def _process_reply(self, req_id: bytes, data: bytes) -> None:
+        """
+        Set result of request future.
+        """
+        with self.__lock:
+            future = self.__futures.pop(req_id, None)
+
+        if not future:
+            return
+
+        try:
+            rep = self.__serializer.unpack(data)
+        except Exception:  # noqa
+            future.set_exception(RemoteException(traceback.format_exc()))
+            return
+
+        # Return response if successed; Trigger exception if failed
+        if rep[0]:
+            future.set_result(rep[1])
+        else:
+            future.set_exception(RemoteException(rep[1]))
+
     @staticmethod
     def _on_unexpected_disconnected():
         print("RpcServer has no response over {tolerance} seconds, please check you connection."
@@ -336,9 +612,31 @@ class RpcClient:
 
     def subscribe_topic(self, topic: str) -> None:
         """
-        Subscribe data
+        Subscribe data with topic prefix, can be called after started.
+        """
+        with self.__topic_lock:
+            self.__topic_changes.append((zmq.SUBSCRIBE, topic))
+
+    def unsubscribe_topic(self, topic: str) -> None:
+        """
+        Unsubscribe data with topic prefix.
         """
-        self.__socket_sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        with self.__topic_lock:
+            self.__topic_changes.append((zmq.UNSUBSCRIBE, topic))
+
+    def _apply_topic_changes(self) -> None:
+        """
+        Set subscription option of sub socket.
+        """
+        if not self.__topic_changes:
+            return
+
+        with self.__topic_lock:
+            changes = self.__topic_changes
+            self.__topic_changes = []
+
+        for option, topic in changes:
+            self.__socket_sub.setsockopt_string(option, topic)
 
 
 def generate_certificates(name: str) -> None:
@@ -0,0 +1,604 @@
+"""
+Serializers used by RpcServer and RpcClient for converting python
+objects to bytes transmitted by zmq.
+"""
+
+import pickle
+from abc import ABC, abstractmethod
+from dataclasses import fields, is_dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from operator import attrgetter
+from struct import Struct, error as StructError
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from vnpy.event import Event
+
+
+class BaseSerializer(ABC):
+    """
+    Abstract class for converting python object to bytes and vice versa.
+    """
+
+    @abstractmethod
+    def pack(self, obj: Any) -> bytes:
+        """
+        Convert object to bytes.
+        """
+        pass
+
+    @abstractmethod
+    def unpack(self, data: bytes) -> Any:
+        """
+        Convert bytes back to object.
+        """
+        pass
+
+
+class PickleSerializer(BaseSerializer):
+    """
+    Serializer using pickle, supports any picklable object.
+    """
+
+    def pack(self, obj: Any) -> bytes:
+        """"""
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def unpack(self, data: bytes) -> Any:
+        """"""
+        return pickle.loads(data)
+
+
+# Type tags of binary format
+TAG_NONE = 0
+TAG_TRUE = 1
+TAG_FALSE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_BYTES = 6
+TAG_LIST = 7
+TAG_TUPLE = 8
+TAG_DICT = 9
+TAG_DATETIME = 10
+TAG_ENUM = 11
+TAG_OBJECT = 12
+TAG_EVENT = 13
+TAG_PICKLE = 255
+
+# Enum index for empty value of enum field
+ENUM_NONE = 255
+ENUM_EMPTY = 254
+
+# Timezone offset (minutes) for naive datetime and None
+NAIVE_OFFSET = -32768
+NONE_OFFSET = -32767
+
+EPOCH: datetime = datetime(1970, 1, 1)
+
+TAG: Struct = Struct("<B")
+INT: Struct = Struct("<q")
+FLOAT: Struct = Struct("<d")
+SIZE: Struct = Struct("<I")
+ENUM: Struct = Struct("<BB")
+OBJECT: Struct = Struct("<BH")
+EVENT: Struct = Struct("<BII")
+DATETIME: Struct = Struct("<qh")
+
+# Fields kind of dataclass schema
+NUMBER_FORMATS: Dict[type, str] = {
+    float: "d",
+    int: "q",
+    bool: "?",
+}
+
+
+class ObjectSchema:
+    """
+    Binary layout of a dataclass type.
+
+    Number fields, enum indexes, datetimes and string lengths are packed
+    by one struct, followed by string contents and then other fields in
+    generic format.
+    """
+
+    def __init__(
+        self,
+        cls: type,
+        class_id: int,
+        enum_indexes: Dict[type, Dict[Any, int]],
+        extra_fields: List[str] = None
+    ):
+        """"""
+        self.cls: type = cls
+        self.class_id: int = class_id
+
+        number_names: List[str] = []
+        number_format: str = ""
+        self.enum_names: List[str] = []
+        self.enum_indexes: List[Dict[Any, int]] = []
+        self.datetime_names: List[str] = []
+        self.str_names: List[str] = []
+        self.other_names: List[str] = []
+
+        for field in fields(cls):
+            if not field.init:
+                self.other_names.append(field.name)
+            elif field.type in NUMBER_FORMATS:
+                number_names.append(field.name)
+                number_format += NUMBER_FORMATS[field.type]
+            elif field.type in enum_indexes:
+                self.enum_names.append(field.name)
+                self.enum_indexes.append(enum_indexes[field.type])
+            elif field.type is datetime:
+                self.datetime_names.append(field.name)
+            elif field.type is str:
+                self.str_names.append(field.name)
+            else:
+                self.other_names.append(field.name)
+
+        if extra_fields:
+            self.other_names.extend(extra_fields)
+
+        self.number_names: List[str] = number_names
+        self.fixed_struct: Struct = Struct(
+            "<" + number_format
+            + "B" * len(self.enum_names)
+            + "qh" * len(self.datetime_names)
+            + "I" * len(self.str_names)
+        )
+        self.header: bytes = OBJECT.pack(TAG_OBJECT, class_id)
+
+        self.number_getter: Callable = make_getter(self.number_names)
+        self.enum_getter: Callable = make_getter(self.enum_names)
+        self.datetime_getter: Callable = make_getter(self.datetime_names)
+        self.str_getter: Callable = make_getter(self.str_names)
+        self.other_getter: Callable = make_getter(self.other_names)
+
+        self.enum_members: List[List[Any]] = []
+        for index_map in self.enum_indexes:
+            members = [None] * 256
+            for member, ix in index_map.items():
+                members[ix] = member
+            members[ENUM_EMPTY] = ""
+            self.enum_members.append(members)
+
+        self.post_init: Callable = getattr(cls, "__post_init__", None)
+
+
+def make_getter(names: List[str]) -> Callable:
+    """
+    Create a function returning tuple of attributes.
+    """
+    if not names:
+        return lambda obj: ()
+    elif len(names) == 1:
+        getter = attrgetter(names[0])
+        return lambda obj: (getter(obj),)
+    else:
+        return attrgetter(*names)
+
+
+def encode_datetime(dt: datetime) -> Tuple[int, int]:
+    """
+    Convert datetime to wall clock nanoseconds since epoch and
+    UTC offset in minutes.
+    """
+    if dt is None:
+        return 0, NONE_OFFSET
+
+    offset = dt.utcoffset()
+    if offset is None:
+        minutes = NAIVE_OFFSET
+    else:
+        minutes = offset.days * 1440 + offset.seconds // 60
+        dt = dt.replace(tzinfo=None)
+
+    delta = dt - EPOCH
+    ns = (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+    return ns, minutes
+
+
+class BinarySerializer(BaseSerializer):
+    """
+    Schema based binary serializer.
+
+    Dataclasses in vnpy.trader.object are converted by pre-built schema,
+    with enum as small int index and datetime as epoch nanoseconds.
+    Objects of types not supported are converted by pickle.
+
+    Both sides of connection must register the same types in the same
+    order.
+    """
+
+    def __init__(self):
+        """"""
+        self.enum_types: List[Type[Enum]] = []
+        self.enum_ids: Dict[type, int] = {}
+        self.enum_members: List[List[Enum]] = []
+        self.enum_indexes: Dict[type, Dict[Any, int]] = {}
+        self.schemas: List[ObjectSchema] = []
+        self.class_schemas: Dict[type, ObjectSchema] = {}
+        self.timezones: Dict[int, timezone] = {}
+
+        self.encoders: Dict[type, Callable] = {
+            type(None): self._encode_none,
+            bool: self._encode_bool,
+            int: self._encode_int,
+            float: self._encode_float,
+            str: self._encode_str,
+            bytes: self._encode_bytes,
+            list: self._encode_list,
+            tuple: self._encode_tuple,
+            dict: self._encode_dict,
+            datetime: self._encode_datetime,
+            Event: self._encode_event,
+        }
+
+        self.decoders: Dict[int, Callable] = {
+            TAG_NONE: lambda data, offset: (None, offset),
+            TAG_TRUE: lambda data, offset: (True, offset),
+            TAG_FALSE: lambda data, offset: (False, offset),
+            TAG_INT: self._decode_int,
+            TAG_FLOAT: self._decode_float,
+            TAG_STR: self._decode_str,
+            TAG_BYTES: self._decode_bytes,
+            TAG_LIST: self._decode_list,
+            TAG_TUPLE: self._decode_tuple,
+            TAG_DICT: self._decode_dict,
+            TAG_DATETIME: self._decode_datetime,
+            TAG_ENUM: self._decode_enum,
+            TAG_OBJECT: self._decode_object,
+            TAG_EVENT: self._decode_event,
+            TAG_PICKLE: self._decode_pickle,
+        }
+
+        self.register_trader_types()
+
+    def register_enum(self, enum_type: Type[Enum]) -> None:
+        """
+        Register enum type to be converted as small int index.
+        """
+        if enum_type in self.enum_indexes:
+            return
+
+        members = list(enum_type)
+        if len(members) >= ENUM_EMPTY:
+            raise ValueError(f"Too many members in enum {enum_type}")
+
+        index_map: Dict[Any, int] = {member: ix for ix, member in enumerate(members)}
+        index_map[None] = ENUM_NONE
+        index_map[""] = ENUM_EMPTY
+
+        self.enum_ids[enum_type] = len(self.enum_types)
+        self.enum_types.append(enum_type)
+        self.enum_members.append(members)
+        self.enum_indexes[enum_type] = index_map
+        self.encoders[enum_type] = self._encode_enum
+
+    def register_dataclass(self, cls: type, extra_fields: List[str] = None) -> None:
+        """
+        Register dataclass type to be converted by schema. Enum types
+        used by the dataclass should be registered first.
+
+        Attributes set in __post_init__ are recalculated after unpacked,
+        unless they are listed in extra_fields. Attributes which may be
+        modified after the object is created should be listed there.
+        """
+        if cls in self.class_schemas:
+            return
+
+        if not is_dataclass(cls):
+            raise TypeError(f"{cls} is not a dataclass")
+
+        schema = ObjectSchema(cls, len(self.schemas), self.enum_indexes, extra_fields)
+        self.schemas.append(schema)
+        self.class_schemas[cls] = schema
+        self.encoders[cls] = self._encode_object
+
+    def register_trader_types(self) -> None:
+        """
+        Register enums and data objects of VN Trader.
+        """
+        from vnpy.trader import constant
+        from vnpy.trader.object import (
+            TickData,
+            BarData,
+            OrderData,
+            TradeData,
+            PositionData,
+            AccountData,
+            LogData,
+            ContractData,
+            SubscribeRequest,
+            OrderRequest,
+            CancelRequest,
+            HistoryRequest
+        )
+
+        for name in sorted(dir(constant)):
+            value = getattr(constant, name)
+            if isinstance(value, type) and issubclass(value, Enum) and value is not Enum:
+                self.register_enum(value)
+
+        self.register_dataclass(TickData)
+        self.register_dataclass(BarData)
+        self.register_dataclass(OrderData)
+        self.register_dataclass(TradeData)
+        self.register_dataclass(PositionData)
+        # Available is set directly from exchange by most gateways
+        self.register_dataclass(AccountData, ["available"])
+        self.register_dataclass(LogData, ["time"])
+        self.register_dataclass(ContractData)
+        self.register_dataclass(SubscribeRequest)
+        self.register_dataclass(OrderRequest)
+        self.register_dataclass(CancelRequest)
+        self.register_dataclass(HistoryRequest)
+
+    def pack(self, obj: Any) -> bytes:
+        """"""
+        buf: List[bytes] = []
+        self._encode(obj, buf)
+        return b"".join(buf)
+
+    def unpack(self, data: bytes) -> Any:
+        """"""
+        obj, _ = self._decode(data, 0)
+        return obj
+
+    def _encode(self, obj: Any, buf: List[bytes]) -> None:
+        """"""
+        encoder = self.encoders.get(type(obj), self._encode_pickle)
+        encoder(obj, buf)
+
+    def _decode(self, data: bytes, offset: int) -> Tuple[Any, int]:
+        """"""
+        tag = data[offset]
+        return self.decoders[tag](data, offset + 1)
+
+    def _encode_none(self, obj: None, buf: List[bytes]) -> None:
+        """"""
+        buf.append(b"\x00")
+
+    def _encode_bool(self, obj: bool, buf: List[bytes]) -> None:
+        """"""
+        buf.append(b"\x01" if obj else b"\x02")
+
+    def _encode_int(self, obj: int, buf: List[bytes]) -> None:
+        """"""
+        try:
+            buf.append(TAG.pack(TAG_INT) + INT.pack(obj))
+        except StructError:
+            self._encode_pickle(obj, buf)
+
+    def _encode_float(self, obj: float, buf: List[bytes]) -> None:
+        """"""
+        buf.append(TAG.pack(TAG_FLOAT) + FLOAT.pack(obj))
+
+    def _encode_str(self, obj: str, buf: List[bytes]) -> None:
+        """"""
+        data = obj.encode("utf-8", "surrogatepass")
+        buf.append(TAG.pack(TAG_STR) + SIZE.pack(len(data)))
+        buf.append(data)
+
+    def _encode_bytes(self, obj: bytes, buf: List[bytes]) -> None:
+        """"""
+        buf.append(TAG.pack(TAG_BYTES) + SIZE.pack(len(obj)))
+        buf.append(obj)
+
+    def _encode_list(self, obj: list, buf: List[bytes]) -> None:
+        """"""
+        buf.append(TAG.pack(TAG_LIST) + SIZE.pack(len(obj)))
+        for item in obj:
+            self._encode(item, buf)
+
+    def _encode_tuple(self, obj: tuple, buf: List[bytes]) -> None:
+        """"""
+        buf.append(TAG.pack(TAG_TUPLE) + SIZE.pack(len(obj)))
+        for item in obj:
+            self._encode(item, buf)
+
+    def _encode_dict(self, obj: dict, buf: List[bytes]) -> None:
+        """"""
+        buf.append(TAG.pack(TAG_DICT) + SIZE.pack(len(obj)))
+        for key, value in obj.items():
+            self._encode(key, buf)
+            self._encode(value, buf)
+
+    def _encode_datetime(self, obj: datetime, buf: List[bytes]) -> None:
+        """"""
+        buf.append(TAG.pack(TAG_DATETIME) + DATETIME.pack(*encode_datetime(obj)))
+
+    def _encode_enum(self, obj: Enum, buf: List[bytes]) -> None:
+        """"""
+        enum_type = type(obj)
+        type_id = self.enum_ids[enum_type]
+        buf.append(TAG.pack(TAG_ENUM) + ENUM.pack(type_id, self.enum_indexes[enum_type][obj]))
+
+    def _encode_event(self, obj: Event, buf: List[bytes]) -> None:
+        """"""
+        type_data = obj.type.encode("utf-8")
+        key_data = getattr(obj, "key", "").encode("utf-8")
+
+        buf.append(EVENT.pack(TAG_EVENT, len(type_data), len(key_data)))
+        buf.append(type_data)
+        buf.append(key_data)
+        self._encode(obj.data, buf)
+
+    def _encode_object(self, obj: Any, buf: List[bytes]) -> None:
+        """
+        Convert dataclass object by schema, use pickle if any field
+        value does not match type of the schema.
+        """
+        schema = self.class_schemas[type(obj)]
+
+        try:
+            values = list(schema.number_getter(obj))
+
+            values.extend([
+                index_map[value] for index_map, value
+                in zip(schema.enum_indexes, schema.enum_getter(obj))
+            ])
+
+            for value in schema.datetime_getter(obj):
+                values.extend(encode_datetime(value))
+
+            strs = [value.encode("utf-8") for value in schema.str_getter(obj)]
+            values.extend([len(s) for s in strs])
+
+            fixed = schema.fixed_struct.pack(*values)
+
+            others: List[bytes] = []
+            for value in schema.other_getter(obj):
+                self._encode(value, others)
+        except (StructError, KeyError, AttributeError, TypeError):
+            self._encode_pickle(obj, buf)
+            return
+
+        buf.append(schema.header + fixed)
+        buf.extend(strs)
+        buf.extend(others)
+
+    def _encode_pickle(self, obj: Any, buf: List[bytes]) -> None:
+        """"""
+        data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        buf.append(TAG.pack(TAG_PICKLE) + SIZE.pack(len(data)))
+        buf.append(data)
+
+    def _decode_int(self, data: bytes, offset: int) -> Tuple[int, int]:
+        """"""
+        return INT.unpack_from(data, offset)[0], offset + INT.size
+
+    def _decode_float(self, data: bytes, offset: int) -> Tuple[float, int]:
+        """"""
+        return FLOAT.unpack_from(data, offset)[0], offset + FLOAT.size
+
+    def _decode_str(self, data: bytes, offset: int) -> Tuple[str, int]:
+        """"""
+        size = SIZE.unpack_from(data, offset)[0]
+        offset += SIZE.size
+        end = offset + size
+        return data[offset:end].decode("utf-8", "surrogatepass"), end
+
+    def _decode_bytes(self, data: bytes, offset: int) -> Tuple[bytes, int]:
+        """"""
+        size = SIZE.unpack_from(data, offset)[0]
+        offset += SIZE.size
+        end = offset + size
+        return bytes(data[offset:end]), end
+
+    def _decode_list(self, data: bytes, offset: int) -> Tuple[list, int]:
+        """"""
+        count = SIZE.unpack_from(data, offset)[0]
+        offset += SIZE.size
+
+        result = []
+        for _ in range(count):
+            item, offset = self._decode(data, offset)
+            result.append(item)
+        return result, offset
+
+    def _decode_tuple(self, data: bytes, offset: int) -> Tuple[tuple, int]:
+        """"""
+        result, offset = self._decode_list(data, offset)
+        return tuple(result), offset
+
+    def _decode_dict(self, data: bytes, offset: int) -> Tuple[dict, int]:
+        """"""
+        count = SIZE.unpack_from(data, offset)[0]
+        offset += SIZE.size
+
+        result = {}
+        for _ in range(count):
+            key, offset = self._decode(data, offset)
+            value, offset = self._decode(data, offset)
+            result[key] = value
+        return result, offset
+
+    def _decode_datetime(self, data: bytes, offset: int) -> Tuple[datetime, int]:
+        """"""
+        ns, minutes = DATETIME.unpack_from(data, offset)
+        return self._to_datetime(ns, minutes), offset + DATETIME.size
+
+    def _decode_enum(self, data: bytes, offset: int) -> Tuple[Enum, int]:
+        """"""
+        type_id, ix = ENUM.unpack_from(data, offset)
+        return self.enum_members[type_id][ix], offset + ENUM.size
+
+    def _decode_event(self, data: bytes, offset: int) -> Tuple[Event, int]:
+        """"""
+        _, type_size, key_size = EVENT.unpack_from(data, offset - 1)
+        offset += EVENT.size - 1
+
+        end = offset + type_size
+        type = data[offset:end].decode("utf-8")
+        offset = end
+
+        end = offset + key_size
+        key = data[offset:end].decode("utf-8")
+
+        event_data, offset = self._decode(data, end)
+        return Event(type, event_data, key), offset
+
+    def _decode_object(self, data: bytes, offset: int) -> Tuple[Any, int]:
+        """"""
+        _, class_id = OBJECT.unpack_from(data, offset - 1)
+        offset += OBJECT.size - 1
+        schema = self.schemas[class_id]
+
+        values = schema.fixed_struct.unpack_from(data, offset)
+        offset += schema.fixed_struct.size
+
+        obj = schema.cls.__new__(schema.cls)
+        d = obj.__dict__
+        d.update(zip(schema.number_names, values))
+
+        n = len(schema.number_names)
+        for name, members in zip(schema.enum_names, schema.enum_members):
+            d[name] = members[values[n]]
+            n += 1
+
+        for name in schema.datetime_names:
+            d[name] = self._to_datetime(values[n], values[n + 1])
+            n += 2
+
+        for name, size in zip(schema.str_names, values[n:]):
+            end = offset + size
+            d[name] = data[offset:end].decode("utf-8")
+            offset = end
+
+        others = []
+        for _ in schema.other_names:
+            value, offset = self._decode(data, offset)
+            others.append(value)
+
+        if schema.post_init:
+            schema.post_init(obj)
+
+        d.update(zip(schema.other_names, others))
+        return obj, offset
+
+    def _decode_pickle(self, data: bytes, offset: int) -> Tuple[Any, int]:
+        """"""
+        size = SIZE.unpack_from(data, offset)[0]
+        offset += SIZE.size
+        end = offset + size
+        return pickle.loads(data[offset:end]), end
+
+    def _to_datetime(self, ns: int, minutes: int) -> datetime:
+        """
+        Convert epoch nanoseconds and UTC offset back to datetime.
+        """
+        if minutes == NONE_OFFSET:
+            return None
+
+        dt = EPOCH + timedelta(microseconds=ns // 1000)
+
+        if minutes != NAIVE_OFFSET:
+            tz = self.timezones.get(minutes, None)
+            if not tz:
+                tz = timezone(timedelta(minutes=minutes))
+                self.timezones[minutes] = tz
+            dt = dt.replace(tzinfo=tz)
+
+        return dt
@@ -3,6 +3,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, Sequence, List, Dict, TYPE_CHECKING
 
+import numpy as np
+
 if TYPE_CHECKING:
     from vnpy.trader.constant import Interval, Exchange  # noqa
     from vnpy.trader.object import BarData, TickData  # noqa
@@ -13,6 +15,50 @@ class Driver(Enum):
     MYSQL = "mysql"
     POSTGRESQL = "postgresql"
     MONGODB = "mongodb"
+    COLUMNAR = "columnar"
+
+
+BAR_ARRAY_FIELDS: List[str] = [
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "open_interest",
+]
+
+TICK_ARRAY_FIELDS: List[str] = [
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+    "bid_price_1",
+    "bid_price_2",
+    "bid_price_3",
+    "bid_price_4",
+    "bid_price_5",
+    "ask_price_1",
+    "ask_price_2",
+    "ask_price_3",
+    "ask_price_4",
+    "ask_price_5",
+    "bid_volume_1",
+    "bid_volume_2",
+    "bid_volume_3",
+    "bid_volume_4",
+    "bid_volume_5",
+    "ask_volume_1",
+    "ask_volume_2",
+    "ask_volume_3",
+    "ask_volume_4",
+    "ask_volume_5",
+]
 
 
 class BaseDatabaseManager(ABC):
@@ -38,6 +84,46 @@ class BaseDatabaseManager(ABC):
     ) -> Sequence["TickData"]:
         pass
 
+    def load_bar_arrays(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval",
+        start: datetime,
+        end: datetime
+    ) -> Dict[str, np.ndarray]:
+        """
+        Load bar data as dict of numpy arrays sorted by datetime, with
+        "datetime" (datetime64[ns]) and fields in BAR_ARRAY_FIELDS (float64).
+
+        The default implementation converts from load_bar_data, drivers
+        should override it with queries not creating any object per row.
+        """
+        bars = self.load_bar_data(symbol, exchange, interval, start, end)
+        rows = [
+            (bar.datetime, *[getattr(bar, field) for field in BAR_ARRAY_FIELDS])
+            for bar in bars
+        ]
+        return rows_to_arrays(rows, BAR_ARRAY_FIELDS)
+
+    def load_tick_arrays(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        start: datetime,
+        end: datetime
+    ) -> Dict[str, np.ndarray]:
+        """
+        Load tick data as dict of numpy arrays sorted by datetime, with
+        "datetime" (datetime64[ns]) and fields in TICK_ARRAY_FIELDS (float64).
+        """
+        ticks = self.load_tick_data(symbol, exchange, start, end)
+        rows = [
+            (tick.datetime, *[getattr(tick, field) for field in TICK_ARRAY_FIELDS])
+            for tick in ticks
+        ]
+        return rows_to_arrays(rows, TICK_ARRAY_FIELDS)
+
     @abstractmethod
     def save_bar_data(
         self,
@@ -119,3 +205,40 @@ class BaseDatabaseManager(ABC):
         delete all records for a symbol
         """
         pass
+
+
+def rows_to_arrays(rows: Sequence[tuple], fields: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Convert rows of (datetime, *fields) into dict of numpy arrays.
+    """
+    if rows:
+        columns = list(zip(*rows))
+    else:
+        columns = [()] * (len(fields) + 1)
+
+    arrays = {"datetime": to_datetime64(columns[0])}
+    for field, column in zip(fields, columns[1:]):
+        array = np.array(column, dtype=np.float64)
+        array[np.isnan(array)] = 0      # NULL in database
+        arrays[field] = array
+
+    return arrays
+
+
+def to_datetime64(values: Sequence[datetime]) -> np.ndarray:
+    """
+    Convert datetime list into datetime64[ns] array of wall clock time.
+    ISO format strings returned by raw database cursor are also accepted,
+    with UTC offset (e.g. "+08:00") removed instead of converted to UTC.
+    """
+    if not values:
+        pass
+    elif isinstance(values[0], datetime):
+        if values[0].tzinfo:
+            values = [dt.replace(tzinfo=None) for dt in values]
+    elif isinstance(values[0], str):
+        values = [
+            s[:-6] if len(s) > 19 and s[-6] in "+-" else s
+            for s in values
+        ]
+    return np.array(values, dtype="datetime64[ns]")
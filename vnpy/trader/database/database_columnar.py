@@ -0,0 +1,613 @@
+"""
+Columnar local storage of bar and tick data.
+
+Data of each (symbol, exchange, interval) is stored in one folder and
+partitioned by month (bar) or by day (tick). Every field of a partition
+is saved in a raw binary file, which is memory-mapped when loading and
+copied out, so that no file is kept open after loading.
+
+    bar/<exchange>/<symbol>/<interval>/<YYYY-MM>/<field>.bin
+    tick/<exchange>/<symbol>/<YYYY-MM-DD>/<field>.bin
+
+Datetime is saved as int64 nanoseconds of wall clock time (timezone
+info is dropped), other fields are saved as float64.
+
+New rows are appended to the end of partition files. If rows older than
+existing ones are saved, the merged partition is written into a temp
+folder and swapped in by renaming, so that columns are never left
+misaligned by interrupted writing.
+
+Only one process should write to the same folder at the same time.
+"""
+
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+from vnpy.trader.utility import get_file_path
+from .database import (
+    BAR_ARRAY_FIELDS,
+    TICK_ARRAY_FIELDS,
+    BaseDatabaseManager,
+    Driver,
+    to_datetime64
+)
+
+
+BAR_FIELDS: List[str] = BAR_ARRAY_FIELDS
+TICK_FIELDS: List[str] = TICK_ARRAY_FIELDS
+
+DATETIME_FIELD = "datetime"
+FILE_SUFFIX = ".bin"
+META_FILENAME = "meta.json"
+TEMP_SUFFIX = ".tmp"        # merged partition being written
+OLD_SUFFIX = ".old"         # partition being replaced
+
+BAR_PARTITION = "M"         # partitioned by month
+TICK_PARTITION = "D"        # partitioned by day
+
+
+def init(_: Driver, settings: dict):
+    database = settings["database"]
+    path = get_file_path(database)
+    return ColumnarManager(path)
+
+
+def to_timestamp(dt: datetime) -> int:
+    """
+    Convert datetime to int64 nanoseconds of wall clock time.
+    """
+    return int(np.datetime64(dt.replace(tzinfo=None), "ns").astype(np.int64))
+
+
+def to_timestamps(dts: Sequence[datetime]) -> np.ndarray:
+    """
+    Convert datetime list to int64 nanoseconds array.
+    """
+    return to_datetime64(dts).view(np.int64)
+
+
+def to_datetimes(timestamps: np.ndarray) -> List[datetime]:
+    """
+    Convert int64 nanoseconds array back to datetime list.
+    """
+    return timestamps.view("datetime64[ns]").astype("datetime64[us]").tolist()
+
+
+def get_partition(timestamp: int, unit: str) -> str:
+    """
+    Get partition folder name of timestamp.
+    """
+    return str(np.datetime64(timestamp, "ns").astype(f"datetime64[{unit}]"))
+
+
+class ColumnarManager(BaseDatabaseManager):
+    """
+    Database manager of columnar local storage.
+    """
+
+    def __init__(self, path: Path):
+        """"""
+        self.path: Path = Path(path)
+        self.bar_path: Path = self.path.joinpath("bar")
+        self.tick_path: Path = self.path.joinpath("tick")
+
+        self.bar_path.mkdir(parents=True, exist_ok=True)
+        self.tick_path.mkdir(parents=True, exist_ok=True)
+
+        self.lock: Lock = Lock()
+
+    def get_bar_folder(self, symbol: str, exchange: Exchange, interval: Interval) -> Path:
+        """"""
+        return self.bar_path.joinpath(exchange.value, symbol, interval.value)
+
+    def get_tick_folder(self, symbol: str, exchange: Exchange) -> Path:
+        """"""
+        return self.tick_path.joinpath(exchange.value, symbol)
+
+    def load_bar_arrays(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> Dict[str, np.ndarray]:
+        """"""
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        return read_columns(folder, BAR_FIELDS, BAR_PARTITION, start, end)
+
+    def load_tick_arrays(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> Dict[str, np.ndarray]:
+        """"""
+        folder = self.get_tick_folder(symbol, exchange)
+        return read_columns(folder, TICK_FIELDS, TICK_PARTITION, start, end)
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> Sequence[BarData]:
+        arrays = self.load_bar_arrays(symbol, exchange, interval, start, end)
+        return to_bars(symbol, exchange, interval, arrays)
+
+    def load_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> Sequence[TickData]:
+        folder = self.get_tick_folder(symbol, exchange)
+        arrays = read_columns(folder, TICK_FIELDS, TICK_PARTITION, start, end)
+        name = read_meta(folder).get("name", "")
+        return to_ticks(symbol, exchange, name, arrays)
+
+    def save_bar_data(self, datas: Sequence[BarData]):
+        groups: Dict[tuple, List[BarData]] = {}
+        for bar in datas:
+            key = (bar.symbol, bar.exchange, bar.interval)
+            groups.setdefault(key, []).append(bar)
+
+        with self.lock:
+            for (symbol, exchange, interval), bars in groups.items():
+                arrays = {
+                    DATETIME_FIELD: to_timestamps([bar.datetime for bar in bars])
+                }
+                for field in BAR_FIELDS:
+                    arrays[field] = np.array(
+                        [getattr(bar, field) for bar in bars], dtype=np.float64
+                    )
+
+                folder = self.get_bar_folder(symbol, exchange, interval)
+                write_columns(folder, BAR_FIELDS, BAR_PARTITION, arrays)
+
+    def save_tick_data(self, datas: Sequence[TickData]):
+        groups: Dict[tuple, List[TickData]] = {}
+        for tick in datas:
+            key = (tick.symbol, tick.exchange)
+            groups.setdefault(key, []).append(tick)
+
+        with self.lock:
+            for (symbol, exchange), ticks in groups.items():
+                arrays = {
+                    DATETIME_FIELD: to_timestamps([tick.datetime for tick in ticks])
+                }
+                for field in TICK_FIELDS:
+                    arrays[field] = np.array(
+                        [getattr(tick, field) or 0 for tick in ticks], dtype=np.float64
+                    )
+
+                folder = self.get_tick_folder(symbol, exchange)
+                write_columns(folder, TICK_FIELDS, TICK_PARTITION, arrays)
+
+                name = ticks[-1].name
+                if name and read_meta(folder).get("name", "") != name:
+                    write_meta(folder, {"name": name})
+
+    def get_newest_bar_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval"
+    ) -> Optional["BarData"]:
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        arrays = read_edge(folder, BAR_FIELDS, newest=True)
+        if not arrays:
+            return None
+        return to_bars(symbol, exchange, interval, arrays)[0]
+
+    def get_oldest_bar_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval"
+    ) -> Optional["BarData"]:
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        arrays = read_edge(folder, BAR_FIELDS, newest=False)
+        if not arrays:
+            return None
+        return to_bars(symbol, exchange, interval, arrays)[0]
+
+    def get_newest_tick_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+    ) -> Optional["TickData"]:
+        folder = self.get_tick_folder(symbol, exchange)
+        arrays = read_edge(folder, TICK_FIELDS, newest=True)
+        if not arrays:
+            return None
+        name = read_meta(folder).get("name", "")
+        return to_ticks(symbol, exchange, name, arrays)[0]
+
+    def get_bar_data_statistics(self) -> List[Dict]:
+        """"""
+        result = []
+
+        for exchange_folder in sorted_folders(self.bar_path):
+            for symbol_folder in sorted_folders(exchange_folder):
+                for interval_folder in sorted_folders(symbol_folder):
+                    count = count_rows(interval_folder)
+                    if not count:
+                        continue
+
+                    result.append({
+                        "symbol": symbol_folder.name,
+                        "exchange": exchange_folder.name,
+                        "interval": interval_folder.name,
+                        "count": count
+                    })
+
+        return result
+
+    def delete_bar_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval"
+    ) -> int:
+        """
+        Delete all bar data with given symbol + exchange + interval.
+        """
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        if not folder.exists():
+            return 0
+
+        with self.lock:
+            count = count_rows(folder)
+            shutil.rmtree(folder)
+
+        return count
+
+    def clean(self, symbol: str):
+        with self.lock:
+            for root in [self.bar_path, self.tick_path]:
+                for exchange_folder in sorted_folders(root):
+                    folder = exchange_folder.joinpath(symbol)
+                    if folder.exists():
+                        shutil.rmtree(folder)
+
+
+def sorted_folders(path: Path) -> List[Path]:
+    """
+    Get sub folders sorted by name.
+    """
+    if not path.exists():
+        return []
+    return sorted([p for p in path.iterdir() if p.is_dir()])
+
+
+def sorted_partitions(folder: Path) -> List[Path]:
+    """
+    Get partition folders sorted by name. Old partition left by
+    interrupted rewriting is used if the new one was not swapped in.
+    """
+    partitions = []
+
+    for path in sorted_folders(folder):
+        if not path.suffix:
+            partitions.append(path)
+        elif path.suffix == OLD_SUFFIX and not path.with_suffix("").exists():
+            partitions.append(path)
+
+    return partitions
+
+
+def recover_partitions(folder: Path) -> None:
+    """
+    Clean up folders left by interrupted partition rewriting. Partition
+    is rolled back to the old one if the new one was not swapped in.
+    """
+    for path in sorted_folders(folder):
+        if path.suffix == OLD_SUFFIX:
+            partition = path.with_suffix("")
+            if partition.exists():
+                shutil.rmtree(path)
+            else:
+                path.rename(partition)
+
+    for path in sorted_folders(folder):
+        if path.suffix == TEMP_SUFFIX:
+            shutil.rmtree(path)
+
+
+def get_file(folder: Path, field: str) -> Path:
+    """"""
+    return folder.joinpath(field + FILE_SUFFIX)
+
+
+def get_length(folder: Path, fields: List[str]) -> int:
+    """
+    Get number of rows saved in partition. If columns are not of the same
+    length (writing interrupted), the shortest one is used.
+    """
+    sizes = []
+    for field in [DATETIME_FIELD] + fields:
+        path = get_file(folder, field)
+        if not path.exists():
+            return 0
+        sizes.append(path.stat().st_size // 8)
+    return min(sizes)
+
+
+def map_column(folder: Path, field: str, length: int) -> np.ndarray:
+    """
+    Memory-map column file of partition.
+    """
+    dtype = np.int64 if field == DATETIME_FIELD else np.float64
+    if not length:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(get_file(folder, field), dtype=dtype, mode="r", shape=(length,))
+
+
+def count_rows(folder: Path) -> int:
+    """
+    Count rows of all partitions in folder.
+    """
+    count = 0
+    for partition in sorted_partitions(folder):
+        path = get_file(partition, DATETIME_FIELD)
+        if path.exists():
+            count += path.stat().st_size // 8
+    return count
+
+
+def empty_columns(fields: List[str]) -> Dict[str, np.ndarray]:
+    """"""
+    arrays = {DATETIME_FIELD: np.empty(0, dtype="datetime64[ns]")}
+    for field in fields:
+        arrays[field] = np.empty(0, dtype=np.float64)
+    return arrays
+
+
+def read_columns(
+    folder: Path,
+    fields: List[str],
+    unit: str,
+    start: datetime,
+    end: datetime
+) -> Dict[str, np.ndarray]:
+    """
+    Read columns of rows with datetime within [start, end], datetime is
+    returned as datetime64[ns] array. Data is copied out of memory-mapped
+    files, so that they are closed after reading (file opened is not
+    allowed to be replaced on Windows).
+    """
+    start_ts = to_timestamp(start)
+    end_ts = to_timestamp(end)
+    start_partition = get_partition(start_ts, unit)
+    end_partition = get_partition(end_ts, unit)
+
+    chunks: List[Dict[str, np.ndarray]] = []
+
+    for partition in sorted_partitions(folder):
+        if partition.stem < start_partition or partition.stem > end_partition:
+            continue
+
+        length = get_length(partition, fields)
+        if not length:
+            continue
+
+        dt = map_column(partition, DATETIME_FIELD, length)
+        ix_start = np.searchsorted(dt, start_ts, side="left")
+        ix_end = np.searchsorted(dt, end_ts, side="right")
+        if ix_start >= ix_end:
+            continue
+
+        chunk = {DATETIME_FIELD: dt[ix_start:ix_end].view("datetime64[ns]")}
+        for field in fields:
+            chunk[field] = map_column(partition, field, length)[ix_start:ix_end]
+        chunks.append(chunk)
+
+    if not chunks:
+        return empty_columns(fields)
+    elif len(chunks) == 1:
+        return {field: np.array(array) for field, array in chunks[0].items()}
+
+    arrays = {}
+    for field in [DATETIME_FIELD] + fields:
+        arrays[field] = np.concatenate([chunk[field] for chunk in chunks])
+    return arrays
+
+
+def read_edge(folder: Path, fields: List[str], newest: bool) -> Dict[str, np.ndarray]:
+    """
+    Read the newest or oldest row.
+    """
+    partitions = sorted_partitions(folder)
+    if newest:
+        partitions.reverse()
+
+    for partition in partitions:
+        length = get_length(partition, fields)
+        if not length:
+            continue
+
+        ix = length - 1 if newest else 0
+        arrays = {}
+        for field in [DATETIME_FIELD] + fields:
+            arrays[field] = np.array(map_column(partition, field, length)[ix:ix + 1])
+        return arrays
+
+    return {}
+
+
+def write_columns(
+    folder: Path,
+    fields: List[str],
+    unit: str,
+    arrays: Dict[str, np.ndarray]
+) -> None:
+    """
+    Write columns into partitions, rows of the same datetime are replaced.
+    """
+    dt = arrays[DATETIME_FIELD]
+    if not len(dt):
+        return
+
+    recover_partitions(folder)
+
+    # Sort by datetime, keep the last one of duplicated datetime
+    order = np.argsort(dt, kind="stable")
+    dt = dt[order]
+    keep = np.append(dt[1:] != dt[:-1], True)
+    dt = dt[keep]
+
+    columns = {DATETIME_FIELD: dt}
+    for field in fields:
+        columns[field] = arrays[field][order][keep]
+
+    # Split into partitions
+    keys = dt.view("datetime64[ns]").astype(f"datetime64[{unit}]")
+    boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(dt)]])
+
+    for ix_start, ix_end in zip(starts, ends):
+        partition = folder.joinpath(str(keys[ix_start]))
+        chunk = {k: v[ix_start:ix_end] for k, v in columns.items()}
+        write_partition(partition, fields, chunk)
+
+
+def write_partition(folder: Path, fields: List[str], chunk: Dict[str, np.ndarray]) -> None:
+    """
+    Append rows to partition if all of them are newer than existing ones,
+    otherwise merge with existing rows and rewrite the partition.
+    """
+    all_fields = [DATETIME_FIELD] + fields
+    folder.mkdir(parents=True, exist_ok=True)
+
+    length = get_length(folder, fields)
+    if length:
+        existing = np.fromfile(get_file(folder, DATETIME_FIELD), dtype=np.int64, count=length)
+    else:
+        existing = np.empty(0, dtype=np.int64)
+
+    # Append only
+    if not length or chunk[DATETIME_FIELD][0] > existing[-1]:
+        for field in all_fields:
+            path = get_file(folder, field)
+
+            # Drop incomplete rows left by interrupted writing
+            if path.exists() and path.stat().st_size != length * 8:
+                with open(path, "r+b") as f:
+                    f.truncate(length * 8)
+
+            with open(path, "ab") as f:
+                f.write(chunk[field].tobytes())
+        return
+
+    # Merge and rewrite all columns into temp folder
+    dt = np.concatenate([existing, chunk[DATETIME_FIELD]])
+    order = np.argsort(dt, kind="stable")
+    dt = dt[order]
+    keep = np.append(dt[1:] != dt[:-1], True)
+
+    temp_folder = folder.with_suffix(TEMP_SUFFIX)
+    if temp_folder.exists():
+        shutil.rmtree(temp_folder)
+    temp_folder.mkdir()
+
+    for field in all_fields:
+        if field == DATETIME_FIELD:
+            old = existing
+        else:
+            old = np.fromfile(get_file(folder, field), dtype=np.float64, count=length)
+
+        data = np.concatenate([old, chunk[field]])[order][keep]
+        data.tofile(get_file(temp_folder, field))
+
+    # Swap in the merged partition, interrupted swapping is recovered
+    # by recover_partitions before next writing
+    old_folder = folder.with_suffix(OLD_SUFFIX)
+    folder.rename(old_folder)
+    temp_folder.rename(folder)
+    shutil.rmtree(old_folder)
+
+
+def read_meta(folder: Path) -> dict:
+    """"""
+    path = folder.joinpath(META_FILENAME)
+    if not path.exists():
+        return {}
+
+    with open(path, mode="r", encoding="UTF-8") as f:
+        return json.load(f)
+
+
+def write_meta(folder: Path, meta: dict) -> None:
+    """"""
+    folder.mkdir(parents=True, exist_ok=True)
+
+    with open(folder.joinpath(META_FILENAME), mode="w+", encoding="UTF-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def to_bars(
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval,
+    arrays: Dict[str, np.ndarray]
+) -> List[BarData]:
+    """
+    Convert column arrays to BarData list.
+    """
+    datetimes = to_datetimes(arrays[DATETIME_FIELD])
+    columns = [arrays[field].tolist() for field in BAR_FIELDS]
+
+    bars = []
+    for dt, values in zip(datetimes, zip(*columns)):
+        bar = BarData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=dt,
+            interval=interval,
+            gateway_name="DB"
+        )
+        bar.__dict__.update(zip(BAR_FIELDS, values))
+        bars.append(bar)
+
+    return bars
+
+
+def to_ticks(
+    symbol: str,
+    exchange: Exchange,
+    name: str,
+    arrays: Dict[str, np.ndarray]
+) -> List[TickData]:
+    """
+    Convert column arrays to TickData list.
+    """
+    datetimes = to_datetimes(arrays[DATETIME_FIELD])
+    columns = [arrays[field].tolist() for field in TICK_FIELDS]
+
+    ticks = []
+    for dt, values in zip(datetimes, zip(*columns)):
+        tick = TickData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=dt,
+            name=name,
+            gateway_name="DB"
+        )
+        tick.__dict__.update(zip(TICK_FIELDS, values))
+        ticks.append(tick)
+
+    return ticks
@@ -1,12 +1,19 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Sequence, List
+from typing import Dict, Optional, Sequence, List
 
+import numpy as np
 from mongoengine import DateTimeField, Document, FloatField, StringField, connect
 
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
-from .database import BaseDatabaseManager, Driver
+from .database import (
+    BAR_ARRAY_FIELDS,
+    TICK_ARRAY_FIELDS,
+    BaseDatabaseManager,
+    Driver,
+    rows_to_arrays
+)
 
 
 def init(_: Driver, settings: dict):
@@ -292,6 +299,50 @@ class MongoManager(BaseDatabaseManager):
         data = [db_tick.to_tick() for db_tick in s]
         return data
 
+    def load_bar_arrays(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Dict[str, np.ndarray]:
+        fields = ["datetime"] + BAR_ARRAY_FIELDS
+
+        s = (
+            DbBarData.objects(
+                symbol=symbol,
+                exchange=exchange.value,
+                interval=interval.value,
+                datetime__gte=start,
+                datetime__lte=end,
+            )
+            .order_by("+datetime")
+            .only(*fields)
+            .as_pymongo()
+        )
+        rows = [tuple(d.get(field, None) for field in fields) for d in s]
+        return rows_to_arrays(rows, BAR_ARRAY_FIELDS)
+
+    def load_tick_arrays(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> Dict[str, np.ndarray]:
+        fields = ["datetime"] + TICK_ARRAY_FIELDS
+
+        s = (
+            DbTickData.objects(
+                symbol=symbol,
+                exchange=exchange.value,
+                datetime__gte=start,
+                datetime__lte=end,
+            )
+            .order_by("+datetime")
+            .only(*fields)
+            .as_pymongo()
+        )
+        rows = [tuple(d.get(field, None) for field in fields) for d in s]
+        return rows_to_arrays(rows, TICK_ARRAY_FIELDS)
+
     @staticmethod
     def to_update_param(d):
         return {
@@ -1,14 +1,18 @@
 """"""
 from datetime import datetime
+from operator import attrgetter
 from typing import List, Dict, Optional, Sequence, Type
 
+import numpy as np
 from peewee import (
     AutoField,
     CharField,
     Database,
     DateTimeField,
+    Field,
     FloatField,
     Model,
+    ModelSelect,
     MySQLDatabase,
     PostgresqlDatabase,
     SqliteDatabase,
@@ -19,7 +23,40 @@ from peewee import (
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
 from vnpy.trader.utility import get_file_path
-from .database import BaseDatabaseManager, Driver
+from .database import (
+    BAR_ARRAY_FIELDS,
+    TICK_ARRAY_FIELDS,
+    BaseDatabaseManager,
+    Driver,
+    rows_to_arrays
+)
+
+
+BAR_COLUMNS: List[str] = ["symbol", "exchange", "datetime", "interval"] + BAR_ARRAY_FIELDS
+TICK_COLUMNS: List[str] = ["symbol", "exchange", "datetime", "name"] + TICK_ARRAY_FIELDS
+
+# Depth fields saved as NULL if there is only level 1 data
+TICK_DEPTH_COLUMNS: List[str] = [
+    f"{side}_{kind}_{level}"
+    for side in ["bid", "ask"]
+    for kind in ["price", "volume"]
+    for level in range(2, 6)
+]
+
+DEFAULT_BATCH_SIZE = 10000
+POSTGRESQL_MAX_PARAMS = 32767
+
+SQLITE_PRAGMAS = {
+    "cache_size": -64 * 1024,
+}
+
+# WAL mode allows reading while bulk writing, enabled by setting wal.
+# Journal mode is kept in database file, and last transactions may be
+# lost on power failure with synchronous normal.
+SQLITE_WAL_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+}
 
 
 def init(driver: Driver, settings: dict):
@@ -32,13 +69,19 @@ def init(driver: Driver, settings: dict):
 
     db = init_funcs[driver](settings)
     bar, tick = init_models(db, driver)
-    return SqlManager(bar, tick)
+    batch_size = settings.get("batch_size", None) or DEFAULT_BATCH_SIZE
+    return SqlManager(bar, tick, batch_size)
 
 
 def init_sqlite(settings: dict):
     database = settings["database"]
     path = str(get_file_path(database))
-    db = SqliteDatabase(path)
+
+    pragmas = dict(SQLITE_PRAGMAS)
+    if settings.get("wal", False):
+        pragmas.update(SQLITE_WAL_PRAGMAS)
+
+    db = SqliteDatabase(path, pragmas=pragmas)
     return db
 
 
@@ -132,22 +175,28 @@ def init_models(db: Database, driver: Driver):
             save a list of objects, update if exists.
             """
             dicts = [i.to_dict() for i in objs]
-            with db.atomic():
-                if driver is Driver.POSTGRESQL:
-                    for bar in dicts:
-                        DbBarData.insert(bar).on_conflict(
-                            update=bar,
-                            conflict_target=(
-                                DbBarData.symbol,
-                                DbBarData.exchange,
-                                DbBarData.interval,
-                                DbBarData.datetime,
-                            ),
-                        ).execute()
-                else:
-                    for c in chunked(dicts, 50):
-                        DbBarData.insert_many(
-                            c).on_conflict_replace().execute()
+            rows = [tuple(d.get(name, None) for name in BAR_COLUMNS) for d in dicts]
+            DbBarData.save_rows(rows, DEFAULT_BATCH_SIZE)
+
+        @staticmethod
+        def save_rows(rows: List[tuple], batch_size: int):
+            """
+            save rows of values ordered by BAR_COLUMNS, update if exists.
+            """
+            bulk_save(
+                db,
+                driver,
+                DbBarData,
+                [getattr(DbBarData, name) for name in BAR_COLUMNS],
+                (
+                    DbBarData.symbol,
+                    DbBarData.exchange,
+                    DbBarData.interval,
+                    DbBarData.datetime,
+                ),
+                rows,
+                batch_size
+            )
 
     class DbTickData(ModelBase):
         """
@@ -305,31 +354,99 @@ def init_models(db: Database, driver: Driver):
         @staticmethod
         def save_all(objs: List["DbTickData"]):
             dicts = [i.to_dict() for i in objs]
-            with db.atomic():
-                if driver is Driver.POSTGRESQL:
-                    for tick in dicts:
-                        DbTickData.insert(tick).on_conflict(
-                            update=tick,
-                            conflict_target=(
-                                DbTickData.symbol,
-                                DbTickData.exchange,
-                                DbTickData.datetime,
-                            ),
-                        ).execute()
-                else:
-                    for c in chunked(dicts, 50):
-                        DbTickData.insert_many(c).on_conflict_replace().execute()
+            rows = [tuple(d.get(name, None) for name in TICK_COLUMNS) for d in dicts]
+            DbTickData.save_rows(rows, DEFAULT_BATCH_SIZE)
+
+        @staticmethod
+        def save_rows(rows: List[tuple], batch_size: int):
+            """
+            save rows of values ordered by TICK_COLUMNS, update if exists.
+            """
+            bulk_save(
+                db,
+                driver,
+                DbTickData,
+                [getattr(DbTickData, name) for name in TICK_COLUMNS],
+                (
+                    DbTickData.symbol,
+                    DbTickData.exchange,
+                    DbTickData.datetime,
+                ),
+                rows,
+                batch_size
+            )
 
     db.connect()
     db.create_tables([DbBarData, DbTickData])
     return DbBarData, DbTickData
 
 
+def bulk_save(
+    db: Database,
+    driver: Driver,
+    model: Type[Model],
+    fields: List[Field],
+    conflict_target: tuple,
+    rows: List[tuple],
+    batch_size: int
+):
+    """
+    Insert rows in batches, update if exists.
+
+    PostgreSQL uses multi-row INSERT ... ON CONFLICT DO UPDATE, batch size
+    is limited by max number of parameters of one statement, and rows with
+    duplicate conflict key are removed except the last one. SQLite and
+    MySQL use executemany of one row statement, which is rewritten into
+    multi-row INSERT by MySQL client.
+    """
+    if not rows:
+        return
+
+    preserve = [field for field in fields if field not in conflict_target]
+
+    if driver is Driver.POSTGRESQL:
+        batch_size = min(batch_size, POSTGRESQL_MAX_PARAMS // len(fields))
+
+        # One statement cannot update the same row twice, so keep only the
+        # last row of each conflict key
+        names = [field.name for field in fields]
+        key_index = [names.index(field.name) for field in conflict_target]
+        unique_rows = {}
+        for row in rows:
+            key = tuple(row[i] for i in key_index)
+            unique_rows[key] = row
+        rows = list(unique_rows.values())
+
+        with db.atomic():
+            for c in chunked(rows, batch_size):
+                model.insert_many(c, fields=fields).on_conflict(
+                    conflict_target=conflict_target,
+                    preserve=preserve
+                ).execute()
+    else:
+        query = model.insert_many(rows[:1], fields=fields)
+        if driver is Driver.MYSQL:
+            query = query.on_conflict(preserve=preserve)
+        else:
+            query = query.on_conflict_replace()
+        sql, _ = query.sql()
+
+        with db.atomic():
+            for c in chunked(rows, batch_size):
+                db.cursor().executemany(sql, c)
+
+
 class SqlManager(BaseDatabaseManager):
 
-    def __init__(self, class_bar: Type[Model], class_tick: Type[Model]):
+    def __init__(
+        self,
+        class_bar: Type[Model],
+        class_tick: Type[Model],
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
         self.class_bar = class_bar
         self.class_tick = class_tick
+        self.batch_size = batch_size
 
     def load_bar_data(
         self,
@@ -370,13 +487,83 @@ class SqlManager(BaseDatabaseManager):
         data = [db_tick.to_tick() for db_tick in s]
         return data
 
+    def load_bar_arrays(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Dict[str, np.ndarray]:
+        fields = [self.class_bar.datetime]
+        fields.extend([getattr(self.class_bar, name) for name in BAR_ARRAY_FIELDS])
+
+        s = (
+            self.class_bar.select(*fields)
+                .where(
+                (self.class_bar.symbol == symbol)
+                & (self.class_bar.exchange == exchange.value)
+                & (self.class_bar.interval == interval.value)
+                & (self.class_bar.datetime >= start)
+                & (self.class_bar.datetime <= end)
+            )
+            .order_by(self.class_bar.datetime)
+        )
+        return self.query_arrays(s, BAR_ARRAY_FIELDS)
+
+    def load_tick_arrays(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> Dict[str, np.ndarray]:
+        fields = [self.class_tick.datetime]
+        fields.extend([getattr(self.class_tick, name) for name in TICK_ARRAY_FIELDS])
+
+        s = (
+            self.class_tick.select(*fields)
+                .where(
+                (self.class_tick.symbol == symbol)
+                & (self.class_tick.exchange == exchange.value)
+                & (self.class_tick.datetime >= start)
+                & (self.class_tick.datetime <= end)
+            )
+            .order_by(self.class_tick.datetime)
+        )
+        return self.query_arrays(s, TICK_ARRAY_FIELDS)
+
+    @staticmethod
+    def query_arrays(query: ModelSelect, fields: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Execute query with raw cursor, so that no conversion is done by peewee
+        for each row (datetime of SQLite is returned as string).
+        """
+        cursor = query.model._meta.database.execute(query)
+        rows = cursor.fetchall()
+        return rows_to_arrays(rows, fields)
+
     def save_bar_data(self, datas: Sequence[BarData]):
-        ds = [self.class_bar.from_bar(i) for i in datas]
-        self.class_bar.save_all(ds)
+        get_values = attrgetter(*BAR_ARRAY_FIELDS)
+
+        rows = [
+            (bar.symbol, bar.exchange.value, bar.datetime, bar.interval.value, *get_values(bar))
+            for bar in datas
+        ]
+        self.class_bar.save_rows(rows, self.batch_size)
 
     def save_tick_data(self, datas: Sequence[TickData]):
-        ds = [self.class_tick.from_tick(i) for i in datas]
-        self.class_tick.save_all(ds)
+        get_values = attrgetter(*TICK_ARRAY_FIELDS)
+        depth_ix = [TICK_COLUMNS.index(name) for name in TICK_DEPTH_COLUMNS]
+
+        rows = []
+        for tick in datas:
+            row = (tick.symbol, tick.exchange.value, tick.datetime, tick.name, *get_values(tick))
+
+            if not tick.bid_price_2:
+                row = list(row)
+                for ix in depth_ix:
+                    row[ix] = None
+
+            rows.append(row)
+
+        self.class_tick.save_rows(rows, self.batch_size)
 
     def get_newest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
@@ -6,13 +6,15 @@ def init(settings: dict) -> BaseDatabaseManager:
     driver = Driver(settings["driver"])
     if driver is Driver.MONGODB:
         return init_nosql(driver=driver, settings=settings)
+    elif driver is Driver.COLUMNAR:
+        return init_columnar(driver=driver, settings=settings)
     else:
         return init_sql(driver=driver, settings=settings)
 
 
 def init_sql(driver: Driver, settings: dict):
     from .database_sql import init
-    keys = {'database', "host", "port", "user", "password"}
+    keys = {'database', "host", "port", "user", "password", "batch_size", "wal"}
     settings = {k: v for k, v in settings.items() if k in keys}
     _database_manager = init(driver, settings)
     return _database_manager
@@ -22,3 +24,9 @@ def init_nosql(driver: Driver, settings: dict):
     from .database_mongo import init
     _database_manager = init(driver, settings=settings)
     return _database_manager
+
+
+def init_columnar(driver: Driver, settings: dict):
+    from .database_columnar import init
+    _database_manager = init(driver, settings=settings)
+    return _database_manager
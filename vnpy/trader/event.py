@@ -2,7 +2,13 @@
 Event type string used in VN Trader.
 """
 
-from vnpy.event import EVENT_TIMER  # noqa
+from vnpy.event import (  # noqa
+    EVENT_TIMER,
+    EVENT_METRICS,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW
+)
 
 EVENT_TICK = "eTick."
 EVENT_TRADE = "eTrade."
@@ -11,3 +17,16 @@ EVENT_POSITION = "ePosition."
 EVENT_ACCOUNT = "eAccount."
 EVENT_CONTRACT = "eContract."
 EVENT_LOG = "eLog"
+
+# Event priorities used by PriorityEventEngine
+EVENT_PRIORITIES = {
+    EVENT_TIMER: PRIORITY_HIGH,
+    EVENT_TRADE: PRIORITY_HIGH,
+    EVENT_ORDER: PRIORITY_HIGH,
+    EVENT_POSITION: PRIORITY_HIGH,
+    EVENT_ACCOUNT: PRIORITY_HIGH,
+    EVENT_TICK: PRIORITY_NORMAL,
+    EVENT_CONTRACT: PRIORITY_NORMAL,
+    EVENT_LOG: PRIORITY_LOW,
+    EVENT_METRICS: PRIORITY_LOW,
+}
@@ -83,52 +83,52 @@ class BaseGateway(ABC):
         self.event_engine: EventEngine = event_engine
         self.gateway_name: str = gateway_name
 
-    def on_event(self, type: str, data: Any = None) -> None:
+    def on_event(self, type: str, data: Any = None, key: str = "") -> None:
         """
         General event push.
         """
-        event = Event(type, data)
+        event = Event(type, data, key)
         self.event_engine.put(event)
 
     def on_tick(self, tick: TickData) -> None:
         """
         Tick event push.
-        Tick event of a specific vt_symbol is also pushed.
+        Tick event is keyed by vt_symbol, so that it is also distributed
+        to handlers of a specific vt_symbol.
         """
-        self.on_event(EVENT_TICK, tick)
-        self.on_event(EVENT_TICK + tick.vt_symbol, tick)
+        self.on_event(EVENT_TICK, tick, tick.vt_symbol)
 
     def on_trade(self, trade: TradeData) -> None:
         """
         Trade event push.
-        Trade event of a specific vt_symbol is also pushed.
+        Trade event is keyed by vt_symbol, so that it is also distributed
+        to handlers of a specific vt_symbol.
         """
-        self.on_event(EVENT_TRADE, trade)
-        self.on_event(EVENT_TRADE + trade.vt_symbol, trade)
+        self.on_event(EVENT_TRADE, trade, trade.vt_symbol)
 
     def on_order(self, order: OrderData) -> None:
         """
         Order event push.
-        Order event of a specific vt_orderid is also pushed.
+        Order event is keyed by vt_orderid, so that it is also distributed
+        to handlers of a specific vt_orderid.
         """
-        self.on_event(EVENT_ORDER, order)
-        self.on_event(EVENT_ORDER + order.vt_orderid, order)
+        self.on_event(EVENT_ORDER, order, order.vt_orderid)
 
     def on_position(self, position: PositionData) -> None:
         """
         Position event push.
-        Position event of a specific vt_symbol is also pushed.
+        Position event is keyed by vt_symbol, so that it is also distributed
+        to handlers of a specific vt_symbol.
         """
-        self.on_event(EVENT_POSITION, position)
-        self.on_event(EVENT_POSITION + position.vt_symbol, position)
+        self.on_event(EVENT_POSITION, position, position.vt_symbol)
 
     def on_account(self, account: AccountData) -> None:
         """
         Account event push.
-        Account event of a specific vt_accountid is also pushed.
+        Account event is keyed by vt_accountid, so that it is also
+        distributed to handlers of a specific vt_accountid.
         """
-        self.on_event(EVENT_ACCOUNT, account)
-        self.on_event(EVENT_ACCOUNT + account.vt_accountid, account)
+        self.on_event(EVENT_ACCOUNT, account, account.vt_accountid)
 
     def on_log(self, log: LogData) -> None:
         """
@@ -2,13 +2,17 @@
 General utility functions.
 """
 
+import inspect
 import json
 import logging
 import sys
+from collections import deque
+from functools import lru_cache, wraps
+from datetime import datetime, time, timedelta
 from pathlib import Path
-from typing import Callable, Dict, Tuple, Union
+from typing import Callable, Dict, List, Tuple, Union
 from decimal import Decimal
-from math import floor, ceil
+from math import floor, ceil, sqrt
 
 import numpy as np
 import talib
@@ -19,6 +23,9 @@ from .constant import Exchange, Interval
 
 log_formatter = logging.Formatter('[%(asctime)s] %(message)s')
 
+MINUTE_DELTA = timedelta(minutes=1)
+DAY_DELTA = timedelta(days=1)
+
 
 def extract_vt_symbol(vt_symbol: str) -> Tuple[str, Exchange]:
     """
@@ -121,30 +128,218 @@ def round_to(value: float, target: float) -> float:
     """
     Round price to price tick value.
     """
-    value = Decimal(str(value))
-    target = Decimal(str(target))
-    rounded = float(int(round(value / target)) * target)
-    return rounded
+    return get_price_tick(target).round(value)
 
 
 def floor_to(value: float, target: float) -> float:
     """
     Similar to math.floor function, but to target float number.
     """
-    value = Decimal(str(value))
-    target = Decimal(str(target))
-    result = float(int(floor(value / target)) * target)
-    return result
+    return get_price_tick(target).floor(value)
 
 
 def ceil_to(value: float, target: float) -> float:
     """
     Similar to math.ceil function, but to target float number.
     """
-    value = Decimal(str(value))
-    target = Decimal(str(target))
-    result = float(int(ceil(value / target)) * target)
-    return result
+    return get_price_tick(target).ceil(value)
+
+
+def round_to_array(values: np.ndarray, target: float) -> np.ndarray:
+    """
+    Vectorized round_to, with the same result for each element.
+    """
+    return get_price_tick(target).round_array(values)
+
+
+def floor_to_array(values: np.ndarray, target: float) -> np.ndarray:
+    """
+    Vectorized floor_to, with the same result for each element.
+    """
+    return get_price_tick(target).floor_array(values)
+
+
+def ceil_to_array(values: np.ndarray, target: float) -> np.ndarray:
+    """
+    Vectorized ceil_to, with the same result for each element.
+    """
+    return get_price_tick(target).ceil_array(values)
+
+
+@lru_cache(maxsize=999)
+def get_price_tick(target: float) -> "PriceTick":
+    """
+    Get PriceTick of target, cached for rounding with the same target.
+    """
+    return PriceTick(target)
+
+
+class PriceTick:
+    """
+    Round price to multiple of target with float arithmetic, which gets
+    the same result as rounding with Decimal(str(value)).
+
+    Target is kept as integer number of ticks (units of its last decimal
+    digit). Multiple count is estimated with float division, then decided
+    by comparing value with boundary prices, which are calculated exactly
+    as count * tick / scale. Comparing floats is the same as comparing
+    decimals of their str, since boundaries have no more than 15
+    significant digits within max_ratio.
+
+    Values out of max_ratio (including NaN and inf) are rounded with
+    Decimal, and non-positive target is always rounded with Decimal.
+    """
+
+    def __init__(self, target: float):
+        """"""
+        self.target: float = target
+        self.target_decimal: Decimal = Decimal(str(target))
+
+        digits = max(-self.target_decimal.as_tuple().exponent, 0)
+        self.scale: int = 10 ** digits
+        self.tick: int = int(self.target_decimal * self.scale)
+
+        if self.tick > 0:
+            self.max_ratio: float = min(1e12, 1e14 / self.tick)
+        else:
+            self.max_ratio: float = 0
+
+    def round(self, value: float) -> float:
+        """"""
+        if not self.max_ratio:
+            return self.round_decimal(value)
+
+        ratio = value / self.target
+        if not -self.max_ratio < ratio < self.max_ratio:
+            return self.round_decimal(value)
+
+        # Round up above half, and round half to even
+        count = floor(ratio)
+        half = (2 * count + 1) * self.tick / (2 * self.scale)
+        if value > half or (value == half and count % 2):
+            count += 1
+
+        return count * self.tick / self.scale
+
+    def floor(self, value: float) -> float:
+        """"""
+        if not self.max_ratio:
+            return self.floor_decimal(value)
+
+        ratio = value / self.target
+        if not -self.max_ratio < ratio < self.max_ratio:
+            return self.floor_decimal(value)
+
+        # Float ratio may be off by one near integer
+        count = floor(ratio)
+        if value >= (count + 1) * self.tick / self.scale:
+            count += 1
+        elif value < count * self.tick / self.scale:
+            count -= 1
+
+        return count * self.tick / self.scale
+
+    def ceil(self, value: float) -> float:
+        """"""
+        if not self.max_ratio:
+            return self.ceil_decimal(value)
+
+        ratio = value / self.target
+        if not -self.max_ratio < ratio < self.max_ratio:
+            return self.ceil_decimal(value)
+
+        # Float ratio may be off by one near integer
+        count = ceil(ratio)
+        if value <= (count - 1) * self.tick / self.scale:
+            count -= 1
+        elif value > count * self.tick / self.scale:
+            count += 1
+
+        return count * self.tick / self.scale
+
+    def round_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Vectorized round, with NaN kept as NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        with np.errstate(all="ignore"):
+            ratios = values / self.target
+
+            counts = np.floor(ratios)
+            halves = (2 * counts + 1) * self.tick / (2 * self.scale)
+            counts += (values > halves) | ((values == halves) & (counts % 2 == 1))
+
+            results = counts * self.tick / self.scale
+
+        return self.fix_outside(values, ratios, results, self.round_decimal)
+
+    def floor_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Vectorized floor, with NaN kept as NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        with np.errstate(all="ignore"):
+            ratios = values / self.target
+
+            counts = np.floor(ratios)
+            counts += values >= (counts + 1) * self.tick / self.scale
+            counts -= values < counts * self.tick / self.scale
+
+            results = counts * self.tick / self.scale
+
+        return self.fix_outside(values, ratios, results, self.floor_decimal)
+
+    def ceil_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Vectorized ceil, with NaN kept as NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        with np.errstate(all="ignore"):
+            ratios = values / self.target
+
+            counts = np.ceil(ratios)
+            counts -= values <= (counts - 1) * self.tick / self.scale
+            counts += values > counts * self.tick / self.scale
+
+            results = counts * self.tick / self.scale
+
+        return self.fix_outside(values, ratios, results, self.ceil_decimal)
+
+    def fix_outside(
+        self,
+        values: np.ndarray,
+        ratios: np.ndarray,
+        results: np.ndarray,
+        fallback: Callable
+    ) -> np.ndarray:
+        """
+        Round values out of max_ratio by Decimal fallback.
+        """
+        with np.errstate(invalid="ignore"):
+            outside = ~(np.abs(ratios) < self.max_ratio) & ~np.isnan(values)
+
+        for i in zip(*np.nonzero(outside)):
+            results[i] = fallback(values[i].item())
+
+        return results
+
+    def round_decimal(self, value: float) -> float:
+        """"""
+        value = Decimal(str(value))
+        return float(int(round(value / self.target_decimal)) * self.target_decimal)
+
+    def floor_decimal(self, value: float) -> float:
+        """"""
+        value = Decimal(str(value))
+        return float(int(floor(value / self.target_decimal)) * self.target_decimal)
+
+    def ceil_decimal(self, value: float) -> float:
+        """"""
+        value = Decimal(str(value))
+        return float(int(ceil(value / self.target_decimal)) * self.target_decimal)
 
 
 class BarGenerator:
@@ -299,19 +494,336 @@ class BarGenerator:
         return bar
 
 
+class MultiBarGenerator:
+    """
+    For generating bars of multiple windows from one tick data stream:
+    1. x second bar, x should be able to divide 60
+    2. 1 minute bar
+    3. x minute bar, x should be able to divide 60
+    4. x hour bar, x should be able to divide 24
+    5. daily bar, finished at daily_end and dated at 00:00 of trading day
+
+    1 minute bar data can also be updated directly, e.g. in backtesting.
+
+    Unlike BarGenerator, all windows are aligned to clock time instead of
+    counting bars, so that a missing minute bar does not shift windows.
+
+    Notice:
+    1. second bar has no Interval member, so its interval is None
+    2. bars pushed are new objects, except the internal 1 minute bar when
+       no callback of 1 minute bar added, which is reused
+    """
+
+    def __init__(self, daily_end: time = time(15, 0)):
+        """Constructor"""
+        self.daily_end: time = daily_end
+
+        self.second_windows: List[BarWindow] = []
+        self.minute_window: BarWindow = BarWindow(
+            Interval.MINUTE, 1, self.on_minute_bar, reuse=True
+        )
+        self.bar_windows: List[BarWindow] = []
+        self.minute_callbacks: List[Callable] = []
+
+        self.last_volume: float = None
+
+    def add_window(
+        self,
+        on_bar: Callable,
+        window: int = 1,
+        interval: Interval = Interval.MINUTE
+    ) -> None:
+        """
+        Add bar window with callback.
+        """
+        if interval == Interval.MINUTE and window == 1:
+            self.minute_callbacks.append(on_bar)
+            self.minute_window.reuse = False
+        else:
+            bar_window = BarWindow(interval, window, on_bar, self.daily_end)
+            self.bar_windows.append(bar_window)
+
+    def add_second_window(self, on_bar: Callable, window: int) -> None:
+        """
+        Add x second bar window with callback.
+        """
+        bar_window = BarWindow(None, window, on_bar)
+        self.second_windows.append(bar_window)
+
+    def update_tick(self, tick: TickData) -> None:
+        """
+        Update new tick data into generator.
+        """
+        # Filter tick data with 0 last price
+        if not tick.last_price:
+            return
+
+        if self.last_volume is None:
+            volume_change = 0
+        else:
+            volume_change = max(tick.volume - self.last_volume, 0)
+        self.last_volume = tick.volume
+
+        for bar_window in self.second_windows:
+            bar_window.update_tick(tick, volume_change)
+
+        if self.minute_callbacks or self.bar_windows:
+            self.minute_window.update_tick(tick, volume_change)
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update 1 minute bar into generator.
+        """
+        for bar_window in self.bar_windows:
+            bar_window.update_bar(bar)
+
+    def on_minute_bar(self, bar: BarData) -> None:
+        """"""
+        for callback in self.minute_callbacks:
+            callback(bar)
+
+        for bar_window in self.bar_windows:
+            bar_window.update_bar(bar)
+
+    def generate(self) -> None:
+        """
+        Finish current 1 minute bar and call callback immediately.
+        """
+        self.minute_window.finish()
+
+
+def get_daily_end(dt: datetime, daily_end: time) -> datetime:
+    """
+    Get end datetime of the daily bar which dt belongs to. Daily bar
+    ends at daily_end, skipping weekends.
+    """
+    end = datetime.combine(dt.date(), daily_end, dt.tzinfo)
+    if end <= dt:
+        end += DAY_DELTA
+
+    while end.weekday() >= 5:
+        end += DAY_DELTA
+
+    return end
+
+
+class BarWindow:
+    """
+    Bar of a window aligned to clock time, used by MultiBarGenerator.
+    """
+
+    def __init__(
+        self,
+        interval: Interval,
+        window: int,
+        on_bar: Callable,
+        daily_end: time = time(15, 0),
+        reuse: bool = False
+    ):
+        """"""
+        if interval == Interval.DAILY and window != 1:
+            raise ValueError("日K线只支持1日周期")
+        if interval == Interval.WEEKLY:
+            raise ValueError("不支持周K线合成")
+
+        self.interval: Interval = interval
+        self.window: int = window
+        self.on_bar: Callable = on_bar
+        self.daily_end: time = daily_end
+        self.reuse: bool = reuse
+
+        self.bar: BarData = None
+        self.active: bool = False
+        self.end: datetime = None
+
+    def update_tick(self, tick: TickData, volume_change: float) -> None:
+        """"""
+        price = tick.last_price
+
+        if self.active and tick.datetime >= self.end:
+            self.finish()
+
+        if not self.active:
+            self.new_bar(tick, tick.datetime, price, price, price)
+        else:
+            bar = self.bar
+            if price > bar.high_price:
+                bar.high_price = price
+            elif price < bar.low_price:
+                bar.low_price = price
+
+        bar = self.bar
+        bar.close_price = price
+        bar.volume += volume_change
+        bar.open_interest = tick.open_interest
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        if self.active and bar.datetime >= self.end:
+            self.finish()
+
+        if not self.active:
+            self.new_bar(
+                bar,
+                bar.datetime,
+                bar.open_price,
+                bar.high_price,
+                bar.low_price
+            )
+        else:
+            window_bar = self.bar
+            window_bar.high_price = max(window_bar.high_price, bar.high_price)
+            window_bar.low_price = min(window_bar.low_price, bar.low_price)
+
+        window_bar = self.bar
+        window_bar.close_price = bar.close_price
+        window_bar.volume += bar.volume
+        window_bar.open_interest = bar.open_interest
+
+        # Finish immediately with the last minute bar of window
+        if bar.datetime + MINUTE_DELTA >= self.end:
+            self.finish()
+
+    def new_bar(
+        self,
+        data: Union[TickData, BarData],
+        dt: datetime,
+        open_price: float,
+        high_price: float,
+        low_price: float
+    ) -> None:
+        """"""
+        start, self.end = self.get_range(dt)
+
+        if self.reuse and self.bar:
+            bar = self.bar
+            bar.datetime = start
+            bar.volume = 0
+            bar.open_price = open_price
+            bar.high_price = high_price
+            bar.low_price = low_price
+        else:
+            # Set fields directly instead of calling dataclass __init__
+            bar = object.__new__(BarData)
+            bar.__dict__ = {
+                "gateway_name": data.gateway_name,
+                "symbol": data.symbol,
+                "exchange": data.exchange,
+                "datetime": start,
+                "interval": self.interval,
+                "volume": 0,
+                "open_interest": 0,
+                "open_price": open_price,
+                "high_price": high_price,
+                "low_price": low_price,
+                "close_price": 0,
+                "vt_symbol": data.vt_symbol
+            }
+            self.bar = bar
+
+        self.active = True
+
+    def get_range(self, dt: datetime) -> Tuple[datetime, datetime]:
+        """
+        Get bar datetime and end datetime of the window dt belongs to.
+        """
+        window = self.window
+
+        if self.interval is None:
+            seconds = dt.hour * 3600 + dt.minute * 60 + dt.second
+            start = dt.replace(microsecond=0) - timedelta(seconds=seconds % window)
+            return start, start + timedelta(seconds=window)
+        elif self.interval == Interval.MINUTE:
+            minutes = dt.hour * 60 + dt.minute
+            start = dt.replace(second=0, microsecond=0) - timedelta(minutes=minutes % window)
+            return start, start + timedelta(minutes=window)
+        elif self.interval == Interval.HOUR:
+            start = dt.replace(minute=0, second=0, microsecond=0) - timedelta(hours=dt.hour % window)
+            return start, start + timedelta(hours=window)
+
+        end = get_daily_end(dt, self.daily_end)
+        start = end.replace(hour=0, minute=0, second=0, microsecond=0)
+        return start, end
+
+    def finish(self) -> None:
+        """"""
+        if not self.active:
+            return
+
+        self.active = False
+        bar = self.bar
+
+        if not self.reuse:
+            self.bar = None
+
+        self.on_bar(bar)
+
+
+def cache_indicator(func: Callable) -> Callable:
+    """
+    Cache result of ArrayManager indicator function until next bar, when
+    cache of array manager is enabled.
+    """
+    name = func.__name__
+    signature = inspect.signature(func)
+
+    # Default values of arguments after self, for padding positional call
+    parameters = list(signature.parameters.values())[1:]
+    defaults = tuple(parameter.default for parameter in parameters)
+
+    @wraps(func)
+    def wrapper(am: "ArrayManager", *args, **kwargs):
+        """"""
+        cache = am.indicator_cache
+        if cache is None:
+            return func(am, *args, **kwargs)
+
+        # Key by all arguments with defaults applied, so that sma(n),
+        # sma(n, False) and sma(n, array=False) share the same result
+        if not kwargs and len(args) <= len(defaults):
+            key = (name, args + defaults[len(args):])
+        else:
+            bound = signature.bind(am, *args, **kwargs)
+            bound.apply_defaults()
+            key = (name, tuple(bound.arguments.values())[1:])
+
+        if key in cache:
+            am.cache_hits += 1
+            return cache[key]
+
+        am.cache_misses += 1
+        result = func(am, *args, **kwargs)
+        cache[key] = result
+        return result
+
+    return wrapper
+
+
 class ArrayManager(object):
     """
     For:
     1. time series container of bar data
     2. calculating technical indicator value
+
+    Notice:
+    1. with cache enabled, indicator results are cached by function name
+       and arguments until next bar updated, and cache_hits/cache_misses
+       are counted
+    2. arrays returned from cache are shared by all callers of the same
+       bar, copy them before modifying
     """
 
-    def __init__(self, size: int = 100):
+    def __init__(self, size: int = 100, cache: bool = False):
         """Constructor"""
         self.count: int = 0
         self.size: int = size
         self.inited: bool = False
 
+        # Indicator results of current bar, enabled by cache
+        self.indicator_cache: dict = {} if cache else None
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
         self.open_array: np.ndarray = np.zeros(size)
         self.high_array: np.ndarray = np.zeros(size)
         self.low_array: np.ndarray = np.zeros(size)
@@ -327,6 +839,9 @@ class ArrayManager(object):
         if not self.inited and self.count >= self.size:
             self.inited = True
 
+        if self.indicator_cache:
+            self.indicator_cache.clear()
+
         self.open_array[:-1] = self.open_array[1:]
         self.high_array[:-1] = self.high_array[1:]
         self.low_array[:-1] = self.low_array[1:]
@@ -383,6 +898,7 @@ class ArrayManager(object):
         """
         return self.open_interest_array
 
+    @cache_indicator
     def sma(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Simple moving average.
@@ -392,6 +908,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def ema(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Exponential moving average.
@@ -401,6 +918,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def kama(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         KAMA.
@@ -410,6 +928,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def wma(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         WMA.
@@ -419,6 +938,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def apo(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         APO.
@@ -428,6 +948,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def cmo(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         CMO.
@@ -437,6 +958,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def mom(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         MOM.
@@ -446,6 +968,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def ppo(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         PPO.
@@ -455,6 +978,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def roc(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROC.
@@ -464,6 +988,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def rocr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROCR.
@@ -473,6 +998,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def rocp(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROCP.
@@ -482,6 +1008,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def rocr_100(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROCR100.
@@ -491,6 +1018,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def trix(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         TRIX.
@@ -500,6 +1028,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def std(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Standard deviation.
@@ -509,6 +1038,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def obv(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         OBV.
@@ -518,6 +1048,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def cci(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Commodity Channel Index (CCI).
@@ -527,6 +1058,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def atr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Average True Range (ATR).
@@ -536,6 +1068,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def natr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         NATR.
@@ -545,6 +1078,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def rsi(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Relative Strenght Index (RSI).
@@ -554,6 +1088,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def macd(
         self,
         fast_period: int,
@@ -574,6 +1109,7 @@ class ArrayManager(object):
             return macd, signal, hist
         return macd[-1], signal[-1], hist[-1]
 
+    @cache_indicator
     def adx(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ADX.
@@ -583,6 +1119,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def adxr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ADXR.
@@ -592,6 +1129,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def dx(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         DX.
@@ -601,6 +1139,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def minus_di(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         MINUS_DI.
@@ -610,6 +1149,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def plus_di(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         PLUS_DI.
@@ -619,6 +1159,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def willr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         WILLR.
@@ -628,6 +1169,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def ultosc(self, array: bool = False) -> Union[float, np.ndarray]:
         """
         Ultimate Oscillator.
@@ -637,6 +1179,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def trange(self, array: bool = False) -> Union[float, np.ndarray]:
         """
         TRANGE.
@@ -646,6 +1189,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def boll(
         self,
         n: int,
@@ -666,6 +1210,7 @@ class ArrayManager(object):
 
         return up, down
 
+    @cache_indicator
     def keltner(
         self,
         n: int,
@@ -686,6 +1231,7 @@ class ArrayManager(object):
 
         return up, down
 
+    @cache_indicator
     def donchian(
         self, n: int, array: bool = False
     ) -> Union[
@@ -702,6 +1248,7 @@ class ArrayManager(object):
             return up, down
         return up[-1], down[-1]
 
+    @cache_indicator
     def aroon(
         self,
         n: int,
@@ -719,6 +1266,7 @@ class ArrayManager(object):
             return aroon_up, aroon_down
         return aroon_up[-1], aroon_down[-1]
 
+    @cache_indicator
     def aroonosc(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Aroon Oscillator.
@@ -729,6 +1277,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def minus_dm(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         MINUS_DM.
@@ -739,6 +1288,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def plus_dm(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         PLUS_DM.
@@ -749,6 +1299,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def mfi(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Money Flow Index.
@@ -758,6 +1309,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def ad(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         AD.
@@ -767,6 +1319,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def adosc(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ADOSC.
@@ -776,6 +1329,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cache_indicator
     def bop(self, array: bool = False) -> Union[float, np.ndarray]:
         """
         BOP.
@@ -787,6 +1341,407 @@ class ArrayManager(object):
         return result[-1]
 
 
+class RingArrayManager(ArrayManager):
+    """
+    ArrayManager backed by ring buffer, updated in O(1) per bar.
+
+    Each time series is stored twice in a buffer of 2 * size, so that the
+    latest [size] values are always available as a contiguous view without
+    copying. SMA, EMA, STD, ATR, RSI, Bollinger/Keltner and Donchian
+    values (array=False) are calculated by streaming indicators, which
+    are created at the first call and then updated incrementally with
+    every new bar. Other indicators and array results are calculated by
+    talib on the views, the same as ArrayManager.
+
+    Notice:
+    1. EMA, ATR and RSI are seeded by talib result of the window at first
+       call and then run over the whole bar history, instead of restarting
+       from the beginning of window as talib does, so values may differ
+       slightly from ArrayManager until the seed effect decays
+    2. views returned are updated in place by later bars, copy them if
+       they need to be kept
+    """
+
+    def __init__(self, size: int = 100, cache: bool = False):
+        """Constructor"""
+        self.count: int = 0
+        self.size: int = size
+        self.inited: bool = False
+
+        self.indicator_cache: dict = {} if cache else None
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
+        # Rows of open, high, low, close, volume, open_interest
+        self.buffer: np.ndarray = np.zeros((6, size * 2))
+        self.start: int = 0
+
+        self.streams: Dict[tuple, object] = {}
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update new bar data into array manager.
+        """
+        self.count += 1
+        if not self.inited and self.count >= self.size:
+            self.inited = True
+
+        values = (
+            bar.open_price,
+            bar.high_price,
+            bar.low_price,
+            bar.close_price,
+            bar.volume,
+            bar.open_interest
+        )
+
+        if self.indicator_cache:
+            self.indicator_cache.clear()
+
+        ix = self.start
+        self.buffer[:, ix] = values
+        self.buffer[:, ix + self.size] = values
+
+        self.start = (ix + 1) % self.size
+
+        for stream in self.streams.values():
+            stream.update(bar)
+
+    def get_view(self, row: int) -> np.ndarray:
+        """"""
+        return self.buffer[row, self.start:self.start + self.size]
+
+    @property
+    def open_array(self) -> np.ndarray:
+        """"""
+        return self.get_view(0)
+
+    @property
+    def high_array(self) -> np.ndarray:
+        """"""
+        return self.get_view(1)
+
+    @property
+    def low_array(self) -> np.ndarray:
+        """"""
+        return self.get_view(2)
+
+    @property
+    def close_array(self) -> np.ndarray:
+        """"""
+        return self.get_view(3)
+
+    @property
+    def volume_array(self) -> np.ndarray:
+        """"""
+        return self.get_view(4)
+
+    @property
+    def open_interest_array(self) -> np.ndarray:
+        """"""
+        return self.get_view(5)
+
+    @property
+    def open(self) -> np.ndarray:
+        """
+        Get open price time series.
+        """
+        return self.get_view(0)
+
+    @property
+    def high(self) -> np.ndarray:
+        """
+        Get high price time series.
+        """
+        return self.get_view(1)
+
+    @property
+    def low(self) -> np.ndarray:
+        """
+        Get low price time series.
+        """
+        return self.get_view(2)
+
+    @property
+    def close(self) -> np.ndarray:
+        """
+        Get close price time series.
+        """
+        return self.get_view(3)
+
+    @property
+    def volume(self) -> np.ndarray:
+        """
+        Get trading volume time series.
+        """
+        return self.get_view(4)
+
+    @property
+    def open_interest(self) -> np.ndarray:
+        """
+        Get open interest time series.
+        """
+        return self.get_view(5)
+
+    def get_stream(self, stream_class: type, n: int):
+        """
+        Get streaming indicator, which is created from current window at
+        the first time.
+        """
+        key = (stream_class, n)
+
+        stream = self.streams.get(key, None)
+        if not stream:
+            stream = stream_class(self, n)
+            self.streams[key] = stream
+
+        return stream
+
+    def sma(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Simple moving average.
+        """
+        if array or n > self.size:
+            return super().sma(n, array)
+        return self.get_stream(SmaStream, n).value
+
+    def ema(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Exponential moving average.
+        """
+        if array or n > self.size:
+            return super().ema(n, array)
+        return self.get_stream(EmaStream, n).value
+
+    def std(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Standard deviation.
+        """
+        if array or n > self.size:
+            return super().std(n, array)
+        return self.get_stream(StdStream, n).value
+
+    def atr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Average True Range (ATR).
+        """
+        if array or n >= self.size:
+            return super().atr(n, array)
+        return self.get_stream(AtrStream, n).value
+
+    def rsi(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Relative Strenght Index (RSI).
+        """
+        if array or n >= self.size:
+            return super().rsi(n, array)
+        return self.get_stream(RsiStream, n).value
+
+    def donchian(
+        self, n: int, array: bool = False
+    ) -> Union[
+        Tuple[np.ndarray, np.ndarray],
+        Tuple[float, float]
+    ]:
+        """
+        Donchian Channel.
+        """
+        if array or n > self.size:
+            return super().donchian(n, array)
+
+        stream = self.get_stream(DonchianStream, n)
+        return stream.up, stream.down
+
+
+class SmaStream:
+    """
+    Streaming simple moving average.
+    """
+
+    def __init__(self, am: ArrayManager, n: int):
+        """"""
+        self.n: int = n
+        self.values: deque = deque(am.close[-n:].tolist(), maxlen=n)
+        self.total: float = sum(self.values)
+
+    def update(self, bar: BarData) -> None:
+        """"""
+        self.total += bar.close_price - self.values[0]
+        self.values.append(bar.close_price)
+
+    @property
+    def value(self) -> float:
+        """"""
+        return self.total / self.n
+
+
+class StdStream:
+    """
+    Streaming standard deviation (population), the same as talib.STDDEV.
+    """
+
+    def __init__(self, am: ArrayManager, n: int):
+        """"""
+        self.n: int = n
+        self.values: deque = deque(am.close[-n:].tolist(), maxlen=n)
+        self.total: float = sum(self.values)
+        self.total_square: float = sum(v * v for v in self.values)
+
+    def update(self, bar: BarData) -> None:
+        """"""
+        old = self.values[0]
+        new = bar.close_price
+
+        self.total += new - old
+        self.total_square += new * new - old * old
+        self.values.append(new)
+
+    @property
+    def value(self) -> float:
+        """"""
+        mean = self.total / self.n
+        variance = self.total_square / self.n - mean * mean
+        return sqrt(max(variance, 0))
+
+
+class EmaStream:
+    """
+    Streaming exponential moving average.
+    """
+
+    def __init__(self, am: ArrayManager, n: int):
+        """"""
+        self.k: float = 2 / (n + 1)
+        self.value: float = talib.EMA(am.close, n)[-1]
+
+    def update(self, bar: BarData) -> None:
+        """"""
+        self.value += self.k * (bar.close_price - self.value)
+
+
+class AtrStream:
+    """
+    Streaming average true range with Wilder's smoothing.
+    """
+
+    def __init__(self, am: ArrayManager, n: int):
+        """"""
+        self.n: int = n
+        self.value: float = talib.ATR(am.high, am.low, am.close, n)[-1]
+        self.pre_close: float = am.close[-1]
+
+    def update(self, bar: BarData) -> None:
+        """"""
+        tr = max(
+            bar.high_price - bar.low_price,
+            abs(bar.high_price - self.pre_close),
+            abs(bar.low_price - self.pre_close)
+        )
+
+        self.value = (self.value * (self.n - 1) + tr) / self.n
+        self.pre_close = bar.close_price
+
+
+class RsiStream:
+    """
+    Streaming relative strength index with Wilder's smoothing.
+    """
+
+    def __init__(self, am: ArrayManager, n: int):
+        """"""
+        self.n: int = n
+
+        # Average gain/loss calculated over window in the same way as talib
+        diff = np.diff(am.close)
+        gains = np.maximum(diff, 0).tolist()
+        losses = np.maximum(-diff, 0).tolist()
+
+        self.gain: float = sum(gains[:n]) / n
+        self.loss: float = sum(losses[:n]) / n
+
+        for gain, loss in zip(gains[n:], losses[n:]):
+            self.gain = (self.gain * (n - 1) + gain) / n
+            self.loss = (self.loss * (n - 1) + loss) / n
+
+        self.pre_close: float = am.close[-1]
+
+    def update(self, bar: BarData) -> None:
+        """"""
+        diff = bar.close_price - self.pre_close
+        n = self.n
+
+        if diff > 0:
+            self.gain = (self.gain * (n - 1) + diff) / n
+            self.loss = self.loss * (n - 1) / n
+        else:
+            self.gain = self.gain * (n - 1) / n
+            self.loss = (self.loss * (n - 1) - diff) / n
+
+        self.pre_close = bar.close_price
+
+    @property
+    def value(self) -> float:
+        """"""
+        total = self.gain + self.loss
+        if not total:
+            return 0
+        return 100 * self.gain / total
+
+
+class DonchianStream:
+    """
+    Streaming highest high and lowest low, by monotonic queues.
+    """
+
+    def __init__(self, am: ArrayManager, n: int):
+        """"""
+        self.n: int = n
+        self.count: int = 0
+
+        # Queues of (count, price), with price decreasing for highs and
+        # increasing for lows.
+        self.highs: deque = deque()
+        self.lows: deque = deque()
+
+        for high, low in zip(am.high[-n:].tolist(), am.low[-n:].tolist()):
+            self.update_price(high, low)
+
+    def update(self, bar: BarData) -> None:
+        """"""
+        self.update_price(bar.high_price, bar.low_price)
+
+    def update_price(self, high: float, low: float) -> None:
+        """"""
+        self.count += 1
+        count = self.count
+        highs = self.highs
+        lows = self.lows
+
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((count, high))
+
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((count, low))
+
+        expired = count - self.n
+        if highs[0][0] <= expired:
+            highs.popleft()
+        if lows[0][0] <= expired:
+            lows.popleft()
+
+    @property
+    def up(self) -> float:
+        """"""
+        return self.highs[0][1]
+
+    @property
+    def down(self) -> float:
+        """"""
+        return self.lows[0][1]
+
+
 def virtual(func: Callable) -> Callable:
     """
     mark a function as "virtual", which means that this function can be override.